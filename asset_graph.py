@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+SPADE Unused Asset Detector
+Builds a reference graph of the site: every file under src/ is a root, and the
+references found in it (plus, transitively, in the public JS/CSS/JSON files it
+reaches) mark assets under public/ as used. JSON data contributes its `image` and
+`pythonFile` fields. Whatever public asset is never reached is reported with its
+byte cost, and can be removed from the built site before deploying.
+
+Reference extraction runs in a process pool and is cached per file by content hash
+in .spade/asset-refs.json, so only edited files are re-read.
+
+Usage:
+    python3 asset_graph.py              report unreferenced assets
+    python3 asset_graph.py prune [dist] delete them from the build output (default: dist)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(ROOT, "src")
+PUBLIC_DIR = os.path.join(ROOT, "public")
+CACHE_FILE = os.path.join(ROOT, ".spade", "asset-refs.json")
+
+# Generated output referenced through manifests rather than by name
+GENERATED_DIRS = ("img/variants/", "json/news/", "json/search/", "static/")
+# Files served by convention rather than referenced
+ALWAYS_KEEP = ("CNAME", "robots.txt", "favicon.ico", ".nojekyll")
+# Public files whose own references count once they are reached
+TEXT_SUFFIXES = (".js", ".mjs", ".css", ".json", ".html")
+SOURCE_SUFFIXES = (".astro", ".js", ".mjs", ".ts", ".css")
+
+URL_RE = re.compile(r"https?://[^\s'\"`)<>]+")
+PATH_RE = re.compile(
+    r"(?<![\w.-])[./]*((?:[\w-]+/)*[\w.-]+\.(?:svg|png|jpe?g|gif|webp|avif|ico|js|mjs|css|py|json|md|txt|woff2?|ttf))\b"
+)
+
+
+def json_references(value, found):
+    """Collect the `image` and `pythonFile` fields of a JSON document"""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key == "image" and isinstance(child, str):
+                found.append(child)
+            elif key == "pythonFile" and isinstance(child, str):
+                found.append(f"py/{child}")
+            else:
+                json_references(child, found)
+    elif isinstance(value, list):
+        for child in value:
+            json_references(child, found)
+    return found
+
+
+def extract_job(path):
+    """Worker: raw references of one file; returns (path, sha256, references)"""
+    with open(path, 'rb') as f:
+        payload = f.read()
+    digest = hashlib.sha256(payload).hexdigest()
+    text = payload.decode("utf-8", errors="replace")
+    if path.endswith(".json"):
+        try:
+            return path, digest, sorted(set(json_references(json.loads(text), [])))
+        except json.JSONDecodeError:
+            pass
+    text = URL_RE.sub(" ", text)
+    return path, digest, sorted(set(PATH_RE.findall(text)))
+
+
+def walk(directory):
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name)
+
+
+def public_assets():
+    """{public-relative path: absolute path} of every asset that could go unused"""
+    assets = {}
+    for path in walk(PUBLIC_DIR):
+        rel = os.path.relpath(path, PUBLIC_DIR).replace(os.sep, "/")
+        if rel.startswith(GENERATED_DIRS) or os.path.basename(rel) in ALWAYS_KEEP:
+            continue
+        assets[rel] = path
+    return assets
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def extract_all(paths, workers=None):
+    """References of every file, re-reading only files whose content changed"""
+    cache = load_cache()
+    new_cache = {}
+    refs = {}
+    jobs = []
+    for path in paths:
+        rel = os.path.relpath(path, ROOT)
+        st = os.stat(path)
+        signature = [st.st_size, st.st_mtime_ns]
+        known = cache.get(rel)
+        if known and known["stat"] == signature:
+            new_cache[rel] = known
+            refs[path] = known["refs"]
+            continue
+        if known:
+            # Touched but possibly identical: compare content hashes
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() == known["sha256"]:
+                    new_cache[rel] = dict(known, stat=signature)
+                    refs[path] = known["refs"]
+                    continue
+        jobs.append(path)
+
+    if len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(extract_job, jobs, chunksize=8))
+    else:
+        results = [extract_job(path) for path in jobs]
+    for path, digest, found in results:
+        st = os.stat(path)
+        new_cache[os.path.relpath(path, ROOT)] = {
+            "stat": [st.st_size, st.st_mtime_ns], "sha256": digest, "refs": found,
+        }
+        refs[path] = found
+
+    if new_cache != cache:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, 'w') as f:
+            json.dump(new_cache, f)
+    return refs, len(jobs)
+
+
+def resolve(reference, referrer, assets, by_name):
+    """Public assets a raw reference can point to"""
+    candidates = [reference.lstrip("/")]
+    if candidates[0].startswith("public/"):
+        candidates.append(candidates[0][len("public/"):])
+    if referrer.startswith(PUBLIC_DIR):
+        base = os.path.relpath(os.path.dirname(referrer), PUBLIC_DIR)
+        candidates.append(os.path.normpath(os.path.join(base, reference)).replace(os.sep, "/"))
+    for candidate in candidates:
+        if candidate in assets:
+            return [candidate]
+    # Unknown directory: assume it may mean any asset with that file name
+    return by_name.get(os.path.basename(reference), [])
+
+
+def find_unused(workers=None):
+    """Return (unused assets as [(path, bytes)], assets scanned, files re-read)"""
+    assets = public_assets()
+    by_name = {}
+    for rel in assets:
+        by_name.setdefault(os.path.basename(rel), []).append(rel)
+    roots = [path for path in walk(SRC_DIR) if path.endswith(SOURCE_SUFFIXES)]
+    texts = [assets[rel] for rel in assets if rel.endswith(TEXT_SUFFIXES)]
+    refs, reread = extract_all(roots + texts, workers)
+
+    used = set()
+    queue = deque(roots)
+    while queue:
+        referrer = queue.popleft()
+        for reference in refs.get(referrer, ()):
+            for rel in resolve(reference, referrer, assets, by_name):
+                if rel not in used:
+                    used.add(rel)
+                    if rel.endswith(TEXT_SUFFIXES):
+                        queue.append(assets[rel])
+
+    unused = [(rel, os.path.getsize(path)) for rel, path in assets.items() if rel not in used]
+    unused.sort(key=lambda entry: entry[1], reverse=True)
+    return unused, len(assets), reread
+
+
+def report():
+    """Print the unreferenced assets and their byte cost"""
+    started = time.perf_counter()
+    unused, scanned, reread = find_unused()
+    elapsed = time.perf_counter() - started
+    if not unused:
+        print(f"✅ All {scanned} public assets are referenced ({reread} files re-read, {elapsed:.2f}s)")
+        return unused
+    print(f"\n🧹 {len(unused)} of {scanned} public assets are not referenced:")
+    print("=" * 50)
+    for rel, size in unused:
+        print(f"  {size / 1024:>8.1f} KB  {rel}")
+    total = sum(size for _, size in unused)
+    print(f"\nTotal: {total / 1024:.1f} KB deployed for nothing ({reread} files re-read, {elapsed:.2f}s)")
+    print("Run 'prune' after building to leave them out of the deploy.")
+    return unused
+
+
+def prune(dist_dir="dist"):
+    """Delete unreferenced assets from the build output"""
+    if not os.path.isdir(dist_dir):
+        print(f"❌ No build output in '{dist_dir}' (run the build first)")
+        return False
+    unused, _, _ = find_unused()
+    removed = freed = 0
+    for rel, _ in unused:
+        target = os.path.join(dist_dir, rel)
+        for path in (target, f"{target}.gz", f"{target}.br"):
+            if os.path.isfile(path):
+                freed += os.path.getsize(path)
+                os.unlink(path)
+                removed += 1
+    print(f"🧹 Removed {removed} unreferenced files from {dist_dir} ({freed / 1024:.1f} KB)")
+    return True
+
+
+COMMANDS = {
+    "report": report,
+    "prune": prune,
+}
+
+
+def run(args):
+    """Run a command (default: report)"""
+    command = args[0].lower() if args else "report"
+    if command in COMMANDS:
+        COMMANDS[command](*args[1:])
+    else:
+        print(f"❓ Unknown command: {command}")
+        print(f"Available commands: {', '.join(COMMANDS)}")
+
+
+def main():
+    """Main function"""
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+
+    run(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Persistent catalog of the SPADE backups
+Indexes every snapshot manifest (id, creation time, files with sizes and hashes)
+and every stored blob in a SQLite database next to the backups, so listing,
+selecting a point in time and pruning are index queries instead of directory scans
+and manifest reads. The manifests and objects on disk stay the source of truth:
+the catalog can always be rebuilt from them (`backup_data.py reindex`).
+"""
+
+import json
+import sqlite3
+
+# Bump when the schema changes; older catalogs are rebuilt from disk
+VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id            TEXT PRIMARY KEY,
+    created       TEXT NOT NULL,
+    archive       TEXT,
+    archive_bytes INTEGER NOT NULL,
+    manifest      TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_created ON snapshots (created);
+CREATE TABLE IF NOT EXISTS snapshot_files (
+    snapshot_id TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    sha256      TEXT NOT NULL,
+    bytes       INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshot_files_sha256 ON snapshot_files (sha256);
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    bytes  INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class BackupCatalog:
+    """SQLite index of snapshot manifests and stored objects"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        # The catalog can always be rebuilt, so commits need not wait for the disk
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        # A new or outdated catalog knows nothing about what is on disk yet
+        self.stale = self.conn.execute("PRAGMA user_version").fetchone()[0] != VERSION
+        if self.stale:
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # Snapshots
+
+    def _insert(self, manifest, archive_bytes):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+            (manifest["id"], manifest["created"], manifest.get("archive"), archive_bytes, json.dumps(manifest)),
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO snapshot_files VALUES (?, ?, ?, ?)",
+            ((manifest["id"], path, entry["sha256"], entry["bytes"]) for path, entry in manifest["files"].items()),
+        )
+
+    def add(self, manifest, archive_bytes=0):
+        with self.conn:
+            self._insert(manifest, archive_bytes)
+
+    def remove(self, snapshot_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+            self.conn.execute("DELETE FROM snapshot_files WHERE snapshot_id = ?", (snapshot_id,))
+
+    def get(self, snapshot_id):
+        row = self.conn.execute("SELECT manifest FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def ids(self):
+        """Snapshot ids, oldest first"""
+        return [snapshot_id for (snapshot_id,) in self.conn.execute("SELECT id FROM snapshots ORDER BY id")]
+
+    def manifests(self):
+        """All manifests, newest first"""
+        return [json.loads(manifest) for (manifest,) in
+                self.conn.execute("SELECT manifest FROM snapshots ORDER BY id DESC")]
+
+    def newest(self, up_to=None, archives=True):
+        """Manifest of the newest snapshot (with an id <= up_to, if given), or None"""
+        conditions, params = [], []
+        if up_to is not None:
+            conditions.append("id <= ?")
+            params.append(up_to)
+        if not archives:
+            conditions.append("archive IS NULL")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        row = self.conn.execute(
+            f"SELECT manifest FROM snapshots{where} ORDER BY id DESC LIMIT 1", params
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def timeline(self):
+        """(id, created, archive bytes) of every snapshot, newest first"""
+        return self.conn.execute("SELECT id, created, archive_bytes FROM snapshots ORDER BY id DESC").fetchall()
+
+    # Objects
+
+    def add_object(self, digest, size):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO objects VALUES (?, ?)", (digest, size))
+
+    def remove_objects(self, digests):
+        with self.conn:
+            self.conn.executemany("DELETE FROM objects WHERE digest = ?", ((digest,) for digest in digests))
+
+    def objects(self):
+        """All stored objects as (digest, bytes)"""
+        return self.conn.execute("SELECT digest, bytes FROM objects").fetchall()
+
+    def usage(self):
+        """Bytes stored in objects and archives"""
+        (objects,) = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM objects").fetchone()
+        (archives,) = self.conn.execute("SELECT COALESCE(SUM(archive_bytes), 0) FROM snapshots").fetchone()
+        return objects + archives
+
+    def rebuild(self, manifests, objects):
+        """Replace the whole catalog; manifests are (manifest, archive bytes) pairs"""
+        with self.conn:
+            self.conn.execute("DELETE FROM snapshots")
+            self.conn.execute("DELETE FROM snapshot_files")
+            self.conn.execute("DELETE FROM objects")
+            for manifest, archive_bytes in manifests:
+                self._insert(manifest, archive_bytes)
+            self.conn.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?)", objects)
+            self.conn.execute(f"PRAGMA user_version = {VERSION}")
+        self.stale = False
@@ -1,105 +1,211 @@
 #!/usr/bin/env python3
 """
 SPADE Data Backup Utility
-Creates backups of the content data files (news.json and demos.json)
+Creates backups of the site content (public/json, public/py and public/img)
+in a content-addressed store: unchanged files are never stored twice
 """
 
-import json
-import os
 import sys
-import shutil
+
+# Must run before the other imports so --timings can measure them
+import startup_timings
+startup_timings.enable_from_argv()
+
+import os
 from datetime import datetime
-from pathlib import Path
 
-def create_backup():
-    """Create a backup of the data files"""
+# Files and directories to backup; `create <path>...` backs up others instead
+BACKUP_PATHS = [
+    "public/json",
+    "public/py",
+    "public/img"
+]
+# Rebuilt from the files above by the build, so not worth keeping
+GENERATED_DIRS = ("public/img/variants", "public/json/news", "public/json/search")
+# Content files, which are listed one by one and can be restored item by item
+DATA_FILES = [
+    "public/json/news.json",
+    "public/json/demos.json"
+]
+
+def open_store():
+    """Open the backup store, pointing out old-style timestamped copies not moved into it yet"""
+    from backup_store import BackupStore
+    store = BackupStore()
+    legacy = store.legacy_backups()
+    if legacy:
+        print(f"ℹ️ {len(legacy)} old-style backup(s) in {store.root}/ are not in the backup store "
+              f"('import-legacy' moves them in)")
+    return store
+
+# Collections whose items can be restored one at a time: (command group, save function)
+ITEM_SAVERS = {
+    "news": ("news", "save_news_item"),
+    "demos": ("demos", "save_demo_item"),
+}
+
+def format_created(manifest):
+    return datetime.fromisoformat(manifest["created"]).strftime("%Y-%m-%d %H:%M:%S")
+
+def parse_moment(text):
+    """Datetime for --at; a date, minute or second includes backups taken during it"""
+    moment = datetime.fromisoformat(text)
+    if len(text) == 10:
+        moment = moment.replace(hour=23, minute=59, second=59)
+    elif len(text) == 16:
+        moment = moment.replace(second=59)
+    if "." not in text:
+        moment = moment.replace(microsecond=999999)
+    return moment
+
+def restore_item(item_id, at=None, collection="news"):
+    """Restore a single item as it was at a point in time"""
+    if collection not in ITEM_SAVERS:
+        print(f"❌ Unknown collection: {collection} (choose from {', '.join(ITEM_SAVERS)})")
+        return False
+    try:
+        moment = parse_moment(at) if at else datetime.now()
+    except ValueError:
+        print(f"❌ Invalid time: {at} (use e.g. 2025-05-24 or 2025-05-24T22:53)")
+        return False
     
-    # Check if we're in the right directory
-    if not os.path.exists("astro.config.mjs"):
-        print("❌ Error: This script should be run from the repository root directory.")
-        print(f"Current directory: {os.getcwd()}")
+    store = open_store()
+    manifest = store.at(moment)
+    path = f"public/json/{collection}.json"
+    if manifest is None or path not in manifest["files"]:
+        print(f"❌ No backup of {path} at or before {moment:%Y-%m-%d %H:%M:%S}")
         return False
     
-    # Create backup directory
-    backup_dir = Path("backups")
-    backup_dir.mkdir(exist_ok=True)
+    item = store.find_item(manifest, path, item_id)
+    if item is None:
+        print(f"❌ No {collection} item {item_id} in the backup of {format_created(manifest)}")
+        return False
+    
+    import json
+    print(f"\n📄 {collection} item {item_id} as of {format_created(manifest)}:")
+    print(json.dumps(item, indent=2))
+    confirm = input("\nRestore this item? (y/N): ").strip().lower()
+    if confirm not in ['y', 'yes']:
+        print("Restore cancelled")
+        return False
     
-    # Generate timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    import command_registry
+    group, saver = ITEM_SAVERS[collection]
+    module = command_registry.load(group)
+    content = module.get_store()
+    before = None
+    if content.get(collection, item["id"]) is None:
+        # Back where it was: ahead of the first item that followed it then and still exists
+        before = next((other for other in store.following_ids(manifest, path, item_id)
+                       if content.get(collection, other) is not None), None)
+    if not getattr(module, saver)(item, before=before):
+        return False
+    module.close()
+    print(f"🎉 Restored {collection} item {item_id} from snapshot {manifest['id']}")
+    return True
+
+def backup_files(paths):
+    """The files under paths, sorted; hidden, cached and generated files are left out"""
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".") and name != "__pycache__"
+                           and os.path.join(dirpath, name) not in GENERATED_DIRS]
+            files.extend(os.path.join(dirpath, name) for name in filenames if not name.startswith("."))
+    return sorted(files)
+
+def print_files(manifest, detailed=False):
+    """Print the data files of a snapshot and a summary of the others per directory"""
+    others = {}
+    for file_path, entry in manifest["files"].items():
+        if file_path not in DATA_FILES:
+            others.setdefault(os.path.dirname(file_path), []).append(entry["bytes"])
+        elif detailed:
+            print(f"   📄 {os.path.basename(file_path)} ({entry['bytes']} bytes, {entry['sha256'][:12]})")
+        else:
+            print(f"   └── {os.path.basename(file_path)}")
+    for directory, sizes in sorted(others.items()):
+        print(f"   📁 {directory}/ {len(sizes)} file(s) ({sum(sizes)} bytes)")
+
+def create_backup(*args):
+    """Create a backup of the content
+
+    create [--archive] [path ...]: --archive writes a single compressed archive, and
+    paths replace BACKUP_PATHS.
+    """
+    unknown = {arg for arg in args if arg.startswith("--")} - {"--archive"}
+    if unknown:
+        print(f"❓ Unknown option(s): {', '.join(sorted(unknown))}")
+        print("Usage: create [--archive] [path ...]")
+        return False
+    paths = [arg for arg in args if not arg.startswith("--")] or BACKUP_PATHS
     
-    # Files to backup
-    data_files = [
-        "public/json/news.json",
-        "public/json/demos.json"
-    ]
+    # Check if we're in the right directory
+    with startup_timings.phase("environment check"):
+        if not os.path.exists("astro.config.mjs"):
+            print("❌ Error: This script should be run from the repository root directory.")
+            print(f"Current directory: {os.getcwd()}")
+            return False
     
-    backup_count = 0
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"⚠️ Not found: {path}")
     
-    for file_path in data_files:
-        if os.path.exists(file_path):
-            # Create backup filename
-            file_name = Path(file_path).name
-            backup_name = f"{timestamp}_{file_name}"
-            backup_path = backup_dir / backup_name
-            
-            try:
-                # Copy file
-                shutil.copy2(file_path, backup_path)
-                print(f"✅ Backed up {file_path} → {backup_path}")
-                backup_count += 1
-            except Exception as e:
-                print(f"❌ Failed to backup {file_path}: {e}")
+    try:
+        store = open_store()
+        if "--archive" in args:
+            manifest, stored = store.create_archive(backup_files(paths))
         else:
-            print(f"⚠️ File not found: {file_path}")
+            manifest, stored = store.create(backup_files(paths))
+    except OSError as e:
+        print(f"❌ Failed to create backup: {e}")
+        return False
     
-    if backup_count > 0:
-        print(f"\n🎉 Successfully created {backup_count} backup(s) in the 'backups' directory")
-        return True
-    else:
+    if manifest is None:
         print("\n❌ No files were backed up")
         return False
-
-def restore_backup():
-    """Restore from a backup"""
-    backup_dir = Path("backups")
     
-    if not backup_dir.exists():
-        print("❌ No backup directory found")
-        return False
+    for file_path, entry in manifest["files"].items():
+        if file_path in DATA_FILES:
+            print(f"✅ Backed up {file_path} ({entry['bytes']} bytes, {entry['sha256'][:12]})")
+    others = len([path for path in manifest["files"] if path not in DATA_FILES])
+    if others:
+        print(f"✅ Backed up {others} other file(s) from {', '.join(paths)}")
+    if "archive" in manifest:
+        print(f"\n🎉 Created archive {manifest['archive']} of {len(manifest['files'])} file(s), "
+              f"{stored} bytes compressed")
+    else:
+        print(f"\n🎉 Created snapshot {manifest['id']} of {len(manifest['files'])} file(s), "
+              f"{stored} new bytes stored in the 'backups' directory")
+    return True
+
+def restore_backup(*args):
+    """Restore from a backup
+
+    restore --item <id> [--at <time>] [--collection news|demos] restores one item.
+    """
+    if args:
+        options = dict(zip(args[::2], args[1::2]))
+        if len(args) % 2 or "--item" not in options or set(options) - {"--item", "--at", "--collection"}:
+            print("Usage: restore --item <id> [--at <time>] [--collection news|demos]")
+            return False
+        return restore_item(options["--item"], options.get("--at"), options.get("--collection", "news"))
     
-    # List available backups
-    backup_files = list(backup_dir.glob("*.json"))
-    if not backup_files:
-        print("❌ No backup files found")
+    store = open_store()
+    snapshots = store.snapshots()
+    if not snapshots:
+        print("❌ No backups found")
         return False
     
     print("\n📂 Available backups:")
     print("=" * 40)
     
-    # Group by timestamp
-    backups_by_time = {}
-    for backup_file in backup_files:
-        # Extract timestamp from filename
-        name_parts = backup_file.name.split("_")
-        if len(name_parts) >= 3:
-            timestamp = f"{name_parts[0]}_{name_parts[1]}"
-            if timestamp not in backups_by_time:
-                backups_by_time[timestamp] = []
-            backups_by_time[timestamp].append(backup_file)
-    
-    # Display grouped backups
-    sorted_timestamps = sorted(backups_by_time.keys(), reverse=True)
-    for i, timestamp in enumerate(sorted_timestamps, 1):
-        # Parse timestamp for display
-        try:
-            dt = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
-            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-            print(f"{i}. {formatted_time}")
-            for backup_file in backups_by_time[timestamp]:
-                file_type = backup_file.name.split("_", 2)[-1]
-                print(f"   └── {file_type}")
-        except ValueError:
-            print(f"{i}. {timestamp} (malformed)")
+    for i, manifest in enumerate(snapshots, 1):
+        print(f"{i}. {format_created(manifest)}" + (" (archive)" if "archive" in manifest else ""))
+        print_files(manifest)
     
     print("\n0. Cancel")
     
@@ -110,137 +216,180 @@ def restore_backup():
             print("Restore cancelled")
             return False
         
-        if choice < 1 or choice > len(sorted_timestamps):
+        if choice < 1 or choice > len(snapshots):
             print("❌ Invalid selection")
             return False
         
-        selected_timestamp = sorted_timestamps[choice - 1]
-        selected_files = backups_by_time[selected_timestamp]
-        
-        # Confirm restore
-        print(f"\n⚠️ This will restore the following files:")
-        for backup_file in selected_files:
-            file_type = backup_file.name.split("_", 2)[-1]
-            target_path = f"public/json/{file_type}"
-            print(f"   {target_path}")
-        
-        confirm = input("\nAre you sure? (y/N): ").strip().lower()
-        if confirm not in ['y', 'yes']:
-            print("Restore cancelled")
-            return False
-        
-        # Perform restore
-        restored_count = 0
-        for backup_file in selected_files:
-            file_type = backup_file.name.split("_", 2)[-1]
-            target_path = f"public/json/{file_type}"
-            
-            try:
-                # Ensure target directory exists
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                
-                # Copy backup to target location
-                shutil.copy2(backup_file, target_path)
-                print(f"✅ Restored {backup_file.name} → {target_path}")
-                restored_count += 1
-            except Exception as e:
-                print(f"❌ Failed to restore {backup_file.name}: {e}")
-        
-        if restored_count > 0:
-            print(f"\n🎉 Successfully restored {restored_count} file(s)")
-            print("⚠️ Note: Restart the Astro dev server to see changes")
-            return True
-        else:
-            print("\n❌ No files were restored")
-            return False
-        
+        selected = snapshots[choice - 1]
     except ValueError:
         print("❌ Please enter a valid number")
         return False
+    
+    # Confirm restore
+    print(f"\n⚠️ This will restore the following files:")
+    for target_path in selected["files"]:
+        print(f"   {target_path}")
+    
+    confirm = input("\nAre you sure? (y/N): ").strip().lower()
+    if confirm not in ['y', 'yes']:
+        print("Restore cancelled")
+        return False
+    
+    # Perform restore; files are replaced only once all of them matched their checksums
+    try:
+        restored = store.restore(selected)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to restore snapshot {selected['id']}: {e}")
+        print("No files were changed; run 'verify' to check the other backups")
+        return False
+    
+    for target_path in restored:
+        if target_path in DATA_FILES:
+            print(f"✅ Restored {target_path} from snapshot {selected['id']}")
+    print(f"\n🎉 Successfully restored {len(restored)} file(s)")
+    print("⚠️ Note: Reload the page to see changes ('spade_manager.py watch' reloads it for you)")
+    return True
 
 def list_backups():
     """List all available backups"""
-    backup_dir = Path("backups")
-    
-    if not backup_dir.exists():
-        print("📂 No backup directory found")
-        return
-    
-    backup_files = list(backup_dir.glob("*.json"))
-    if not backup_files:
-        print("📂 No backup files found")
+    store = open_store()
+    snapshots = store.snapshots()
+    if not snapshots:
+        print("📂 No backups found")
         return
     
-    print(f"\n📂 Found {len(backup_files)} backup files:")
+    print(f"\n📂 Found {len(snapshots)} backups ({store.disk_usage()} bytes stored):")
     print("=" * 50)
     
-    # Group by timestamp and sort
-    backups_by_time = {}
-    for backup_file in backup_files:
-        name_parts = backup_file.name.split("_")
-        if len(name_parts) >= 3:
-            timestamp = f"{name_parts[0]}_{name_parts[1]}"
-            if timestamp not in backups_by_time:
-                backups_by_time[timestamp] = []
-            backups_by_time[timestamp].append(backup_file)
-    
-    # Display
-    for timestamp in sorted(backups_by_time.keys(), reverse=True):
-        try:
-            dt = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
-            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-            print(f"\n📅 {formatted_time}")
-            
-            for backup_file in backups_by_time[timestamp]:
-                file_type = backup_file.name.split("_", 2)[-1]
-                file_size = backup_file.stat().st_size
-                print(f"   📄 {file_type} ({file_size} bytes)")
-        except ValueError:
-            print(f"\n📅 {timestamp} (malformed timestamp)")
+    for manifest in snapshots:
+        print(f"\n📅 {format_created(manifest)}")
+        if "archive" in manifest:
+            print(f"   📦 {manifest['archive']}")
+        print_files(manifest, detailed=True)
+
+def cleanup_old_backups(*args, confirm=False):
+    """Prune backups with the grandfather-father-son retention policy
 
-def cleanup_old_backups():
-    """Remove backups older than 30 days"""
-    backup_dir = Path("backups")
+    cleanup [--dry-run] [--hourly N] [--daily N] [--weekly N] [--monthly N]
+    """
+    from backup_retention import RETENTION
+    policy = dict(RETENTION)
+    dry_run = False
+    args = list(args)
+    try:
+        while args:
+            option = args.pop(0)
+            if option == "--dry-run":
+                dry_run = True
+            elif option.startswith("--") and option[2:] in policy:
+                policy[option[2:]] = int(args.pop(0))
+            else:
+                raise ValueError(option)
+    except (ValueError, IndexError):
+        print("Usage: cleanup [--dry-run] [--hourly N] [--daily N] [--weekly N] [--monthly N]")
+        return False
     
-    if not backup_dir.exists():
-        print("📂 No backup directory found")
-        return
+    store = open_store()
+    print(f"\n🗂️ Retention policy: {', '.join(f'{count} {tier}' for tier, count in policy.items())}")
+    kept, pruned, reclaimed = store.apply_retention(policy, dry_run=dry_run or confirm)
+    verb = "Would prune" if dry_run or confirm else "Pruned"
+    for snapshot_id, created, _ in pruned:
+        print(f"🗑️ {verb} {created.replace('T', ' ')} ({snapshot_id})")
+    print(f"\n📊 {len(kept)} backup(s) kept, {len(pruned)} {'to prune' if dry_run or confirm else 'pruned'}, "
+          f"{reclaimed} bytes {'to reclaim' if dry_run or confirm else 'reclaimed'}")
     
-    cutoff_date = datetime.now().timestamp() - (30 * 24 * 60 * 60)  # 30 days ago
-    removed_count = 0
+    if dry_run:
+        print("ℹ️ Dry run: nothing was deleted")
+        return True
+    if confirm and (pruned or reclaimed):
+        answer = input("\nPrune these backups? (y/N): ").strip().lower()
+        if answer not in ['y', 'yes']:
+            print("Cleanup cancelled")
+            return False
+        kept, pruned, reclaimed = store.apply_retention(policy)
+        print(f"🧹 Pruned {len(pruned)} backup(s), {reclaimed} bytes reclaimed")
+    return True
+
+def verify_backup(*args):
+    """Re-hash backups and report corruption
+
+    verify [<snapshot id> | --all] checks the newest backup, the given one, or all of them.
+    """
+    if len(args) > 1:
+        print("Usage: verify [<snapshot id> | --all]")
+        return False
+    store = open_store()
+    if args and args[0] == "--all":
+        manifests = store.snapshots()
+    else:
+        manifest = store.load(args[0]) if args else store.latest(archives=True)
+        if manifest is None:
+            print(f"❌ No backup {args[0]}" if args else "📂 No backups found")
+            return False
+        manifests = [manifest]
     
-    for backup_file in backup_dir.glob("*.json"):
-        if backup_file.stat().st_mtime < cutoff_date:
-            try:
-                backup_file.unlink()
-                print(f"🗑️ Removed old backup: {backup_file.name}")
-                removed_count += 1
-            except Exception as e:
-                print(f"❌ Failed to remove {backup_file.name}: {e}")
+    print(f"\n🔍 Verifying {len(manifests)} backup(s)...")
+    report = store.verify(manifests)
+    for manifest in manifests:
+        problems = report.get(manifest["id"])
+        if not problems:
+            print(f"✅ {format_created(manifest)} ({manifest['id']}): {len(manifest['files'])} file(s) intact")
+            continue
+        print(f"❌ {format_created(manifest)} ({manifest['id']}): {len(problems)} problem(s)")
+        for path, problem in sorted(problems.items()):
+            print(f"   {path}: {problem}")
     
-    if removed_count > 0:
-        print(f"\n🧹 Cleaned up {removed_count} old backup(s)")
-    else:
-        print("\n✨ No old backups to clean up")
+    if report:
+        print(f"\n⚠️ {len(report)} of {len(manifests)} backup(s) are damaged and cannot be restored")
+        return False
+    print(f"\n🎉 All {len(manifests)} backup(s) verified")
+    return True
 
-def main():
-    """Main function"""
-    print("🔄 SPADE Data Backup Utility")
-    print("=" * 30)
-    
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
-        if command == "create":
-            create_backup()
-        elif command == "restore":
-            restore_backup()
-        elif command == "list":
-            list_backups()
-        elif command == "cleanup":
-            cleanup_old_backups()
+def reindex_backups():
+    """Rebuild the backup catalog from the manifests and objects on disk"""
+    store = open_store()
+    snapshots, objects = store.reindex()
+    print(f"📇 Backup catalog rebuilt: {snapshots} snapshot(s), {objects} object(s), "
+          f"{store.disk_usage()} bytes stored")
+
+def import_legacy_backups():
+    """Move old-style backups/<date>_<time>_<file>.json copies into the backup store"""
+    from backup_store import BackupStore
+    store = BackupStore()
+    imported = store.import_legacy()
+    if not imported:
+        print("ℹ️ No old-style backups to import")
+        return True
+    for snapshot_id, created, names in imported:
+        print(f"📦 {', '.join(names)} → backup {snapshot_id} ({created:%Y-%m-%d %H:%M:%S})")
+    print(f"✅ Moved {len(imported)} old-style backup(s) into the backup store and deleted the copies "
+          f"from {store.root}/ (commit their removal if they were tracked)")
+    return True
+
+COMMANDS = {
+    "create": create_backup,
+    "restore": restore_backup,
+    "list": list_backups,
+    "cleanup": cleanup_old_backups,
+    "verify": verify_backup,
+    "reindex": reindex_backups,
+    "import-legacy": import_legacy_backups,
+}
+
+def run(args):
+    """Run a one-shot command when args are given, the interactive menu otherwise"""
+    if args:
+        command = args[0].lower()
+        if command in COMMANDS:
+            with startup_timings.phase(f"command: {command}"):
+                result = COMMANDS[command](*args[1:])
+            if result is False:
+                # A failed backup, restore or verify fails the run, so cron and CI notice
+                sys.exit(1)
         else:
             print(f"❓ Unknown command: {command}")
-            print("Available commands: create, restore, list, cleanup")
+            print(f"Available commands: {', '.join(COMMANDS)}")
+            sys.exit(1)
         return
     
     # Interactive mode
@@ -249,11 +398,13 @@ def main():
         print("1. Create backup")
         print("2. Restore backup")
         print("3. List backups")
-        print("4. Cleanup old backups")
-        print("5. Exit")
+        print("4. Prune old backups (retention policy)")
+        print("5. Verify backups")
+        print("6. Rebuild backup catalog")
+        print("7. Exit")
         
         try:
-            choice = input("\nSelect option (1-5): ").strip()
+            choice = input("\nSelect option (1-7): ").strip()
             
             if choice == "1":
                 create_backup()
@@ -262,12 +413,16 @@ def main():
             elif choice == "3":
                 list_backups()
             elif choice == "4":
-                cleanup_old_backups()
+                cleanup_old_backups(confirm=True)
             elif choice == "5":
+                verify_backup("--all")
+            elif choice == "6":
+                reindex_backups()
+            elif choice == "7":
                 print("👋 Goodbye!")
                 break
             else:
-                print("❓ Invalid option. Please choose 1-5.")
+                print("❓ Invalid option. Please choose 1-7.")
         
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
@@ -276,5 +431,15 @@ def main():
             print("\n👋 Goodbye!")
             break
 
+def main():
+    """Main function"""
+    args = sys.argv[1:]
+    # One-shot commands are scripted; only greet interactive users
+    if not args:
+        print("🔄 SPADE Data Backup Utility")
+        print("=" * 30)
+    
+    run(args)
+
 if __name__ == "__main__":
     main()
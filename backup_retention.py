@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Grandfather-father-son retention for the SPADE backups
+A policy says how many hourly, daily, weekly and monthly snapshots to keep. Each
+tier keeps the newest snapshot of each of its most recent periods, so with the
+default policy the last day is covered hour by hour, the last week day by day, and
+so on up to a year of monthly snapshots. A snapshot is kept when any tier wants it;
+everything else can be pruned. The plan is computed in one pass over the snapshots
+sorted newest first.
+"""
+
+from datetime import datetime
+
+# Periods kept per tier
+RETENTION = {"hourly": 24, "daily": 7, "weekly": 4, "monthly": 12}
+
+PERIODS = {
+    "hourly": lambda created: (created.date(), created.hour),
+    "daily": lambda created: created.date(),
+    "weekly": lambda created: created.isocalendar()[:2],
+    "monthly": lambda created: (created.year, created.month),
+}
+
+
+def plan_retention(snapshots, policy=RETENTION):
+    """Split snapshots into (kept, pruned) under a retention policy
+
+    `snapshots` are (id, created ISO timestamp, ...) rows sorted newest first; kept
+    rows are returned as (row, tiers keeping it). The newest snapshot is always kept.
+    """
+    last_period = dict.fromkeys(policy)
+    counts = dict.fromkeys(policy, 0)
+    kept, pruned = [], []
+    for row in snapshots:
+        created = datetime.fromisoformat(row[1])
+        tiers = []
+        for tier, limit in policy.items():
+            period = PERIODS[tier](created)
+            if period != last_period[tier] and counts[tier] < limit:
+                last_period[tier] = period
+                counts[tier] += 1
+                tiers.append(tier)
+        if tiers or not kept:
+            kept.append((row, tiers or ["latest"]))
+        else:
+            pruned.append(row)
+    return kept, pruned
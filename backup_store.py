@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+"""
+Content-addressed backup store for the SPADE data files
+A snapshot is a small JSON manifest (backups/snapshots/<id>.json) mapping every
+backed-up path to the SHA-256 of its content. The content itself is stored once, as
+a blob named after that hash (backups/objects/ab/cdef...), so a file that did not
+change since an earlier snapshot costs no bytes beyond its manifest entry.
+
+Content files (news.json, demos.json) that changed are stored as a structural delta
+against the previous snapshot, keyed by item id, instead of a new full copy. Every
+REBASE_EVERY deltas the file is stored in full again, which bounds the number of
+deltas a restore has to apply.
+
+Snapshots can also be written as archives: one compressed tar stream per snapshot
+(backups/archives/<id>.tar.xz) that ends with a checksum manifest, and is restored
+by streaming each member into a temporary file that is renamed into place once
+every checksum matched.
+
+Every manifest and blob is also indexed in backups/catalog.db (see backup_catalog.py),
+which answers listing and point-in-time queries without reading the directories.
+
+Files are hashed while they are copied in, and again while they are copied out:
+a restore writes nothing unless every file matches the SHA-256 in its manifest,
+and verify() re-hashes stored snapshots to find corruption before it is needed.
+Both spread the files over a thread pool; hashlib and file I/O release the GIL.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from backup_catalog import BackupCatalog
+from content_journal import atomic_write_bytes, open_temporary
+
+BACKUP_DIR = "backups"
+
+# Format of snapshot ids; sortable, and unique for snapshots taken in the same second
+ID_FORMAT = "%Y%m%d_%H%M%S_%f"
+# Layout of the backups written before the object store: backups/<date>_<time>_<file>
+LEGACY_FORMAT = "%Y%m%d_%H%M%S"
+
+# Consecutive deltas before a file is stored in full again
+REBASE_EVERY = 16
+
+# tarfile compression of archive snapshots (xz, gz or bz2)
+ARCHIVE_COMPRESSION = "xz"
+# Last member of every archive: the checksums of the files before it
+ARCHIVE_MANIFEST = "MANIFEST.json"
+CHUNK_SIZE = 1 << 16
+
+
+def serialize(doc):
+    """Bytes of a content document, as the content store writes them"""
+    return json.dumps(doc, indent=2).encode()
+
+
+def map_threads(function, items):
+    """[function(item) for item in items], on a thread pool when there is more than one"""
+    items = list(items)
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor() as pool:
+        return list(pool.map(function, items))
+
+
+def hash_stream(f):
+    """SHA-256 hex digest of the rest of a file object"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashingReader:
+    """File wrapper computing the SHA-256 of everything read through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.hash.update(data)
+        return data
+
+
+def find_in_document(doc, item_id):
+    """Item of a content document by id (compared as text), or None"""
+    for item in doc.get(collection_of(doc), []):
+        if str(item["id"]) == item_id:
+            return item
+    return None
+
+
+def collection_of(doc):
+    """Key of the id-keyed item list of a content document, or None"""
+    if isinstance(doc, dict):
+        for key, value in doc.items():
+            if isinstance(value, list) and all(isinstance(item, dict) and "id" in item for item in value):
+                return key
+    return None
+
+
+def apply_delta(doc, delta):
+    """The document a delta was computed for, given the document it was computed against"""
+    key = delta["key"]
+    removed = set(delta["removed"])
+    changed = {item["id"]: item for item in delta["changed"]}
+    items = [changed.get(item["id"], item) for item in doc[key] if item["id"] not in removed]
+    for index, item in delta["added"]:
+        items.insert(index, item)
+    if "order" in delta:
+        by_id = {item["id"]: item for item in items}
+        items = [by_id[item_id] for item_id in delta["order"]]
+    result = {k: v for k, v in doc.items() if k not in delta.get("dropped", ())}
+    result.update(delta.get("extra", {}))
+    result[key] = items
+    return result
+
+
+def diff_documents(old, new, key):
+    """Structural delta turning `old` into `new`, keyed by item id"""
+    old_items = {item["id"]: item for item in old[key]}
+    new_ids = {item["id"] for item in new[key]}
+    delta = {
+        "key": key,
+        "added": [[index, item] for index, item in enumerate(new[key]) if item["id"] not in old_items],
+        "changed": [item for item in new[key] if item["id"] in old_items and old_items[item["id"]] != item],
+        "removed": [item_id for item_id in old_items if item_id not in new_ids],
+    }
+    extra = {k: v for k, v in new.items() if k != key and old.get(k) != v}
+    if extra:
+        delta["extra"] = extra
+    dropped = [k for k in old if k != key and k not in new]
+    if dropped:
+        delta["dropped"] = dropped
+    # Inserting at the final positions only works while the kept items stay in order
+    if [item["id"] for item in apply_delta(old, delta)[key]] != [item["id"] for item in new[key]]:
+        delta["order"] = [item["id"] for item in new[key]]
+    return delta
+
+
+class BackupStore:
+    """Snapshots as manifests over hash-named blobs"""
+
+    def __init__(self, root=BACKUP_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        self.archives_dir = os.path.join(root, "archives")
+        os.makedirs(root, exist_ok=True)
+        self.catalog = BackupCatalog(os.path.join(root, "catalog.db"))
+        if self.catalog.stale:
+            self.reindex()
+
+    def close(self):
+        self.catalog.close()
+
+    # Blobs
+
+    def blob_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put_blob(self, payload):
+        """Store content once; returns (sha256, bytes written)"""
+        digest, written = self._write_blob(payload)
+        if written:
+            self.catalog.add_object(digest, written)
+        return digest, written
+
+    # The catalog connection belongs to the main thread; these two leave it alone
+
+    def _write_blob(self, payload):
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        atomic_write_bytes(path, payload)
+        return digest, len(payload)
+
+    def _copy_blob(self, path):
+        """Stream a file into the store, hashing it on the way; returns (sha256, bytes, bytes written)"""
+        fd, tmp_path = open_temporary(os.path.join(self.objects_dir, "incoming"))
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with open(path, 'rb') as source, os.fdopen(fd, 'wb') as out:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            digest = digest.hexdigest()
+            target = self.blob_path(digest)
+            if os.path.exists(target):
+                os.unlink(tmp_path)
+                return digest, size, 0
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest, size, size
+
+    def read_blob(self, digest):
+        with open(self.blob_path(digest), 'rb') as f:
+            return f.read()
+
+    # Deltas
+
+    def make_delta(self, known, payload):
+        """Delta blob for a content file against its previous entry, or None
+
+        None means the file is better stored in full: it is not a content document,
+        the delta would not reproduce it byte for byte, or the delta is not small.
+        """
+        try:
+            new = json.loads(payload)
+        except ValueError:
+            return None
+        key = collection_of(new)
+        if key is None:
+            return None
+        old = self.load_document(known)
+        if collection_of(old) != key:
+            return None
+        delta = diff_documents(old, new, key)
+        if serialize(apply_delta(old, delta)) != payload:
+            return None
+        delta["parent"] = {k: known[k] for k in ("sha256", "delta") if k in known}
+        data = json.dumps(delta, separators=(",", ":")).encode()
+        if len(data) * 2 > len(payload):
+            return None
+        return data
+
+    def delta_chain(self, entry):
+        """The deltas of an entry, newest first, and the full blob they start from"""
+        chain = []
+        while "delta" in entry:
+            delta = json.loads(self.read_blob(entry["delta"]))
+            chain.append(delta)
+            entry = delta["parent"]
+        return chain, entry["sha256"]
+
+    def load_document(self, entry):
+        """Parsed content of a manifest entry"""
+        chain, base = self.delta_chain(entry)
+        doc = json.loads(self.read_blob(base))
+        for delta in reversed(chain):
+            doc = apply_delta(doc, delta)
+        return doc
+
+    def read_content(self, entry):
+        """Bytes of a manifest entry, rebuilt from its deltas when needed"""
+        if "delta" not in entry:
+            return self.read_blob(entry["sha256"])
+        payload = serialize(self.load_document(entry))
+        if hashlib.sha256(payload).hexdigest() != entry["sha256"]:
+            raise ValueError(f"rebuilt content does not match its hash {entry['sha256'][:12]}")
+        return payload
+
+    def find_item(self, manifest, path, item_id):
+        """An item of a content file as stored in a snapshot, or None if it was not there
+
+        Walks back through the deltas until one of them mentions the item, so only
+        the base document is ever parsed, never the intermediate versions.
+        """
+        if "archive" in manifest:
+            return find_in_document(json.loads(self.read_archive_member(manifest, path)), item_id)
+        entry = manifest["files"][path]
+        while "delta" in entry:
+            delta = json.loads(self.read_blob(entry["delta"]))
+            if any(str(removed) == item_id for removed in delta["removed"]):
+                return None
+            for item in delta["changed"] + [item for _, item in delta["added"]]:
+                if str(item["id"]) == item_id:
+                    return item
+            entry = delta["parent"]
+        return find_in_document(json.loads(self.read_blob(entry["sha256"])), item_id)
+
+    def following_ids(self, manifest, path, item_id):
+        """Ids of the items after an item in a snapshot's copy of a content file, nearest first"""
+        if "archive" in manifest:
+            doc = json.loads(self.read_archive_member(manifest, path))
+        else:
+            doc = self.load_document(manifest["files"][path])
+        ids = [item["id"] for item in doc.get(collection_of(doc), [])]
+        for index, other in enumerate(ids):
+            if str(other) == item_id:
+                return ids[index + 1:]
+        return []
+
+    # Snapshots
+
+    def create(self, paths, created=None):
+        """Snapshot the existing files among paths; returns (manifest, new bytes stored)
+
+        Files whose size and mtime changed since the last snapshot are copied in on
+        a thread pool.
+        """
+        created = created or datetime.now()
+        latest = self.latest()
+        previous = latest["files"] if latest else {}
+        files = {}
+        changed = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            known = previous.get(path)
+            # Same size and mtime as in the last snapshot: the content is already stored
+            if known and known["bytes"] == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+                files[path] = known
+            else:
+                changed.append((path, known, st.st_mtime_ns))
+        new_objects = {}
+        for path, entry, written in map_threads(self._store_file, changed):
+            files[path] = entry
+            new_objects.update(written)
+        for digest, size in new_objects.items():
+            self.catalog.add_object(digest, size)
+        if not files:
+            return None, 0
+        files = dict(sorted(files.items()))
+        return self.write_manifest(self.new_id(created), created, files), sum(new_objects.values())
+
+    def _store_file(self, job):
+        """Store one changed file; returns (path, manifest entry, {digest: bytes} written)"""
+        path, known, mtime_ns = job
+        if known and path.endswith(".json"):
+            # Content documents may be stored as a delta, which needs them parsed anyway
+            with open(path, 'rb') as f:
+                payload = f.read()
+            digest, size = hashlib.sha256(payload).hexdigest(), len(payload)
+        else:
+            digest, size, written = self._copy_blob(path)
+            payload = None
+        if known and known["sha256"] == digest:
+            # Touched but unchanged: keep pointing at the same stored content
+            return path, dict(known, mtime_ns=mtime_ns), {}
+        entry = {"sha256": digest, "bytes": size, "mtime_ns": mtime_ns}
+        if payload is None:
+            return path, entry, {digest: written} if written else {}
+        delta = None
+        if known.get("depth", 0) < REBASE_EVERY and not os.path.exists(self.blob_path(digest)):
+            delta = self.make_delta(known, payload)
+        if delta is not None:
+            stored, written = self._write_blob(delta)
+            entry["delta"] = stored
+            entry["depth"] = known.get("depth", 0) + 1
+        else:
+            stored, written = self._write_blob(payload)
+        return path, entry, {stored: written} if written else {}
+
+    def new_id(self, created):
+        snapshot_id = created.strftime(ID_FORMAT)
+        while os.path.exists(self.manifest_path(snapshot_id)):
+            # Same microsecond (e.g. a legacy import): keep ids unique and ordered
+            snapshot_id += "0"
+        return snapshot_id
+
+    def write_manifest(self, snapshot_id, created, files, archive_bytes=0, **extra):
+        manifest = {"id": snapshot_id, "created": created.isoformat(timespec="seconds"), "files": files, **extra}
+        atomic_write_bytes(self.manifest_path(snapshot_id), json.dumps(manifest, indent=1).encode())
+        self.catalog.add(manifest, archive_bytes)
+        return manifest
+
+    def manifest_path(self, snapshot_id):
+        return os.path.join(self.snapshots_dir, f"{snapshot_id}.json")
+
+    def snapshot_ids(self):
+        """Ids of all snapshots, oldest first"""
+        return self.catalog.ids()
+
+    def load(self, snapshot_id):
+        return self.catalog.get(snapshot_id)
+
+    def latest(self, archives=False):
+        """Manifest of the newest snapshot kept in the object store (or of any kind), or None"""
+        return self.catalog.newest(archives=archives)
+
+    def snapshots(self):
+        """All snapshot manifests, newest first"""
+        return self.catalog.manifests()
+
+    def at(self, moment):
+        """Manifest of the newest snapshot taken at or before a datetime, or None"""
+        return self.catalog.newest(up_to=moment.strftime(ID_FORMAT))
+
+    def restore(self, manifest):
+        """Put every file of a snapshot back in place; returns the restored paths
+
+        Every file is first written to a temporary file next to its target and
+        checked against its hash; nothing is replaced unless all of them match.
+        """
+        if "archive" in manifest:
+            return self.restore_archive(manifest)
+        staged = {}
+        try:
+            map_threads(lambda item: self._stage(*item, staged), manifest["files"].items())
+            for path, tmp_path in staged.items():
+                os.replace(tmp_path, path)
+            staged = {}
+        finally:
+            for tmp_path in staged.values():
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        return list(manifest["files"])
+
+    def _stage(self, path, entry, staged):
+        """Write the stored content of an entry to a temporary file next to path and check it"""
+        fd, staged[path] = open_temporary(path)
+        with os.fdopen(fd, 'wb') as out:
+            if "delta" in entry:
+                payload = serialize(self.load_document(entry))
+                digest = hashlib.sha256(payload).hexdigest()
+                out.write(payload)
+            else:
+                with open(self.blob_path(entry["sha256"]), 'rb') as source:
+                    reader = HashingReader(source)
+                    for chunk in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                        out.write(chunk)
+                digest = reader.hash.hexdigest()
+            out.flush()
+            os.fsync(out.fileno())
+        if digest != entry["sha256"]:
+            raise ValueError(f"checksum mismatch for {path}")
+
+    def delete(self, snapshot_id):
+        manifest = self.load(snapshot_id)
+        if "archive" in manifest:
+            try:
+                os.unlink(os.path.join(self.root, manifest["archive"]))
+            except FileNotFoundError:
+                pass
+        os.unlink(self.manifest_path(snapshot_id))
+        self.catalog.remove(snapshot_id)
+
+    # Archives
+
+    def create_archive(self, paths, created=None, compression=ARCHIVE_COMPRESSION):
+        """Snapshot the existing files among paths as one compressed stream
+
+        Returns (manifest, archive bytes).
+        """
+        import io
+        import tarfile
+        created = created or datetime.now()
+        snapshot_id = self.new_id(created)
+        archive = f"archives/{snapshot_id}.tar.{compression}"
+        target = os.path.join(self.root, archive)
+        tmp_path = f"{target}.tmp"
+        os.makedirs(self.archives_dir, exist_ok=True)
+        files = {}
+        try:
+            with tarfile.open(tmp_path, f"w|{compression}") as tar:
+                for path in paths:
+                    try:
+                        f = open(path, 'rb')
+                    except FileNotFoundError:
+                        continue
+                    with f:
+                        info = tar.gettarinfo(arcname=path, fileobj=f)
+                        reader = HashingReader(f)
+                        tar.addfile(info, reader)
+                    files[path] = {"sha256": reader.hash.hexdigest(), "bytes": info.size}
+                payload = json.dumps(files, indent=1).encode()
+                info = tarfile.TarInfo(ARCHIVE_MANIFEST)
+                info.size = len(payload)
+                info.mtime = int(created.timestamp())
+                tar.addfile(info, io.BytesIO(payload))
+            if not files:
+                os.unlink(tmp_path)
+                return None, 0
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        size = os.path.getsize(target)
+        return self.write_manifest(snapshot_id, created, files, archive_bytes=size, archive=archive), size
+
+    def archive_members(self, manifest):
+        """Yield (path, file object) for the files of an archive, in stream order"""
+        import tarfile
+        # tarfile stores absolute paths without their leading slash
+        paths = {path.lstrip("/"): path for path in manifest["files"]}
+        with tarfile.open(os.path.join(self.root, manifest["archive"]), "r|*") as tar:
+            for member in tar:
+                if member.name == ARCHIVE_MANIFEST:
+                    continue
+                # Only the paths the manifest lists are ever written
+                if member.name not in paths or not member.isfile():
+                    raise ValueError(f"unexpected archive member: {member.name}")
+                yield paths[member.name], tar.extractfile(member)
+
+    def read_archive_member(self, manifest, path):
+        for member_path, f in self.archive_members(manifest):
+            if member_path == path:
+                return f.read()
+        raise FileNotFoundError(f"{path} is not in archive {manifest['archive']}")
+
+    def restore_archive(self, manifest):
+        """Stream an archive into temporary files and rename them into place
+
+        Nothing is replaced unless every file is present and matches its checksum.
+        """
+        staged = {}
+        try:
+            for path, source in self.archive_members(manifest):
+                fd, tmp_path = open_temporary(path)
+                staged[path] = tmp_path
+                digest = hashlib.sha256()
+                with os.fdopen(fd, 'wb') as out:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        out.write(chunk)
+                    out.flush()
+                    os.fsync(out.fileno())
+                if digest.hexdigest() != manifest["files"][path]["sha256"]:
+                    raise ValueError(f"checksum mismatch for {path}")
+            missing = set(manifest["files"]) - set(staged)
+            if missing:
+                raise ValueError(f"archive is missing {', '.join(sorted(missing))}")
+            for path, tmp_path in staged.items():
+                os.replace(tmp_path, path)
+            staged = {}
+        finally:
+            for tmp_path in staged.values():
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        return list(manifest["files"])
+
+    # Verification
+
+    def verify(self, manifests):
+        """Re-hash the stored content of snapshots; returns {snapshot id: {path: problem}}
+
+        Snapshots with no problem are left out. A blob or delta chain shared by
+        several snapshots is checked once; blobs and archives are checked in parallel.
+        """
+        manifests = list(manifests)
+        targets = {}
+        for manifest in manifests:
+            if "archive" in manifest:
+                targets[manifest["archive"]] = manifest
+            else:
+                for entry in manifest["files"].values():
+                    targets[entry.get("delta", entry["sha256"])] = entry
+        results = dict(zip(targets, map_threads(self._check, targets.values())))
+        report = {}
+        for manifest in manifests:
+            if "archive" in manifest:
+                problems = results[manifest["archive"]]
+            else:
+                problems = {path: results[entry.get("delta", entry["sha256"])]
+                            for path, entry in manifest["files"].items()
+                            if results[entry.get("delta", entry["sha256"])]}
+            if problems:
+                report[manifest["id"]] = problems
+        return report
+
+    def _check(self, target):
+        """Problems of one verify() target: {path: problem} for an archive, text or None for an entry"""
+        if "archive" in target:
+            return self.check_archive(target)
+        try:
+            if "delta" in target:
+                self.read_content(target)
+                return None
+            with open(self.blob_path(target["sha256"]), 'rb') as f:
+                if hash_stream(f) != target["sha256"]:
+                    return "checksum mismatch"
+        except FileNotFoundError:
+            return "stored content is missing"
+        except ValueError as e:
+            return str(e)
+        return None
+
+    def check_archive(self, manifest):
+        """Re-hash the members of an archive; returns {path: problem}"""
+        import tarfile
+        problems = {}
+        seen = set()
+        try:
+            for path, source in self.archive_members(manifest):
+                seen.add(path)
+                if hash_stream(source) != manifest["files"][path]["sha256"]:
+                    problems[path] = "checksum mismatch"
+        except FileNotFoundError:
+            return {manifest["archive"]: "archive is missing"}
+        except (OSError, ValueError, EOFError, tarfile.TarError) as e:
+            return {manifest["archive"]: f"archive is unreadable: {e}"}
+        for path in manifest["files"]:
+            if path not in seen:
+                problems[path] = "missing from the archive"
+        return problems
+
+    # Pruning
+
+    def live_objects(self, manifests):
+        """Digests of the blobs the given snapshots need, delta chains included"""
+        live = set()
+        for manifest in manifests:
+            if "archive" in manifest:
+                continue
+            for entry in manifest["files"].values():
+                # Keep whole delta chains; shared tails are only walked once
+                while "delta" in entry and entry["delta"] not in live:
+                    live.add(entry["delta"])
+                    entry = json.loads(self.read_blob(entry["delta"]))["parent"]
+                if "delta" not in entry:
+                    live.add(entry["sha256"])
+        return live
+
+    def remove_objects(self, digests):
+        for digest in digests:
+            try:
+                os.unlink(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+        self.catalog.remove_objects(digests)
+
+    def collect_garbage(self):
+        """Remove blobs no snapshot refers to; returns (blobs removed, bytes freed)"""
+        live = self.live_objects(self.snapshots())
+        dead = [(digest, size) for digest, size in self.catalog.objects() if digest not in live]
+        self.remove_objects([digest for digest, _ in dead])
+        return len(dead), sum(size for _, size in dead)
+
+    def apply_retention(self, policy, dry_run=False):
+        """Prune the snapshots a retention policy does not keep, with their unused blobs
+
+        Returns (kept, pruned, bytes reclaimed); kept and pruned as in plan_retention.
+        With dry_run nothing is deleted, but the bytes are computed the same way.
+        """
+        from backup_retention import plan_retention
+        kept, pruned = plan_retention(self.catalog.timeline(), policy)
+        live = self.live_objects(self.load(row[0]) for row, _ in kept)
+        dead = [(digest, size) for digest, size in self.catalog.objects() if digest not in live]
+        reclaimed = sum(size for _, size in dead) + sum(archive_bytes for _, _, archive_bytes in pruned)
+        if not dry_run:
+            for snapshot_id, _, _ in pruned:
+                self.delete(snapshot_id)
+            self.remove_objects([digest for digest, _ in dead])
+        return kept, pruned, reclaimed
+
+    def disk_usage(self):
+        """Bytes stored in blobs and archives"""
+        return self.catalog.usage()
+
+    def reindex(self):
+        """Rebuild the catalog from the manifests and objects on disk
+
+        Returns (snapshots, objects) indexed.
+        """
+        manifests = []
+        try:
+            names = sorted(os.listdir(self.snapshots_dir))
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.snapshots_dir, name), 'r') as f:
+                manifest = json.load(f)
+            archive_bytes = 0
+            if "archive" in manifest:
+                try:
+                    archive_bytes = os.path.getsize(os.path.join(self.root, manifest["archive"]))
+                except FileNotFoundError:
+                    pass
+            manifests.append((manifest, archive_bytes))
+        objects = []
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                # Blobs live in two-character prefix directories; skip interrupted copies
+                if len(prefix) != 2:
+                    continue
+                with os.scandir(os.path.join(self.objects_dir, prefix)) as entries:
+                    objects.extend((prefix + entry.name, entry.stat().st_size) for entry in entries
+                                   if not entry.name.endswith(".tmp") and not entry.name.startswith("."))
+        self.catalog.rebuild(manifests, objects)
+        return len(manifests), len(objects)
+
+    # Migration
+
+    def legacy_backups(self):
+        """Old-style backups/<timestamp>_<file>.json copies, as {created: [(name, file name)]}"""
+        try:
+            names = [name for name in os.listdir(self.root) if name.endswith(".json")]
+        except FileNotFoundError:
+            return {}
+        groups = {}
+        for name in names:
+            parts = name.split("_", 2)
+            if len(parts) < 3:
+                continue
+            try:
+                created = datetime.strptime(f"{parts[0]}_{parts[1]}", LEGACY_FORMAT)
+            except ValueError:
+                continue
+            groups.setdefault(created, []).append((name, parts[2]))
+        return groups
+
+    def import_legacy(self, target_dir="public/json"):
+        """Turn old-style copies into snapshots, deleting each copy once its snapshot is written
+
+        Returns [(snapshot id, created, [copied file names])], oldest first.
+        """
+        imported = []
+        for created, members in sorted(self.legacy_backups().items()):
+            files = {}
+            for name, file_name in sorted(members):
+                with open(os.path.join(self.root, name), 'rb') as f:
+                    payload = f.read()
+                digest, _ = self.put_blob(payload)
+                files[f"{target_dir}/{file_name}"] = {"sha256": digest, "bytes": len(payload)}
+            manifest = self.write_manifest(self.new_id(created), created, files)
+            for name, _ in members:
+                os.unlink(os.path.join(self.root, name))
+            imported.append((manifest["id"], created, sorted(name for name, _ in members)))
+        return imported
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Storage and time of backups: timestamped full copies vs. the content-addressed store
+Takes N snapshots of a large synthetic news.json (and the real demos.json) in a
+scratch directory, editing one news item every `every` snapshots, and reports the
+bytes on disk, the time per snapshot and the time to restore the newest one for:
+    copies   the original backup layout, one full copy of every file per snapshot
+    store    backup_store.BackupStore, manifests over hash-named blobs and deltas
+    archive  BackupStore archives, one compressed stream per snapshot (first 100 only)
+
+Usage: python3 benchmarks/bench_backup.py [snapshots] [news items] [edit every]
+"""
+
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backup_store import BackupStore  # noqa: E402
+
+ARCHIVE_SNAPSHOTS = 100
+
+
+def make_news(count):
+    return {"news": [{
+        "id": i,
+        "title": f"SPADE release note {i}",
+        "date": "2025-01-01",
+        "category": "Release",
+        "categoryClass": "release",
+        "description": "Agents, behaviours and XMPP messaging for multi-agent systems. " * 4,
+        "image": "img/spade_index.png",
+        "link": f"https://github.com/javipalanca/spade/releases/{i}",
+    } for i in range(1, count + 1)]}
+
+
+def disk_usage(directory):
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, names in os.walk(directory) for name in names)
+
+
+def copy_snapshot(paths, backup_dir, created):
+    timestamp = created.strftime("%Y%m%d_%H%M%S")
+    for path in paths:
+        shutil.copy2(path, backup_dir / f"{timestamp}_{Path(path).name}")
+
+
+def run(snapshot, paths, news, snapshots, every):
+    """Take the snapshots, editing the news file every `every` runs; returns timings"""
+    started = datetime(2025, 1, 1)
+    samples = []
+    for n in range(snapshots):
+        if n and n % every == 0:
+            news["news"][n % len(news["news"])]["title"] += " (edited)"
+            Path(paths[0]).write_text(json.dumps(news, indent=2))
+        before = time.perf_counter()
+        snapshot(started + timedelta(hours=n))
+        samples.append(time.perf_counter() - before)
+    return samples
+
+
+def copy_restore(paths, backup_dir):
+    """The original restore: list every copy, group by timestamp, copy the newest back"""
+    by_time = {}
+    for backup_file in backup_dir.glob("*.json"):
+        by_time.setdefault(backup_file.name[:15], []).append(backup_file)
+    for backup_file in by_time[max(by_time)]:
+        shutil.copy2(backup_file, Path(paths[0]).parent / backup_file.name[16:])
+
+
+def main():
+    snapshots = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    every = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    # Compressing the whole file every time is slow; the archive numbers are per snapshot
+    archives = min(snapshots, ARCHIVE_SNAPSHOTS)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+        news_path = scratch / "news.json"
+        demos_path = scratch / "demos.json"
+        shutil.copy2(ROOT / "public" / "json" / "demos.json", demos_path)
+        paths = [str(news_path), str(demos_path)]
+        initial = json.dumps(make_news(items), indent=2)
+        print(f"news.json: {items} items, {len(initial) / 1024:.0f} KB; "
+              f"{snapshots} snapshots ({archives} archives), one item edited every {every}\n")
+        print(f"{'layout':<8}{'on disk':>12}{'total':>10}{'median':>12}{'p95':>12}{'restore':>12}")
+
+        results = {}
+        for name in ("copies", "store", "archive"):
+            news_path.write_text(initial)
+            backup_dir = scratch / name
+            backup_dir.mkdir()
+            store = BackupStore(str(backup_dir))
+            if name == "copies":
+                def snapshot(created):
+                    copy_snapshot(paths, backup_dir, created)
+
+                def restore():
+                    copy_restore(paths, backup_dir)
+            else:
+                create = store.create if name == "store" else store.create_archive
+
+                def snapshot(created):
+                    create(paths, created)
+
+                def restore():
+                    store.restore(store.snapshots()[0])
+            count = archives if name == "archive" else snapshots
+            samples = run(snapshot, paths, json.loads(initial), count, every)
+            before = time.perf_counter()
+            restore()
+            restore_time = time.perf_counter() - before
+            size = disk_usage(backup_dir)
+            results[name] = size / count
+            p95 = sorted(samples)[int(len(samples) * 0.95)]
+            print(f"{name:<8}{size / 1024 / 1024:>10.1f}MB{sum(samples):>9.2f}s"
+                  f"{statistics.median(samples) * 1000:>10.2f}ms{p95 * 1000:>10.2f}ms"
+                  f"{restore_time * 1000:>10.2f}ms")
+
+    print(f"\nPer snapshot on disk: copies {results['copies'] / 1024:.0f} KB, "
+          f"store {results['store'] / 1024:.1f} KB, archive {results['archive'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget check for the management CLIs
+Runs `backup_data.py create` and `manage_news.py validate` as fresh interpreters in a
+scratch copy of the repository and compares the median wall time above a bare
+`python -c pass` against a per-command budget. Exits with status 1 when a command
+goes over budget, so it can gate CI. Measuring the overhead above the bare
+interpreter keeps the budgets meaningful across machines.
+
+Usage: python3 benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Users' interpreters cache bytecode; without it every run would measure compiling the scripts
+ENV = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+
+# Milliseconds allowed on top of bare interpreter startup
+BUDGETS = [
+    (["backup_data.py", "create"], 60),
+    (["manage_news.py", "validate"], 90),
+]
+
+
+def make_scratch_tree(target):
+    """Copy just what the CLIs need: the scripts, the Astro marker and the content they back up"""
+    for script in ROOT.glob("*.py"):
+        shutil.copy2(script, target / script.name)
+    shutil.copy2(ROOT / "astro.config.mjs", target / "astro.config.mjs")
+    for directory in ("json", "py", "img"):
+        shutil.copytree(ROOT / "public" / directory, target / "public" / directory,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+
+
+def median_wall_time(command, cwd, runs):
+    """Median wall time of a command run as a new process"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=ENV, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+        make_scratch_tree(scratch)
+        cwd = str(scratch)
+        baseline = median_wall_time([sys.executable, "-c", "pass"], cwd, runs)
+        print(f"Bare interpreter startup: {baseline * 1000:.1f} ms (median of {runs})\n")
+        print(f"{'command':<28}{'median':>10}{'overhead':>11}{'budget':>9}")
+
+        failed = False
+        for args, budget in BUDGETS:
+            command = [sys.executable, *args]
+            # First run builds the content store; the budget is about steady-state cold starts
+            subprocess.run(command, cwd=cwd, env=ENV, check=True, stdout=subprocess.DEVNULL)
+            elapsed = median_wall_time(command, cwd, runs)
+            overhead = (elapsed - baseline) * 1000
+            status = "ok" if overhead <= budget else "OVER BUDGET"
+            failed |= overhead > budget
+            print(f"{' '.join(args):<28}{elapsed * 1000:>8.1f}ms{overhead:>9.1f}ms{budget:>7}ms  {status}")
+
+    if failed:
+        print("\n❌ Cold start regressed; run the command with --timings to see where the time goes.")
+        sys.exit(1)
+    print("\n✅ All commands within their startup budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled schema validators vs. the original hand-written ones
+Validates 100k synthetic news items and 100k synthetic demo scenarios and reports
+the time per item for:
+    legacy       the original hand-written validators (first error only)
+    interpreted  a generic walker over the same declarative schema
+    compiled     the validators generated by content_schema.compile_schema
+The full demo schema also checks the nested nodes/edges graph, which the legacy
+validator ignores, so a "top-level" compiled variant is included for a like-for-like
+comparison.
+
+Usage: python3 benchmarks/bench_validators.py [count]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_schema import (  # noqa: E402
+    DEMO_SCHEMA,
+    NEWS_SCHEMA,
+    TYPE_CHECKS,
+    compile_schema,
+    demo_item_errors,
+    news_item_errors,
+)
+
+
+def legacy_validate_news_item(item):
+    """The hand-written news validator this benchmark compares against"""
+    required_fields = ["id", "title", "date", "category", "categoryClass", "description", "image", "link"]
+    for field in required_fields:
+        if field not in item:
+            return False, f"Missing required field: {field}"
+    if not isinstance(item["id"], int):
+        return False, "ID must be an integer"
+    if not isinstance(item["title"], str) or not item["title"].strip():
+        return False, "Title must be a non-empty string"
+    if not isinstance(item["description"], str) or not item["description"].strip():
+        return False, "Description must be a non-empty string"
+    return True, "Valid"
+
+
+def legacy_validate_demo_item(item):
+    """The hand-written demo validator this benchmark compares against"""
+    required_fields = ["id", "name", "description", "agentTypes", "features"]
+    for field in required_fields:
+        if field not in item:
+            return False, f"Missing required field: {field}"
+    if not isinstance(item["id"], str) or not item["id"].strip():
+        return False, "ID must be a non-empty string"
+    if not isinstance(item["name"], str) or not item["name"].strip():
+        return False, "Name must be a non-empty string"
+    if not isinstance(item["description"], str) or not item["description"].strip():
+        return False, "Description must be a non-empty string"
+    if not isinstance(item["agentTypes"], list) or not item["agentTypes"]:
+        return False, "agentTypes must be a non-empty list"
+    if not isinstance(item["features"], list) or not item["features"]:
+        return False, "features must be a non-empty list"
+    return True, "Valid"
+
+
+TYPES = {"object": dict, "list": list, "str": str, "int": int, "number": (int, float)}
+
+
+def interpret(schema, value, path, errors):
+    """Validate by walking the schema dict on every call (what compilation avoids)"""
+    kind = schema["type"]
+    label = schema.get("label") or path or "Item"
+    if not isinstance(value, TYPES[kind]) or isinstance(value, bool):
+        errors.append(f"{label} must be {TYPE_CHECKS[kind][1]}")
+        return errors
+    if schema.get("nonempty") and not (value.strip() if kind == "str" else value):
+        errors.append(f"{label} must be a non-empty {'string' if kind == 'str' else 'list'}")
+    if kind == "object":
+        prefix = path + "." if path else ""
+        for field in schema.get("required", []):
+            if field not in value:
+                errors.append(f"Missing required field: {prefix}{field}")
+        for field, child in schema.get("properties", {}).items():
+            if field in value:
+                interpret(child, value[field], prefix + field, errors)
+    elif kind == "list" and "items" in schema:
+        for index, element in enumerate(value):
+            interpret(schema["items"], element, f"{path}[{index}]", errors)
+    return errors
+
+
+def interpreter_for(schema):
+    return lambda item: interpret(schema, item, "", [])
+
+
+def synthetic_news(count):
+    return [{
+        "id": i,
+        "title": f"News item {i}",
+        "date": "May 25, 2025",
+        "category": "Release",
+        "categoryClass": "bg-primary",
+        "description": "Synthetic description " * 5,
+        "image": "img/spade_index.png",
+        "link": "#",
+    } for i in range(count)]
+
+
+def synthetic_demos(count):
+    demos = []
+    for i in range(count):
+        nodes = [{
+            "id": f"agent{n}",
+            "type": "worker",
+            "position": {"x": 100 * n, "y": 200},
+            "behaviors": [{"type": "cyclic", "name": "Work"}],
+        } for n in range(4)]
+        edges = [{"from": "agent0", "to": f"agent{n}", "type": "task"} for n in range(1, 4)]
+        demos.append({
+            "id": f"demo{i}",
+            "name": f"Demo {i}",
+            "description": "Synthetic demo scenario",
+            "agentTypes": ["coordinator", "worker"],
+            "features": ["behaviors", "cyclic"],
+            "nodes": nodes,
+            "edges": edges,
+            "pythonFile": "simple.py",
+        })
+    return demos
+
+
+def best_of(runs, validator, items):
+    """Best wall time over several full passes"""
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        for item in items:
+            validator(item)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    top_level_demo = dict(DEMO_SCHEMA, properties={
+        field: rule for field, rule in DEMO_SCHEMA["properties"].items() if field not in ("nodes", "edges")
+    })
+    cases = (
+        ("news", synthetic_news(count), [
+            ("legacy", legacy_validate_news_item),
+            ("interpreted", interpreter_for(NEWS_SCHEMA)),
+            ("compiled", news_item_errors),
+        ]),
+        ("demos", synthetic_demos(count), [
+            ("legacy", legacy_validate_demo_item),
+            ("compiled, top-level", compile_schema(top_level_demo)),
+            ("interpreted, full graph", interpreter_for(DEMO_SCHEMA)),
+            ("compiled, full graph", demo_item_errors),
+        ]),
+    )
+    print(f"Validating {count:,} synthetic items per content type (best of 3)\n")
+    print(f"{'validator':<34}{'total':>10}{'per item':>12}")
+    for label, items, validators in cases:
+        for name, validator in validators:
+            elapsed = best_of(3, validator, items)
+            print(f"{label + ' ' + name:<34}{elapsed:>9.3f}s{elapsed / count * 1e9:>10.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
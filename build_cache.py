@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Input-hash build cache for the SPADE site
+Hashes everything the Astro build reads (src/, public/, the Astro, TypeScript and
+npm configuration) into one Merkle-style digest: every file is hashed, every
+directory hashes the sorted names and digests of its entries, and the root digest
+covers all of them. File hashes are remembered with their size and mtime in
+.spade/build-inputs.json, so only files whose metadata changed are read again.
+
+Each finished build of dist/ is kept under .spade/build-cache/<digest>/ for the
+last CACHE_SIZE distinct inputs. Builds are copied in and out, never hard-linked:
+dist/ can be written in place afterwards (a prune, a hand edit), and that must
+not change a cached build. A build whose inputs match dist/ is skipped, one
+whose inputs match a cached build is restored from it, and any cached build can be
+put back in place as a rollback.
+
+Usage: python3 build_cache.py [hash | list | rollback <hash>]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+from content_journal import atomic_write_bytes
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# What `npm run build` reads; package.json and tsconfig.json change the build as well
+INPUTS = ["src", "public", "astro.config.mjs", "package.json", "package-lock.json", "tsconfig.json"]
+DIST_DIR = os.path.join(ROOT, "dist")
+STATE_FILE = os.path.join(ROOT, ".spade", "build-inputs.json")
+CACHE_DIR = os.path.join(ROOT, ".spade", "build-cache")
+INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
+
+# Distinct builds kept for rollback
+CACHE_SIZE = 5
+CHUNK_SIZE = 1 << 16
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def save_json(path, data):
+    atomic_write_bytes(path, json.dumps(data, separators=(",", ":")).encode())
+
+
+class InputHasher:
+    """Merkle hash of the build inputs, re-reading only files whose size or mtime changed"""
+
+    def __init__(self, root=ROOT):
+        self.root = root
+        state = load_json(STATE_FILE, {})
+        self.previous = state.get("files", {})
+        # A file modified in the same instant as the last scan may have changed after it
+        self.previous_scan = state.get("scanned_ns", 0)
+        self.files = {}
+        self.rehashed = 0
+
+    def file(self, rel, st):
+        known = self.previous.get(rel)
+        if (known and known[0] == st.st_size and known[1] == st.st_mtime_ns
+                and st.st_mtime_ns < self.previous_scan):
+            digest = known[2]
+        else:
+            digest = file_digest(os.path.join(self.root, rel))
+            self.rehashed += 1
+        self.files[rel] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def tree(self, rel):
+        """Digest of a directory: its entries' names, kinds and digests, in name order"""
+        lines = []
+        with os.scandir(os.path.join(self.root, rel)) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                child = f"{rel}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name == "__pycache__":
+                        continue
+                    lines.append(f"tree {entry.name} {self.tree(child)}\n")
+                elif entry.is_file():
+                    lines.append(f"blob {entry.name} {self.file(child, entry.stat())}\n")
+        return hashlib.sha256("".join(lines).encode()).hexdigest()
+
+    def digest(self, inputs=INPUTS):
+        """Root digest of the inputs; missing ones count as absent, not as errors"""
+        scanned = time.time_ns()
+        lines = []
+        for rel in inputs:
+            path = os.path.join(self.root, rel)
+            if os.path.isdir(path):
+                lines.append(f"tree {rel} {self.tree(rel)}\n")
+            elif os.path.isfile(path):
+                lines.append(f"blob {rel} {self.file(rel, os.stat(path))}\n")
+        save_json(STATE_FILE, {"scanned_ns": scanned, "files": self.files})
+        return hashlib.sha256("".join(lines).encode()).hexdigest()
+
+
+def input_hash():
+    """(digest of the build inputs, files hashed, files re-read)"""
+    hasher = InputHasher()
+    digest = hasher.digest()
+    return digest, len(hasher.files), hasher.rehashed
+
+
+# Cached builds
+
+def load_index():
+    """{"current": digest of the build in dist/ or None, "builds": {digest: info}}"""
+    return load_json(INDEX_FILE, {"current": None, "builds": {}})
+
+
+def copy_tree(source, target):
+    """Copy a directory tree into a fresh target; the copies share no inode with the source"""
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    shutil.copytree(source, target)
+
+
+def tree_size(path):
+    files = total = 0
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            files += 1
+            total += os.path.getsize(os.path.join(dirpath, name))
+    return files, total
+
+
+def current_build(digest):
+    """Whether dist/ holds the build of these inputs"""
+    return load_index()["current"] == digest and os.path.isdir(DIST_DIR)
+
+
+def invalidate():
+    """Forget which build dist/ holds, before something rewrites it"""
+    index = load_index()
+    if index["current"] is not None:
+        index["current"] = None
+        save_json(INDEX_FILE, index)
+
+
+def store(digest, dist=DIST_DIR):
+    """Remember the build in dist as the output for digest; returns evicted digests"""
+    index = load_index()
+    target = os.path.join(CACHE_DIR, digest)
+    copy_tree(dist, f"{target}.tmp")
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.replace(f"{target}.tmp", target)
+    files, size = tree_size(target)
+    index["builds"].pop(digest, None)
+    index["builds"][digest] = {"created": datetime.now().isoformat(timespec="seconds"),
+                               "files": files, "bytes": size}
+    index["current"] = digest
+    # Oldest first, since entries are re-inserted on every store
+    evicted = list(index["builds"])[:-CACHE_SIZE]
+    for old in evicted:
+        del index["builds"][old]
+        shutil.rmtree(os.path.join(CACHE_DIR, old), ignore_errors=True)
+    save_json(INDEX_FILE, index)
+    return evicted
+
+
+def find(prefix):
+    """Full digest of the cached build starting with prefix, or None (also when ambiguous)"""
+    matches = [digest for digest in load_index()["builds"] if digest.startswith(prefix)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def restore(digest, dist=DIST_DIR):
+    """Put a cached build in place of dist, swapping whole directories"""
+    index = load_index()
+    staged, old = f"{dist}.restore", f"{dist}.old"
+    copy_tree(os.path.join(CACHE_DIR, digest), staged)
+    if os.path.exists(old):
+        shutil.rmtree(old)
+    if os.path.exists(dist):
+        os.rename(dist, old)
+    os.rename(staged, dist)
+    shutil.rmtree(old, ignore_errors=True)
+    index["current"] = digest
+    save_json(INDEX_FILE, index)
+
+
+def print_builds():
+    """List the cached builds, newest first"""
+    index = load_index()
+    if not index["builds"]:
+        print("📂 No cached builds (they are kept after every successful build)")
+        return
+    print(f"\n📂 {len(index['builds'])} cached build(s), newest first:")
+    for digest, info in reversed(index["builds"].items()):
+        marker = "  ← dist/" if digest == index["current"] else ""
+        print(f"   {digest[:12]}  {info['created'].replace('T', ' ')}  {info['files']} files, "
+              f"{info['bytes'] / 1024:.0f} KB{marker}")
+
+
+def main():
+    """Main function"""
+    os.chdir(ROOT)
+    args = sys.argv[1:]
+    if not args or args[0] == "hash":
+        started = time.perf_counter()
+        digest, files, rehashed = input_hash()
+        print(f"🔑 Build inputs {digest[:12]}: {files} files, {rehashed} re-read "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+        print("✅ dist/ is up to date" if current_build(digest) else "ℹ️ dist/ does not match the inputs")
+    elif args[0] == "list":
+        print_builds()
+    elif args[0] == "rollback" and len(args) == 2:
+        digest = find(args[1])
+        if digest is None:
+            print(f"❌ No single cached build matches '{args[1]}'")
+            sys.exit(1)
+        restore(digest)
+        print(f"⏪ dist/ is now the build of {digest[:12]}")
+    else:
+        print("Usage: python3 build_cache.py [hash | list | rollback <hash>]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Shared command registry for the SPADE management scripts
+Maps command groups (news, demos, backup, assets, deploy, budget) to the modules implementing them, so
+spade_manager.py can run them in-process instead of spawning a new interpreter.
+Modules are imported on first use and stay loaded, keeping the content store and
+validation caches warm between commands.
+
+A command module provides:
+    COMMANDS          {name: function} for one-shot commands
+    run(args)         one-shot dispatch when args are given, interactive loop otherwise
+    close()           optional; flushes pending state before the manager exits
+"""
+
+import importlib
+import time
+
+GROUPS = {
+    "news": "manage_news",
+    "demos": "manage_demos",
+    "backup": "backup_data",
+    "assets": "asset_graph",
+    "deploy": "deploy_manifest",
+    "budget": "payload_budget",
+}
+
+_loaded = {}
+
+
+def load(group):
+    """Import (once) and return the module of a command group"""
+    if group not in _loaded:
+        _loaded[group] = importlib.import_module(GROUPS[group])
+    return _loaded[group]
+
+
+def dispatch(group, args=()):
+    """Run a command group in-process; returns (ok, elapsed seconds)"""
+    started = time.perf_counter()
+    ok = True
+    try:
+        load(group).run(list(args))
+    except SystemExit as e:
+        # The scripts exit on fatal errors; that must not take the manager down
+        ok = not e.code
+    except KeyboardInterrupt:
+        print(f"\n⏹️ {group} command interrupted.")
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def close_all():
+    """Let every loaded command module flush pending state"""
+    for module in _loaded.values():
+        close = getattr(module, "close", None)
+        if close is not None:
+            close()
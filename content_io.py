@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk import/export of SPADE content (JSONL and CSV)
+Records flow through a generator pipeline (read -> decode -> assign ids -> reject
+duplicate ids -> validate)
+so that large migrations never hold more than the batch being committed.
+"""
+
+import csv
+import json
+import os
+import time
+
+# Ids are reserved from the store's sequence in blocks of this size
+ID_BLOCK_SIZE = 1024
+
+
+def file_format(path):
+    """Guess the bulk format ("jsonl" or "csv") from a file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported file type '{extension}' (use .jsonl or .csv)")
+
+
+def read_records(path):
+    """Yield (line number, raw record) pairs from a JSONL or CSV file"""
+    fmt = file_format(path)
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if fmt == "jsonl":
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            # Line 1 is the CSV header
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, row
+
+
+def decode_csv_row(row, int_fields=(), list_fields=()):
+    """Turn a CSV row of strings into a content item
+
+    Empty cells are dropped, cells holding JSON arrays/objects are decoded, numeric
+    fields become ints and list fields may also be given as comma-separated text.
+    """
+    item = {}
+    for field, value in row.items():
+        if field is None or value is None:
+            continue
+        value = value.strip()
+        if not value:
+            continue
+        if value[0] in "[{":
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                pass
+        if field in int_fields and isinstance(value, str):
+            try:
+                value = int(value)
+            except ValueError:
+                pass
+        if field in list_fields and isinstance(value, str):
+            value = [part.strip() for part in value.split(",") if part.strip()]
+        item[field] = value
+    return item
+
+
+def decode_records(records, path, int_fields=(), list_fields=()):
+    """Pipeline stage: decode CSV rows (JSONL records pass through untouched)"""
+    if file_format(path) == "jsonl":
+        yield from records
+        return
+    for line_no, row in records:
+        yield line_no, decode_csv_row(row, int_fields, list_fields)
+
+
+def explicit_ids(path, int_fields=()):
+    """Set of the ids a JSONL or CSV file gives its records itself (a first, cheap pass)"""
+    records = decode_records(read_records(path), path, int_fields=int_fields)
+    return {item["id"] for _, item in records if isinstance(item.get("id"), (int, str))}
+
+
+class IdAllocator:
+    """Hands out numeric ids from the store's sequence, reserved in blocks
+
+    Ids in `taken` (those the file gives its own records) are never handed out.
+    """
+
+    def __init__(self, store, collection, block_size=ID_BLOCK_SIZE, taken=()):
+        self.store = store
+        self.collection = collection
+        self.block_size = block_size
+        self.taken = set(taken)
+        self.available = []
+
+    def assign(self, records):
+        """Pipeline stage: give records without an id the next reserved id"""
+        for line_no, item in records:
+            if "id" not in item:
+                item["id"] = self.next_id()
+            yield line_no, item
+
+    def next_id(self):
+        while True:
+            if not self.available:
+                self.available = self.store.reserve_ids(self.collection, self.block_size)
+                self.available.reverse()
+            item_id = self.available.pop()
+            if item_id not in self.taken:
+                return item_id
+
+    def release(self):
+        """Return unused reserved ids to the sequence when nobody allocated after us"""
+        if self.available:
+            self.store.release_ids(self.collection, min(self.available), max(self.available))
+            self.available = []
+
+
+def reject_duplicates(records, errors):
+    """Pipeline stage: drop records repeating an id of an earlier record, collecting errors"""
+    seen = {}
+    for line_no, item in records:
+        item_id = item.get("id")
+        # Malformed ids are left to the validator
+        first = seen.setdefault(item_id, line_no) if isinstance(item_id, (int, str)) else line_no
+        if first != line_no:
+            errors.append((line_no, f"Duplicate id {item['id']!r} (first used on line {first})"))
+            continue
+        yield line_no, item
+
+
+def validate_records(records, validator, errors):
+    """Pipeline stage: drop invalid records, collecting (line number, error) pairs"""
+    for line_no, item in records:
+        is_valid, error = validator(item)
+        if is_valid:
+            yield item
+        else:
+            errors.append((line_no, error))
+
+
+def write_records(path, items, fields):
+    """Stream items to a JSONL or CSV file, returning the number written
+
+    CSV output uses the given columns; lists and objects are written as JSON.
+    """
+    fmt = file_format(path)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == "jsonl":
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for item in items:
+                writer.writerow({
+                    field: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+                    for field, value in item.items()
+                })
+                count += 1
+    return count
+
+
+def report_throughput(action, count, started):
+    """Print how many items were processed and at what rate"""
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"📊 {action} {count} items in {elapsed:.2f}s ({rate:,.0f} items/s)")
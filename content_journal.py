@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Write-ahead journal for the SPADE content JSON files
+Every mutation is appended as one small JSON record to a log next to the JSON file
+(e.g. public/json/news.json.journal). Readers replay the log over the last snapshot,
+and a compactor folds the log into a fresh snapshot, written atomically through a
+temporary file and a rename, once the log passes a size threshold.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import threading
+
+# Fold the journal into the snapshot once it grows past this many bytes
+COMPACT_THRESHOLD = 1024 * 1024
+
+
+def file_mode(path):
+    """Permissions for a file replacing path: its current ones, or what open() would give"""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+_temporary_ids = itertools.count()
+
+
+def open_temporary(path):
+    """Create a temporary file next to path, with the permissions path should get
+
+    Returns (fd, temporary path). Cheaper to import than tempfile, which matters
+    for the cold start of the management CLIs.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}-{next(_temporary_ids)}.tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Left behind by an earlier process that had the same pid
+            continue
+        os.fchmod(fd, file_mode(path))
+        return fd, tmp_path
+
+
+def atomic_write_bytes(path, payload):
+    """Write a file atomically: temporary file in the same directory, fsync, rename"""
+    fd, tmp_path = open_temporary(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def replay(items, records, front_default=False):
+    """Apply journal records to a list of items, returning the new list
+
+    Runs in O(len(items) + len(records)): positions are tracked with generation
+    counters and the final order is materialised once at the end.
+    """
+    values = {}
+    live = {}
+    base = []
+    front = []
+    back = []
+    # Items put right before another one: {anchor id: [(id, generation), ...]}
+    anchored = {}
+    for item in items:
+        values[item["id"]] = item
+        live[item["id"]] = 0
+        base.append((item["id"], 0))
+    generation = 0
+    for record in records:
+        op = record.get("op")
+        if op == "put":
+            item = record["item"]
+            key = item["id"]
+            if key not in values:
+                generation += 1
+                live[key] = generation
+                if record.get("before") in values:
+                    anchored.setdefault(record["before"], []).append((key, generation))
+                elif record.get("front", front_default):
+                    front.append((key, generation))
+                else:
+                    back.append((key, generation))
+            values[key] = item
+        elif op == "delete":
+            values.pop(record["id"], None)
+            live.pop(record["id"], None)
+        elif op == "replace":
+            values, live, front, back, anchored = {}, {}, [], [], {}
+            base = []
+            for item in record["items"]:
+                generation += 1
+                values[item["id"]] = item
+                live[item["id"]] = generation
+                base.append((item["id"], generation))
+    ordered = list(reversed(front)) + base + back
+    if not anchored:
+        return [values[key] for key, gen in ordered if live.get(key) == gen]
+    # Each anchor is preceded by the items put before it, even once it is deleted itself
+    result = []
+    stack = [(key, gen, False) for key, gen in reversed(ordered)]
+    while stack:
+        key, gen, expanded = stack.pop()
+        if not expanded and key in anchored:
+            stack.append((key, gen, True))
+            stack.extend((k, g, False) for k, g in reversed(anchored.pop(key)))
+        elif live.get(key) == gen:
+            result.append(values[key])
+    return result
+
+
+class ContentJournal:
+    """Snapshot + append-only journal for one JSON content file"""
+
+    def __init__(self, path, collection, threshold=COMPACT_THRESHOLD):
+        self.path = path
+        self.collection = collection
+        self.journal_path = path + ".journal"
+        self.threshold = threshold
+        self.lock = threading.RLock()
+        self.written_signature = None
+        self._compactor = None
+        self._snapshot_hash = None
+
+    def signature(self):
+        """Cheap signature of the snapshot and journal (sizes and mtimes)"""
+        parts = []
+        for path in (self.path, self.journal_path):
+            try:
+                st = os.stat(path)
+                parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+            except FileNotFoundError:
+                parts.append("-")
+        return "|".join(parts)
+
+    def pending(self):
+        """Whether there are journal records not yet folded into the snapshot"""
+        return os.path.exists(self.journal_path)
+
+    # Reading
+
+    def _read_snapshot(self):
+        with open(self.path, 'rb') as f:
+            payload = f.read()
+        self._snapshot_hash = hashlib.sha256(payload).hexdigest()
+        return json.loads(payload)
+
+    def _hash_snapshot(self):
+        with open(self.path, 'rb') as f:
+            self._snapshot_hash = hashlib.sha256(f.read()).hexdigest()
+
+    def _read_records(self):
+        """Journal records that apply to the current snapshot
+
+        A torn last line (crash mid-append) is ignored, and a journal written against
+        a different snapshot (e.g. the file was restored from a backup, or a crash hit
+        between compaction and journal removal) is discarded as stale.
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        if not records or records[0].get("op") != "base" or records[0].get("sha256") != self._snapshot_hash:
+            return None
+        return records[1:]
+
+    def load(self):
+        """Return the current document: snapshot with the journal replayed over it"""
+        with self.lock:
+            data = self._read_snapshot()
+            records = self._read_records()
+            if records is None:
+                print(f"⚠️ Ignoring stale journal {os.path.basename(self.journal_path)}")
+                os.unlink(self.journal_path)
+                records = []
+            if not records:
+                return data
+            for record in records:
+                if record.get("op") == "replace":
+                    data = {k: v for k, v in data.items() if k == self.collection}
+                    data.update(record.get("extra", {}))
+            data[self.collection] = replay(data.get(self.collection, []), records)
+            return data
+
+    # Writing
+
+    def append(self, *records):
+        """Durably append mutation records, compacting in the background when needed"""
+        with self.lock:
+            if not os.path.exists(self.journal_path):
+                # A new journal is bound to the snapshot it applies to
+                self._hash_snapshot()
+                records = ({"op": "base", "sha256": self._snapshot_hash},) + records
+            payload = b"".join(json.dumps(record).encode() + b"\n" for record in records)
+            with open(self.journal_path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self.written_signature = self.signature()
+            size = os.path.getsize(self.journal_path)
+        if size >= self.threshold:
+            self.compact_in_background()
+
+    def compact_in_background(self):
+        """Start a compaction thread unless one is already running"""
+        with self.lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            # Non-daemon so that an exiting process still finishes the snapshot
+            self._compactor = threading.Thread(target=self.compact, name=f"compact-{self.collection}")
+            self._compactor.start()
+
+    def compact(self, indent=2):
+        """Fold the journal into a fresh snapshot written atomically"""
+        with self.lock:
+            data = self.load()
+            payload = json.dumps(data, indent=indent).encode()
+            atomic_write_bytes(self.path, payload)
+            self._snapshot_hash = hashlib.sha256(payload).hexdigest()
+            # A crash before this unlink leaves a journal whose base no longer matches
+            if os.path.exists(self.journal_path):
+                os.unlink(self.journal_path)
+            self.written_signature = self.signature()
+
+    def wait(self):
+        """Wait for a running background compaction to finish"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
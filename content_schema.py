@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Declarative schemas for SPADE content (news items and demo scenarios)
+Each schema is compiled once, on first use, into a specialised Python function
+with every check inlined, so validating an item never walks the schema dict. The
+compiled validators return the full list of errors instead of stopping at the first.
+
+Schema nodes are dicts with:
+    type       "object", "list", "str", "int" or "number"
+    label      name used in error messages (defaults to the field path)
+    nonempty   strings must not be blank, lists must have at least one element
+    required   (objects) fields that must be present
+    properties (objects) schema of each known field
+    items      (lists) schema of every element
+"""
+
+import hashlib
+import json
+
+NEWS_SCHEMA = {
+    "type": "object",
+    "required": ["id", "title", "date", "category", "categoryClass", "description", "image", "link"],
+    "properties": {
+        "id": {"type": "int", "label": "ID"},
+        "title": {"type": "str", "nonempty": True, "label": "Title"},
+        "date": {"type": "str"},
+        "category": {"type": "str"},
+        "categoryClass": {"type": "str"},
+        "description": {"type": "str", "nonempty": True, "label": "Description"},
+        "image": {"type": "str"},
+        "link": {"type": "str"},
+    },
+}
+
+DEMO_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "description", "agentTypes", "features"],
+    "properties": {
+        "id": {"type": "str", "nonempty": True, "label": "ID"},
+        "name": {"type": "str", "nonempty": True, "label": "Name"},
+        "description": {"type": "str", "nonempty": True, "label": "Description"},
+        "agentTypes": {"type": "list", "nonempty": True, "items": {"type": "str"}},
+        "features": {"type": "list", "nonempty": True, "items": {"type": "str"}},
+        "pythonFile": {"type": "str", "nonempty": True},
+        "nodes": {
+            "type": "list",
+            "items": {
+                "type": "object",
+                "required": ["id", "type", "position"],
+                "properties": {
+                    "id": {"type": "str", "nonempty": True},
+                    "type": {"type": "str", "nonempty": True},
+                    "position": {
+                        "type": "object",
+                        "required": ["x", "y"],
+                        "properties": {
+                            "x": {"type": "number"},
+                            "y": {"type": "number"},
+                        },
+                    },
+                    "behaviors": {
+                        "type": "list",
+                        "items": {
+                            "type": "object",
+                            "required": ["type", "name"],
+                            "properties": {
+                                "type": {"type": "str", "nonempty": True},
+                                "name": {"type": "str", "nonempty": True},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+        "edges": {
+            "type": "list",
+            "items": {
+                "type": "object",
+                "required": ["from", "to", "type"],
+                "properties": {
+                    "from": {"type": "str", "nonempty": True},
+                    "to": {"type": "str", "nonempty": True},
+                    "type": {"type": "str", "nonempty": True},
+                },
+            },
+        },
+    },
+}
+
+# (type test, description) per schema type; bools are not accepted as numbers
+TYPE_CHECKS = {
+    "object": ("type({v}) is dict", "an object"),
+    "list": ("type({v}) is list", "a list"),
+    "str": ("type({v}) is str", "a string"),
+    "int": ("type({v}) is int", "an integer"),
+    "number": ("type({v}) in (int, float)", "a number"),
+}
+
+
+def fingerprint(schema):
+    """Stable hash of a schema, used to invalidate cached validation results"""
+    payload = json.dumps(schema, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class _Compiler:
+    """Generates the source code of a validator function for one schema"""
+
+    def __init__(self):
+        self.lines = []
+        self.counter = 0
+        self.constants = {}
+
+    def var(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def path_expr(self, path):
+        """f-string body for a field path such as nodes[{i3}].position.x"""
+        return "".join(path)
+
+    def node(self, schema, value, path, depth):
+        """Emit checks for one value; path is a list of f-string fragments"""
+        kind = schema["type"]
+        test, description = TYPE_CHECKS[kind]
+        label = schema.get("label") or self.path_expr(path) or "Item"
+        nonempty = schema.get("nonempty", False)
+        if kind == "str" and nonempty:
+            self.emit(depth, f"if not ({test.format(v=value)} and {value}.strip()):")
+            self.emit(depth + 1, f'errors.append(f"{label} must be a non-empty string")')
+            return
+        if kind == "list" and nonempty:
+            self.emit(depth, f"if not ({test.format(v=value)} and {value}):")
+            self.emit(depth + 1, f'errors.append(f"{label} must be a non-empty list")')
+        else:
+            self.emit(depth, f"if not {test.format(v=value)}:")
+            self.emit(depth + 1, f'errors.append(f"{label} must be {description}")')
+        if kind == "object":
+            self.emit(depth, "else:")
+            self.object_body(schema, value, path, depth + 1)
+        elif kind == "list" and "items" in schema:
+            index = self.var("i")
+            element = self.var("v")
+            self.emit(depth, "else:")
+            self.emit(depth + 1, f"for {index}, {element} in enumerate({value}):")
+            self.node(schema["items"], element, path + [f"[{{{index}}}]"], depth + 2)
+
+    def constant(self, value):
+        """Bind a constant into the generated function's globals"""
+        name = self.var("_C")
+        self.constants[name] = value
+        return name
+
+    def object_body(self, schema, value, path, depth):
+        prefix = self.path_expr(path) + "." if path else ""
+        properties = schema.get("properties", {})
+        required = schema.get("required", [])
+        if not required:
+            self.properties(properties, (), value, path, depth)
+            return
+        # Fast path: once every required field is known to be present, read them directly
+        present = " and ".join(f"{field!r} in {value}" for field in required)
+        self.emit(depth, f"if {present}:")
+        self.properties(properties, required, value, path, depth + 1)
+        self.emit(depth, "else:")
+        field = self.var("f")
+        self.emit(depth + 1, f"for {field} in {self.constant(tuple(required))}:")
+        self.emit(depth + 2, f"if {field} not in {value}:")
+        self.emit(depth + 3, f'errors.append(f"Missing required field: {prefix}{{{field}}}")')
+        self.properties(properties, (), value, path, depth + 1)
+
+    def properties(self, properties, present, value, path, depth):
+        """Emit checks for each property; fields in `present` are known to exist"""
+        for field, child in properties.items():
+            child_value = self.var("v")
+            if field in present:
+                self.emit(depth, f"{child_value} = {value}[{field!r}]")
+                self.node(child, child_value, path + [("." if path else "") + field], depth)
+            else:
+                self.emit(depth, f"if {field!r} in {value}:")
+                self.emit(depth + 1, f"{child_value} = {value}[{field!r}]")
+                self.node(child, child_value, path + [("." if path else "") + field], depth + 1)
+
+    def compile(self, schema, name):
+        self.emit(0, f"def {name}(item):")
+        self.emit(1, "errors = []")
+        self.node(schema, "item", [], 1)
+        self.emit(1, "return errors")
+        return "\n".join(self.lines) + "\n"
+
+
+def compile_schema(schema, name="validate"):
+    """Compile a schema into a function returning the list of errors for an item"""
+    compiler = _Compiler()
+    source = compiler.compile(schema, name)
+    namespace = dict(compiler.constants)
+    exec(compile(source, f"<schema {name}>", "exec"), namespace)
+    validator = namespace[name]
+    validator.source = source
+    validator.fingerprint = fingerprint(schema)
+    return validator
+
+
+# Compiled on first use, so a script only pays for the schemas it needs
+VALIDATORS = {
+    "news_item_errors": NEWS_SCHEMA,
+    "demo_item_errors": DEMO_SCHEMA,
+}
+
+
+def __getattr__(name):
+    if name not in VALIDATORS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    validator = globals()[name] = compile_schema(VALIDATORS[name], name)
+    return validator
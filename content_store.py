@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Indexed content store for the SPADE Astro landing page
+Keeps news items and demo scenarios in a local SQLite database with a primary-key
+index and a persisted id sequence. Every mutation is also appended to the JSON
+file's write-ahead journal (see content_journal.py); the journal is folded into the
+JSON file itself only when it is needed (build, end of an editing session) or once
+it grows past its compaction threshold.
+"""
+
+import json
+import os
+import sqlite3
+
+from content_journal import ContentJournal
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".spade")
+STORE_FILE = os.path.join(STORE_DIR, "content.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    collection TEXT NOT NULL,
+    key        NOT NULL,
+    position   INTEGER NOT NULL,
+    body       TEXT NOT NULL,
+    PRIMARY KEY (collection, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_position ON items (collection, position);
+CREATE TABLE IF NOT EXISTS sequences (
+    collection TEXT PRIMARY KEY,
+    value      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS collections (
+    collection TEXT PRIMARY KEY,
+    extra      TEXT NOT NULL,
+    source_sig TEXT
+);
+"""
+
+
+class ContentStore:
+    """SQLite-backed store of content collections ("news", "demos")"""
+
+    def __init__(self, path=STORE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.journals = {}
+        self.listeners = []
+
+    def close(self):
+        """Close the underlying database connection"""
+        for journal in self.journals.values():
+            journal.wait()
+        self.conn.close()
+
+    # Synchronisation with the JSON files
+
+    def sync_from_json(self, collection, json_file):
+        """Re-import a collection if its JSON file or journal changed outside the store
+
+        Returns True when the collection was (re)imported.
+        """
+        journal = self.journals.get(collection)
+        if journal is None:
+            journal = self.journals[collection] = ContentJournal(json_file, collection)
+        row = self.conn.execute(
+            "SELECT source_sig FROM collections WHERE collection = ?", (collection,)
+        ).fetchone()
+        signature = journal.signature()
+        if row is not None and row[0] == signature:
+            return False
+        if row is not None and signature == journal.written_signature:
+            # Our own background compaction rewrote the files; the content is unchanged
+            self._record_signature(collection)
+            return False
+        data = journal.load()
+        items = data.get(collection, [])
+        extra = {k: v for k, v in data.items() if k != collection}
+        self.replace_all(collection, items, extra, journaled=False)
+        self._record_signature(collection)
+        return True
+
+    def export_json(self, collection):
+        """Fold the collection's journal into its JSON file"""
+        journal = self.journals[collection]
+        journal.wait()
+        journal.compact()
+        self._record_signature(collection)
+
+    def is_dirty(self, collection):
+        """Whether the collection has journaled edits not yet folded into its JSON file"""
+        journal = self.journals.get(collection)
+        return journal is not None and journal.pending()
+
+    def add_listener(self, listener):
+        """Register listener(collection, changed, removed, replaced) for content changes
+
+        `changed` are the items written, `removed` the ids deleted, and `replaced` is
+        True when `changed` is now the whole collection.
+        """
+        self.listeners.append(listener)
+
+    def _notify(self, collection, changed=(), removed=(), replaced=False):
+        for listener in self.listeners:
+            listener(collection, changed, removed, replaced)
+
+    def _journal(self, collection, *records):
+        journal = self.journals.get(collection)
+        if journal is not None:
+            journal.append(*records)
+
+    def _record_signature(self, collection):
+        journal = self.journals.get(collection)
+        signature = journal.signature() if journal is not None else None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE collections SET source_sig = ? WHERE collection = ?",
+                (signature, collection),
+            )
+
+    # Collection-level operations
+
+    def replace_all(self, collection, items, extra=None, journaled=True):
+        """Replace every item of a collection, keeping the given order"""
+        items = list(items)
+        if extra is None:
+            extra = self.extra(collection)
+        if journaled:
+            self._journal(collection, {"op": "replace", "items": items, "extra": extra})
+        with self.conn:
+            self.conn.execute("DELETE FROM items WHERE collection = ?", (collection,))
+            self.conn.executemany(
+                "INSERT INTO items (collection, key, position, body) VALUES (?, ?, ?, ?)",
+                ((collection, item["id"], position, json.dumps(item))
+                 for position, item in enumerate(items)),
+            )
+            self.conn.execute(
+                "INSERT INTO collections (collection, extra) VALUES (?, ?) "
+                "ON CONFLICT (collection) DO UPDATE SET extra = excluded.extra",
+                (collection, json.dumps(extra)),
+            )
+            self._raise_sequence(collection, items)
+        if journaled:
+            self._record_signature(collection)
+        self._notify(collection, items, replaced=True)
+
+    def _raise_sequence(self, collection, items):
+        """Never hand out an id lower than one already used (inside the caller's transaction)"""
+        numeric_ids = [item["id"] for item in items if isinstance(item["id"], int)]
+        if numeric_ids:
+            self.conn.execute(
+                "INSERT INTO sequences (collection, value) VALUES (?, ?) "
+                "ON CONFLICT (collection) DO UPDATE SET value = MAX(value, excluded.value)",
+                (collection, max(numeric_ids)),
+            )
+
+    def extra(self, collection):
+        """Top-level JSON fields stored alongside a collection (e.g. demos' agentTypes)"""
+        row = self.conn.execute(
+            "SELECT extra FROM collections WHERE collection = ?", (collection,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def count(self, collection):
+        """Number of items in a collection"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM items WHERE collection = ?", (collection,)
+        ).fetchone()[0]
+
+    def items(self, collection):
+        """Iterate over the items of a collection in display order"""
+        cursor = self.conn.execute(
+            "SELECT body FROM items WHERE collection = ? ORDER BY position", (collection,)
+        )
+        for (body,) in cursor:
+            yield json.loads(body)
+
+    # Item-level operations (index lookups)
+
+    def get(self, collection, key):
+        """Return a single item by id, or None"""
+        row = self.conn.execute(
+            "SELECT body FROM items WHERE collection = ? AND key = ?", (collection, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, collection, item, front=False, before=None):
+        """Insert or update an item
+
+        Existing items keep their position; new ones go to the front or the end, or
+        right before the existing item with id `before`.
+        """
+        self.put_many(collection, [item], front=front, before=before)
+
+    def put_many(self, collection, items, front=False, before=None):
+        """Insert or update a batch of items in one transaction and one journal write
+
+        New items keep the batch order, either ahead of or after the existing ones, or
+        right before the existing item with id `before` when there is one.
+        """
+        if not items:
+            return
+        anchor = None
+        if before is not None:
+            row = self.conn.execute(
+                "SELECT position FROM items WHERE collection = ? AND key = ?", (collection, before)
+            ).fetchone()
+            anchor = row[0] if row is not None else None
+        if anchor is not None:
+            ordered = list(items)
+            records = ({"op": "put", "item": item, "before": before} for item in ordered)
+        else:
+            # Prepending one at a time, so the first item of the batch must go in last
+            ordered = list(reversed(items)) if front else list(items)
+            records = ({"op": "put", "item": item, "front": front} for item in ordered)
+        self._journal(collection, *records)
+        bound = "MIN(position) - 1" if front else "MAX(position) + 1"
+        step = -1 if front else 1
+        with self.conn:
+            if anchor is not None:
+                # Make room ahead of the anchor; positions only need to keep their order
+                self.conn.execute(
+                    "UPDATE items SET position = position + ? WHERE collection = ? AND position >= ?",
+                    (len(ordered), collection, anchor),
+                )
+                position, step = anchor, 1
+            else:
+                position = self.conn.execute(
+                    f"SELECT COALESCE({bound}, 0) FROM items WHERE collection = ?",
+                    (collection,),
+                ).fetchone()[0]
+            for item in ordered:
+                row = self.conn.execute(
+                    "SELECT position FROM items WHERE collection = ? AND key = ?",
+                    (collection, item["id"]),
+                ).fetchone()
+                if row is not None:
+                    item_position = row[0]
+                else:
+                    item_position = position
+                    position += step
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO items (collection, key, position, body) "
+                    "VALUES (?, ?, ?, ?)",
+                    (collection, item["id"], item_position, json.dumps(item)),
+                )
+            # Imported items can bring their own ids
+            self._raise_sequence(collection, items)
+        self._record_signature(collection)
+        self._notify(collection, items)
+
+    def delete(self, collection, key):
+        """Delete an item by id, returning the removed item or None"""
+        item = self.get(collection, key)
+        if item is None:
+            return None
+        self._journal(collection, {"op": "delete", "id": key})
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM items WHERE collection = ? AND key = ?", (collection, key)
+            )
+        self._record_signature(collection)
+        self._notify(collection, removed=[key])
+        return item
+
+    def next_id(self, collection):
+        """Allocate the next numeric id from the persisted sequence"""
+        return self.reserve_ids(collection, 1)[0]
+
+    def reserve_ids(self, collection, count):
+        """Allocate a block of consecutive numeric ids"""
+        with self.conn:
+            value = self.conn.execute(
+                "INSERT INTO sequences (collection, value) VALUES (?, ?) "
+                "ON CONFLICT (collection) DO UPDATE SET value = value + excluded.value "
+                "RETURNING value",
+                (collection, count),
+            ).fetchone()[0]
+        return list(range(value - count + 1, value + 1))
+
+    def release_ids(self, collection, first, last):
+        """Give back the reserved ids first..last if they are still the newest ones"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE sequences SET value = ? WHERE collection = ? AND value = ?",
+                (first - 1, collection, last),
+            )
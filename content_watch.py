@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+SPADE Content Watcher
+Watches public/json, public/py and public/img while the Astro dev server runs and,
+once a burst of changes has settled, re-runs only the derived steps the changed
+files feed:
+    news.json      validation, news shards and search index
+    demos.json     validation and search index
+    public/img     responsive variants and images.json
+    any change     hashed, precompressed copies in public/static
+Then it tells the open pages through a Server-Sent Events endpoint
+(http://localhost:35729/events) that public/js/live-reload.js listens to in
+development, so a saved edit shows up in the browser without restarting anything.
+
+Uses inotify on Linux (through ctypes, no extra package) and falls back to
+polling file sizes and mtimes elsewhere. Files the steps write themselves are
+not watched, so a run never triggers the next one.
+
+Usage: python3 content_watch.py [port]
+"""
+
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+import command_registry
+
+WATCH_DIRS = ["public/json", "public/py", "public/img"]
+# Written by the steps below; watching them would make every run trigger another
+GENERATED_DIRS = ("public/img/variants", "public/json/news", "public/json/search")
+GENERATED_FILES = ("public/json/images.json",)
+
+PORT = 35729
+# Quiet time that ends a burst of changes (an editor save is often several events)
+DEBOUNCE = 0.1
+POLL_INTERVAL = 0.25
+# Comment line sent to idle browsers, so closed connections are noticed
+KEEPALIVE = 15
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def ignored(path):
+    """Whether a change to path is of no interest: temporary, journal or generated files"""
+    name = os.path.basename(path)
+    return (name.startswith(".") or name == "__pycache__" or name.endswith((".tmp", ".journal"))
+            or path in GENERATED_FILES or path in GENERATED_DIRS
+            or path.startswith(tuple(f"{directory}/" for directory in GENERATED_DIRS)))
+
+
+def walk(directory):
+    """Yield every directory and file path under directory, skipping ignored ones"""
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [name for name in dirnames if not ignored(os.path.join(dirpath, name))]
+        yield dirpath, [os.path.join(dirpath, name) for name in filenames
+                        if not ignored(os.path.join(dirpath, name))]
+
+
+class PollingWatcher:
+    """Finds changes by comparing the size and mtime of every watched file"""
+
+    def __init__(self, dirs):
+        self.dirs = dirs
+        self.files = self.scan()
+
+    def scan(self):
+        files = {}
+        for directory in self.dirs:
+            for _, paths in walk(directory):
+                for path in paths:
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files[path] = (st.st_size, st.st_mtime_ns)
+        return files
+
+    def changes(self, timeout=None):
+        """Paths changed since the last call, waiting up to timeout seconds (None: forever)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = POLL_INTERVAL if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(POLL_INTERVAL, remaining))
+            files = self.scan()
+            changed = {path for path in files.keys() | self.files.keys()
+                       if files.get(path) != self.files.get(path)}
+            self.files = files
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watches on every watched directory, added as directories appear"""
+
+    def __init__(self, dirs):
+        import ctypes
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        for directory in dirs:
+            if os.path.isdir(directory):
+                self.add_tree(directory)
+
+    def add_tree(self, directory):
+        """Watch a directory and its subdirectories; returns the files found in them"""
+        import ctypes
+        found = []
+        for dirpath, paths in walk(directory):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {dirpath}")
+            self.watches[wd] = dirpath
+            found.extend(paths)
+        return found
+
+    def changes(self, timeout=None):
+        """Paths changed since the last call, waiting up to timeout seconds (None: forever)"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost: treat every watched file as changed
+                    for dirpath in list(self.watches.values()):
+                        changed.update(path for _, paths in walk(dirpath) for path in paths)
+                    continue
+                if wd not in self.watches or not name:
+                    continue
+                path = os.path.join(self.watches[wd], os.fsdecode(name))
+                if ignored(path):
+                    continue
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        changed.update(self.add_tree(path))
+                elif not mask & IN_CREATE:
+                    # Creation is followed by the write that matters (IN_CLOSE_WRITE)
+                    changed.add(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(dirs=WATCH_DIRS):
+    """inotify watcher on Linux, polling watcher where inotify is unavailable"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(dirs)
+        except (OSError, AttributeError):
+            # No inotify in this libc, or out of watches (fs.inotify.max_user_watches)
+            pass
+    return PollingWatcher(dirs)
+
+
+# Derived steps
+
+def refresh_group(group, function):
+    """Step running a content manager's refresh function in-process"""
+    def step():
+        return getattr(command_registry.load(group), function)()
+    return step
+
+
+def process_images():
+    from image_pipeline import process
+    process(verbose=False)
+    return True
+
+
+def publish_assets():
+    from publish_assets import publish
+    return publish()
+
+
+# (name, whether a changed path feeds it, step), in the order they must run;
+# publishing goes last because it compresses what the others write
+STEPS = [
+    ("news", lambda path: path == "public/json/news.json", refresh_group("news", "refresh_news")),
+    ("demos", lambda path: path == "public/json/demos.json", refresh_group("demos", "refresh_demos")),
+    ("images", lambda path: path.startswith("public/img/"), process_images),
+    ("publish", lambda path: True, publish_assets),
+]
+
+
+def plan_steps(changed):
+    """The steps that the changed paths feed, in running order"""
+    return [(name, step) for name, feeds, step in STEPS if any(feeds(path) for path in changed)]
+
+
+def run_steps(steps):
+    """Run steps in order; returns the names of the ones that failed"""
+    failed = []
+    for name, step in steps:
+        try:
+            ok = step()
+        except Exception as e:
+            # A broken step must not end the watch; the next save gets another try
+            print(f"❌ {name}: {e}")
+            ok = False
+        if not ok:
+            failed.append(name)
+    return failed
+
+
+# Browser notification
+
+class EventServer:
+    """Server-Sent Events endpoint broadcasting change notifications to open pages"""
+
+    def __init__(self, port=PORT):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import queue
+        self.clients = set()
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/events":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                # The pages are served by the Astro dev server, on another port
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                messages = queue.Queue()
+                with server.lock:
+                    server.clients.add(messages)
+                try:
+                    self.wfile.write(b": connected\n\n")
+                    self.wfile.flush()
+                    while True:
+                        try:
+                            message = messages.get(timeout=KEEPALIVE)
+                        except queue.Empty:
+                            message = b": keepalive\n\n"
+                        self.wfile.write(message)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server.lock:
+                        server.clients.discard(messages)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def broadcast(self, event, data):
+        """Send an event to every connected page; returns how many there were"""
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+        with self.lock:
+            for messages in self.clients:
+                messages.put(message)
+            return len(self.clients)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def watch(dirs=WATCH_DIRS, port=PORT, debounce=DEBOUNCE):
+    """Regenerate derived content on every change until interrupted"""
+    watcher = open_watcher(dirs)
+    try:
+        server = EventServer(port)
+    except OSError as e:
+        watcher.close()
+        print(f"❌ Cannot listen on port {port}: {e}")
+        return False
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"👀 Watching {', '.join(dirs)} ({kind}); pages reload through http://localhost:{port}/events")
+    print("Press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = watcher.changes()
+            started = time.perf_counter()
+            # Let the burst settle: an editor save or a restore touches several files
+            while True:
+                more = watcher.changes(debounce)
+                if not more:
+                    break
+                changed |= more
+            steps = plan_steps(changed)
+            names = [name for name, _ in steps]
+            print(f"\n🔄 {len(changed)} file(s) changed: {', '.join(sorted(changed)[:5])}"
+                  + (" ..." if len(changed) > 5 else "") + f" → {', '.join(names)}")
+            failed = run_steps(steps)
+            elapsed = time.perf_counter() - started
+            if failed:
+                server.broadcast("error", {"changed": sorted(changed), "failed": failed})
+                print(f"⚠️ {', '.join(failed)} failed after {elapsed * 1000:.0f} ms; pages were not reloaded")
+                continue
+            pages = server.broadcast("change", {"changed": sorted(changed), "steps": names})
+            print(f"⚡ Done in {elapsed * 1000:.0f} ms, {pages} page(s) reloaded")
+    except KeyboardInterrupt:
+        print("\n⏹️ Watch stopped.")
+    finally:
+        server.close()
+        watcher.close()
+        command_registry.close_all()
+    return True
+
+
+def main():
+    """Main function"""
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    if not watch(port=port):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
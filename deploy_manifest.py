@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Differential deploys of the SPADE build output
+After every build, dist/ is described by a manifest of its files (path, size and
+sha256) in .spade/dist-manifest.json. Comparing it with the manifest of what was
+deployed last gives the exact files to add, replace and delete, so a deploy only
+transfers those instead of the whole of dist/.
+
+The manifest of what was synced to a local mirror (a directory served by a web
+server, or a mounted bucket) is kept under MIRRORS_DIR, keyed by the mirror's
+path, so it is never published with the site; `sync` copies the delta into the
+mirror and writes that manifest last, so an interrupted sync is simply redone.
+For an object store, `diff <manifest> --json` prints the delta against a
+previously deployed manifest for the upload tool to act on.
+
+Usage: python3 deploy_manifest.py [manifest | diff <manifest.json> [--json] |
+                                   sync <mirror dir> [--dry-run] [--verify]]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+from build_cache import DIST_DIR, ROOT, file_digest, load_json
+from content_journal import atomic_write_bytes, open_temporary
+
+MANIFEST_FILE = os.path.join(ROOT, ".spade", "dist-manifest.json")
+# Manifests of what was deployed to each local mirror, outside the served tree
+MIRRORS_DIR = os.path.join(ROOT, ".spade", "mirrors")
+# Files listed per kind of change before the rest are summarised
+LIST_LIMIT = 20
+
+
+def describe(directory):
+    """{relative path: [bytes, sha256]} of every file under directory"""
+    files = {}
+    for dirpath, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, directory).replace(os.sep, "/")
+            files[rel] = [os.path.getsize(path), file_digest(path)]
+    return dict(sorted(files.items()))
+
+
+def save_manifest(path, files):
+    data = {"created": datetime.now().isoformat(timespec="seconds"), "files": files}
+    atomic_write_bytes(path, json.dumps(data, separators=(",", ":")).encode())
+
+
+def load_manifest(path):
+    """The files of a manifest, or None if there is none"""
+    data = load_json(path, None)
+    return None if data is None else data["files"]
+
+
+def mirror_manifest_path(mirror):
+    """Where the manifest of a mirror is kept: under MIRRORS_DIR, named after its path"""
+    key = hashlib.sha256(os.path.abspath(mirror).encode()).hexdigest()[:16]
+    return os.path.join(MIRRORS_DIR, f"{key}.json")
+
+
+def write_manifest(dist=DIST_DIR):
+    """Describe the build in dist; returns its files
+
+    Re-hashed every time rather than trusting mtimes: a build restored from the
+    cache keeps the mtimes it was built with.
+    """
+    files = describe(dist)
+    save_manifest(MANIFEST_FILE, files)
+    return files
+
+
+def compare(current, previous):
+    """(added, changed, removed, unchanged) paths going from previous to current"""
+    added, changed, unchanged = [], [], []
+    for rel, (_, digest) in current.items():
+        if rel not in previous:
+            added.append(rel)
+        elif previous[rel][1] != digest:
+            changed.append(rel)
+        else:
+            unchanged.append(rel)
+    removed = [rel for rel in previous if rel not in current]
+    return added, changed, removed, unchanged
+
+
+def format_size(size):
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def print_delta(current, previous, target):
+    """Print the delta and the bytes it saves; returns (added, changed, removed)"""
+    added, changed, removed, unchanged = compare(current, previous)
+    print(f"\n📤 Deploy to {target}: {len(added)} added, {len(changed)} changed, "
+          f"{len(removed)} removed, {len(unchanged)} unchanged")
+    for marker, paths, files in (("+", added, current), ("~", changed, current), ("-", removed, previous)):
+        for rel in paths[:LIST_LIMIT]:
+            print(f"   {marker} {rel} ({format_size(files[rel][0])})")
+        if len(paths) > LIST_LIMIT:
+            print(f"   {marker} ... and {len(paths) - LIST_LIMIT} more")
+    full = sum(size for size, _ in current.values())
+    transfer = sum(current[rel][0] for rel in added + changed)
+    saved = full - transfer
+    print(f"📊 Transfer {format_size(transfer)} of a {format_size(full)} full upload: "
+          f"{format_size(saved)} saved ({saved / full * 100 if full else 0:.1f}%)")
+    return added, changed, removed
+
+
+def manifest():
+    """Write the manifest of dist/"""
+    if not os.path.isdir(DIST_DIR):
+        print("❌ No build output in 'dist' (run the build first)")
+        return False
+    started = time.perf_counter()
+    files = write_manifest(DIST_DIR)
+    print(f"🧾 Manifest of dist/: {len(files)} files, "
+          f"{format_size(sum(size for size, _ in files.values()))} "
+          f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return True
+
+
+def diff(*args):
+    """Compare dist/ with a deployed manifest
+
+    diff <manifest.json> [--json] prints the files to upload and delete; --json
+    prints them as {"upload": [...], "delete": [...]} for an upload tool.
+    """
+    args = list(args)
+    as_json = "--json" in args
+    if as_json:
+        args.remove("--json")
+    if len(args) != 1:
+        print("Usage: diff <manifest.json> [--json]")
+        return False
+    previous = load_manifest(args[0])
+    if previous is None:
+        print(f"❌ No manifest in '{args[0]}'")
+        return False
+    if not os.path.isdir(DIST_DIR):
+        print("❌ No build output in 'dist' (run the build first)")
+        return False
+    current = write_manifest(DIST_DIR)
+    if as_json:
+        added, changed, removed, _ = compare(current, previous)
+        print(json.dumps({"upload": added + changed, "delete": removed}, indent=2))
+    else:
+        print_delta(current, previous, args[0])
+    return True
+
+
+def copy_file(source, target):
+    """Replace target with a copy of source, never leaving a partial file behind"""
+    fd, tmp = open_temporary(target)
+    try:
+        with os.fdopen(fd, 'wb') as out, open(source, 'rb') as f:
+            shutil.copyfileobj(f, out)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def remove_file(mirror, rel):
+    """Delete a file from the mirror, and the directories it leaves empty"""
+    if rel.startswith("/") or ".." in rel.split("/"):
+        # Not something sync wrote: never delete outside the mirror
+        return
+    path = os.path.join(mirror, rel)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        # Already gone: a sync interrupted before it wrote the manifest
+        pass
+    directory = os.path.dirname(path)
+    while os.path.abspath(directory) != os.path.abspath(mirror):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def sync(*args):
+    """Deploy dist/ to a local mirror, transferring only the delta
+
+    sync <mirror dir> [--dry-run] [--verify]; --verify re-hashes the mirror instead
+    of trusting its manifest, for mirrors that may have been edited by hand.
+    """
+    options = {arg for arg in args if arg.startswith("--")}
+    paths = [arg for arg in args if not arg.startswith("--")]
+    if len(paths) != 1 or options - {"--dry-run", "--verify"}:
+        print("Usage: sync <mirror dir> [--dry-run] [--verify]")
+        return False
+    mirror = paths[0]
+    if not os.path.isdir(DIST_DIR):
+        print("❌ No build output in 'dist' (run the build first)")
+        return False
+    if os.path.abspath(mirror) == DIST_DIR:
+        print("❌ The mirror cannot be dist/ itself")
+        return False
+    started = time.perf_counter()
+    current = write_manifest(DIST_DIR)
+    previous = None
+    if os.path.isdir(mirror) and "--verify" not in options:
+        previous = load_manifest(mirror_manifest_path(mirror))
+    if previous is None:
+        # First deploy, or a mirror without a manifest: find out what it holds. This
+        # also deletes the .deploy-manifest.json that older syncs kept in the mirror.
+        previous = describe(mirror) if os.path.isdir(mirror) else {}
+    added, changed, removed = print_delta(current, previous, mirror)
+    if "--dry-run" in options:
+        print("ℹ️ Dry run: the mirror was not changed")
+        return True
+    for rel in added + changed:
+        copy_file(os.path.join(DIST_DIR, rel), os.path.join(mirror, rel))
+    for rel in removed:
+        remove_file(mirror, rel)
+    # Last, so an interrupted sync is compared against what was there before it
+    save_manifest(mirror_manifest_path(mirror), current)
+    print(f"✅ {mirror} is up to date ({time.perf_counter() - started:.2f}s)")
+    return True
+
+
+COMMANDS = {
+    "manifest": manifest,
+    "diff": diff,
+    "sync": sync,
+}
+
+
+def run(args):
+    """Run a command (default: manifest)"""
+    command = args[0].lower() if args else "manifest"
+    if command in COMMANDS:
+        if not COMMANDS[command](*args[1:]):
+            sys.exit(1)
+    else:
+        print(f"❓ Unknown command: {command}")
+        print(f"Available commands: {', '.join(COMMANDS)}")
+
+
+def main():
+    """Main function"""
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+
+    run(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Persistent catalog of the images in public/img
+Keeps filename, size, mtime, content hash and dimensions of every image in the
+content store database, together with the news items that reference each image.
+The catalog is refreshed incrementally: the directory is only listed when its mtime
+changed (a file was added or removed); otherwise the known files are just stat'ed,
+and only files whose size or mtime changed are re-read.
+References follow the content store through its change listener, so "which items
+use this image" is a single indexed lookup.
+"""
+
+import hashlib
+import os
+import re
+import struct
+
+IMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public", "img")
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_files (
+    name     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256   TEXT NOT NULL,
+    width    INTEGER,
+    height   INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS image_files_sha256 ON image_files (sha256);
+CREATE TABLE IF NOT EXISTS image_refs (
+    image   TEXT NOT NULL,
+    news_id INTEGER NOT NULL,
+    PRIMARY KEY (image, news_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS image_refs_news ON image_refs (news_id);
+CREATE TABLE IF NOT EXISTS image_catalog_state (
+    key   TEXT PRIMARY KEY,
+    value
+);
+"""
+
+SVG_TAG_RE = re.compile(rb"<svg\b[^>]*>")
+SVG_ATTRIBUTE_RE = re.compile(rb'\b(width|height|viewBox)\s*=\s*"([^"]*)"')
+
+# JPEG start-of-frame markers (the ones carrying the image size)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def svg_size(path):
+    """(width, height) of an SVG from its width/height or viewBox attributes"""
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+    tag = SVG_TAG_RE.search(head)
+    if not tag:
+        return None, None
+    attributes = {name.decode(): value.decode() for name, value in SVG_ATTRIBUTE_RE.findall(tag.group())}
+    try:
+        return (round(float(attributes["width"].rstrip("px"))),
+                round(float(attributes["height"].rstrip("px"))))
+    except (KeyError, ValueError):
+        pass
+    try:
+        _, _, width, height = (float(v) for v in attributes["viewBox"].replace(",", " ").split())
+        return round(width), round(height)
+    except (KeyError, ValueError):
+        return None, None
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None, None
+        while marker[1] == 0xFF:
+            marker = marker[1:] + f.read(1)
+        code = marker[1]
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+        (length,) = struct.unpack(">H", f.read(2))
+        if code in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def image_size(path):
+    """(width, height) from the image header, without decoding the image"""
+    if path.lower().endswith(".svg"):
+        return svg_size(path)
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(head[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+        if head[:2] == b"\xff\xd8":
+            return _jpeg_size(f)
+    return None, None
+
+
+def image_name(reference):
+    """img/spade_index.png -> spade_index.png (as news items reference images)"""
+    if reference.startswith("img/"):
+        return reference[len("img/"):]
+    return reference
+
+
+class ImageCatalog:
+    """Image metadata and news references, persisted in the content store database"""
+
+    def __init__(self, conn, img_dir=IMG_DIR):
+        self.conn = conn
+        self.img_dir = img_dir
+        self.conn.executescript(SCHEMA)
+
+    def _state(self, key):
+        row = self.conn.execute("SELECT value FROM image_catalog_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO image_catalog_state (key, value) VALUES (?, ?)", (key, value))
+
+    # References
+
+    def attach(self, store, collection="news"):
+        """Follow a store's news changes, indexing every reference the first time"""
+        store.add_listener(self.content_changed)
+        if not self._state("refs_indexed"):
+            self.content_changed(collection, list(store.items(collection)), (), True)
+
+    def content_changed(self, collection, changed, removed, replaced):
+        """ContentStore listener: keep image_refs in step with the news items"""
+        if collection != "news":
+            return
+        with self.conn:
+            if replaced:
+                self.conn.execute("DELETE FROM image_refs")
+            else:
+                ids = [(key,) for key in removed] + [(item["id"],) for item in changed]
+                self.conn.executemany("DELETE FROM image_refs WHERE news_id = ?", ids)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO image_refs (image, news_id) VALUES (?, ?)",
+                ((image_name(item["image"]), item["id"]) for item in changed if item.get("image")),
+            )
+            self._set_state("refs_indexed", 1)
+
+    def users(self, name):
+        """Ids of the news items using an image"""
+        return [news_id for (news_id,) in self.conn.execute(
+            "SELECT news_id FROM image_refs WHERE image = ? ORDER BY news_id", (image_name(name),)
+        )]
+
+    # Files
+
+    def refresh(self):
+        """Re-read the files that changed since the last refresh; returns (updated, removed)"""
+        try:
+            dir_mtime = os.stat(self.img_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+
+        known = {name: (size, mtime) for name, size, mtime in
+                 self.conn.execute("SELECT name, size, mtime_ns FROM image_files")}
+        seen = set()
+        updated = []
+        if dir_mtime is not None and dir_mtime == self._state("dir_mtime_ns"):
+            # No file was added or removed, but one may have been overwritten in place
+            # (an upload replacing an image, an image editor), which leaves the
+            # directory mtime alone: stat the known files without listing the directory
+            for name, stats in known.items():
+                path = os.path.join(self.img_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                seen.add(name)
+                if stats != (st.st_size, st.st_mtime_ns):
+                    updated.append(self._read(name, path, st))
+        elif dir_mtime is not None:
+            with os.scandir(self.img_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.lower().endswith(IMAGE_SUFFIXES):
+                        continue
+                    st = entry.stat()
+                    seen.add(entry.name)
+                    if known.get(entry.name) != (st.st_size, st.st_mtime_ns):
+                        updated.append(self._read(entry.name, entry.path, st))
+        removed = [(name,) for name in known if name not in seen]
+        if not updated and not removed and dir_mtime == self._state("dir_mtime_ns"):
+            return 0, 0
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO image_files VALUES (?, ?, ?, ?, ?, ?)", updated)
+            self.conn.executemany("DELETE FROM image_files WHERE name = ?", removed)
+            self._set_state("dir_mtime_ns", dir_mtime)
+        return len(updated), len(removed)
+
+    @staticmethod
+    def _read(name, path, st):
+        """Catalog row of an image file"""
+        width, height = image_size(path)
+        return (name, st.st_size, st.st_mtime_ns, file_sha256(path), width, height)
+
+    def images(self):
+        """All catalogued images as (name, size, width, height), sorted by name"""
+        self.refresh()
+        return self.conn.execute(
+            "SELECT name, size, width, height FROM image_files ORDER BY name"
+        ).fetchall()
+
+    def names(self):
+        return [name for name, _, _, _ in self.images()]
+
+    def find_by_hash(self, sha256):
+        """Name of a catalogued image with the given content hash, if any"""
+        self.refresh()
+        row = self.conn.execute("SELECT name FROM image_files WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+        return row[0] if row else None
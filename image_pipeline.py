@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+SPADE Image Pipeline
+Generates responsive variants of the images in public/img: every raster image is
+resized to a few standard widths and encoded as WebP (and AVIF when the installed
+Pillow supports it) under public/img/variants/. Variant files are named after the
+content hash of their source, so identical images share one set of variants, and
+public/json/images.json records width, height and bytes of every image and variant
+for building srcset attributes.
+
+Resizing and encoding run in a process pool. Images whose size and mtime did not
+change since the last run are not even read, so re-running on unchanged inputs
+rewrites nothing.
+
+Requires the optional 'Pillow' package for variants; without it only byte sizes
+(and SVG dimensions) are recorded.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from image_catalog import IMAGE_SUFFIXES, file_sha256, svg_size
+
+ROOT = Path(__file__).resolve().parent
+PUBLIC_DIR = ROOT / "public"
+IMG_DIR = PUBLIC_DIR / "img"
+VARIANTS_DIR = IMG_DIR / "variants"
+MANIFEST_FILE = PUBLIC_DIR / "json" / "images.json"
+STATE_FILE = ROOT / ".spade" / "image-state.json"
+
+# Animated GIFs and vector images are served as they are
+RESIZABLE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+
+WIDTHS = (480, 960, 1440)
+QUALITY = {"webp": 80, "avif": 60}
+HASH_LENGTH = 12
+
+
+def available_formats():
+    """Modern formats the installed Pillow can encode ([] without Pillow)"""
+    try:
+        from PIL import features
+    except ImportError:
+        return []
+    return [fmt for fmt in ("webp", "avif") if features.check(fmt)]
+
+
+def variant_name(digest, width, fmt):
+    return f"{digest[:HASH_LENGTH]}-{width}.{fmt}"
+
+
+def render_job(job):
+    """Worker: measure one image and write its missing variants
+
+    Returns (width, height, variants).
+    """
+    source, digest, formats = job
+    source = Path(source)
+    if source.suffix.lower() == ".svg":
+        width, height = svg_size(source)
+        return width, height, []
+    if not formats:
+        return None, None, []
+
+    from PIL import Image
+
+    with Image.open(source) as image:
+        width, height = image.size
+        if source.suffix.lower() not in RESIZABLE_SUFFIXES:
+            return width, height, []
+        targets = [w for w in WIDTHS if w < width] + [width]
+        variants = []
+        for target in targets:
+            target_height = max(1, round(height * target / width))
+            resized = None
+            for fmt in formats:
+                # Full-size copies in the source's own format would just duplicate it
+                if target == width and source.suffix.lower() == f".{fmt}":
+                    continue
+                path = VARIANTS_DIR / variant_name(digest, target, fmt)
+                if not path.exists():
+                    if resized is None:
+                        resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+                        if resized.mode not in ("RGB", "RGBA"):
+                            resized = resized.convert("RGBA")
+                    tmp_path = path.with_name(f".{path.name}.tmp")
+                    resized.save(tmp_path, format=fmt.upper(), quality=QUALITY[fmt])
+                    os.replace(tmp_path, path)
+                variants.append({
+                    "path": path.relative_to(PUBLIC_DIR).as_posix(),
+                    "format": fmt,
+                    "width": target,
+                    "height": target_height,
+                    "bytes": path.stat().st_size,
+                })
+    return width, height, variants
+
+
+def find_images():
+    """Yield (logical name, path) for every image in public/img (variants excluded)"""
+    if not IMG_DIR.exists():
+        return
+    for path in sorted(IMG_DIR.iterdir()):
+        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES:
+            yield path.relative_to(PUBLIC_DIR).as_posix(), path
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def variants_exist(entry):
+    return all((PUBLIC_DIR / variant["path"]).exists() for variant in entry["variants"])
+
+
+def write_if_changed(path, payload):
+    """Write a file only when its content changes; returns True if it was written"""
+    try:
+        if path.read_bytes() == payload:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+    return True
+
+
+def process(workers=None, verbose=True):
+    """Bring variants and the manifest up to date with public/img; returns the manifest"""
+    started = time.perf_counter()
+    formats = available_formats()
+    state = load_state()
+    # Variants made with other encoders (e.g. before Pillow was installed) are outdated
+    previous = state.get("files", {}) if state.get("formats") == formats else {}
+    images = {}
+    new_state = {}
+    jobs = []
+    by_hash = {}
+    reused = 0
+
+    for logical, path in find_images():
+        st = path.stat()
+        signature = [st.st_size, st.st_mtime_ns]
+        known = previous.get(logical)
+        if known and known["stat"] == signature and variants_exist(known["entry"]):
+            images[logical] = known["entry"]
+            new_state[logical] = known
+            reused += 1
+            continue
+        digest = file_sha256(path)
+        entry = {"sha256": digest, "bytes": st.st_size}
+        images[logical] = entry
+        new_state[logical] = {"stat": signature, "entry": entry}
+        # Identical content under another name is only rendered once
+        if digest not in by_hash:
+            by_hash[digest] = []
+            jobs.append((str(path), digest, formats))
+        by_hash[digest].append(entry)
+
+    if jobs:
+        VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+        if len(jobs) == 1:
+            results = [render_job(jobs[0])]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(render_job, jobs))
+        for (source, digest, _), (width, height, variants) in zip(jobs, results):
+            for entry in by_hash[digest]:
+                entry.update(width=width, height=height, variants=variants)
+            if verbose:
+                saved = ", ".join(f"{v['width']}w {v['format']} {v['bytes']}" for v in variants)
+                print(f"🖼️ {Path(source).name}: {width}x{height}" + (f" → {saved}" if saved else ""))
+
+    # Drop variants no current image refers to
+    live = {variant["path"] for entry in images.values() for variant in entry["variants"]}
+    removed = 0
+    if VARIANTS_DIR.exists():
+        for path in VARIANTS_DIR.iterdir():
+            if path.is_file() and path.relative_to(PUBLIC_DIR).as_posix() not in live:
+                path.unlink()
+                removed += 1
+
+    manifest = {"images": images}
+    write_if_changed(MANIFEST_FILE, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    write_if_changed(STATE_FILE, json.dumps({"formats": formats, "files": new_state}).encode())
+
+    if verbose:
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ {len(images)} images: {len(jobs)} processed, {reused} unchanged, "
+              f"{removed} stale variants removed ({elapsed:.2f}s)")
+        if not formats:
+            print("ℹ️ Install the 'Pillow' package to generate responsive WebP/AVIF variants.")
+    return manifest
+
+
+def add_image(source, filename):
+    """Store an image in public/img and generate its variants; returns its manifest entry
+
+    SVGs are minified on arrival.
+    """
+    import shutil
+    dest = IMG_DIR / filename
+    IMG_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, dest)
+    if dest.suffix.lower() == ".svg":
+        from svg_minify import minify_files
+        minify_files([str(dest)])
+    return process()["images"][dest.relative_to(PUBLIC_DIR).as_posix()]
+
+
+def main():
+    """Main function"""
+    print("🖼️ SPADE Image Pipeline")
+    print("=" * 30)
+
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+
+    process()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,56 +4,71 @@ Script to manage interactive demo scenarios for the SPADE Astro landing page
 This script allows you to define new demo scenarios that will be added to the landing page.
 """
 
+import sys
+
+# Must run before the other imports so --timings can measure them
+import startup_timings
+startup_timings.enable_from_argv()
+
 import json
 import os
-import sys
-from datetime import datetime
+import time
+
+from content_schema import demo_item_errors
+from content_store import ContentStore
+from validation_cache import ValidationCache
 
 def validate_demo_item(item):
-    """Validate a demo item structure"""
-    required_fields = ["id", "name", "description", "agentTypes", "features"]
-    for field in required_fields:
-        if field not in item:
-            return False, f"Missing required field: {field}"
-    
-    # Validate types
-    if not isinstance(item["id"], str) or not item["id"].strip():
-        return False, "ID must be a non-empty string"
-    if not isinstance(item["name"], str) or not item["name"].strip():
-        return False, "Name must be a non-empty string"
-    if not isinstance(item["description"], str) or not item["description"].strip():
-        return False, "Description must be a non-empty string"
-    if not isinstance(item["agentTypes"], list) or not item["agentTypes"]:
-        return False, "agentTypes must be a non-empty list"
-    if not isinstance(item["features"], list) or not item["features"]:
-        return False, "features must be a non-empty list"
-    
+    """Validate a demo item structure against the compiled DEMO_SCHEMA
+
+    All problems are reported, joined with "; ".
+    """
+    errors = demo_item_errors(item)
+    if errors:
+        return False, "; ".join(errors)
     return True, "Valid"
 
-def validate_demos_data(data):
-    """Validate the entire demos data structure"""
+def validate_demos_data(data, cache=None):
+    """Validate the entire demos data structure
+
+    With a ValidationCache, only items that are new or changed are re-checked.
+    """
     if "demos" not in data:
         return False, "Missing 'demos' field in data"
     if not isinstance(data["demos"], list):
         return False, "'demos' must be a list"
     
+    check = cache.check if cache is not None else validate_demo_item
     for i, item in enumerate(data["demos"]):
-        is_valid, error = validate_demo_item(item)
+        is_valid, error = check(item)
         if not is_valid:
+            if cache is not None:
+                cache.flush()
             return False, f"Demo {i+1}: {error}"
     
+    if cache is not None:
+        cache.flush(prune=True)
     return True, "Valid"
 
+DEMO_FIELDS = ["id", "name", "description", "agentTypes", "features", "nodes", "edges", "pythonFile"]
+
 # Updated path for Astro structure
 DEMOS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
                          "public", "json", "demos.json")
 
-def load_demos():
-    """Load the current demo scenarios"""
-    try:
-        with open(DEMOS_FILE, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+_store = None
+_validation_cache = None
+_search_index = None
+
+def get_store():
+    """Open the content store, re-importing demos.json if it changed on disk"""
+    global _store, _search_index
+    if _store is None:
+        from search_index import SearchIndex
+        _store = ContentStore()
+        _search_index = SearchIndex(_store.conn)
+        _search_index.attach(_store, "demos")
+    if not os.path.exists(DEMOS_FILE):
         # Create initial demo scenarios
         default_demos = {
             "demos": [
@@ -85,40 +100,159 @@ def load_demos():
         # Save the default demos
         with open(DEMOS_FILE, 'w') as f:
             json.dump(default_demos, f, indent=2)
-        return default_demos
+    try:
+        _store.sync_from_json("demos", DEMOS_FILE)
     except json.JSONDecodeError:
         print("Error: Demos file is corrupted.")
         sys.exit(1)
+    return _store
+
+def get_validation_cache():
+    """Validation results for demos items, persisted in the content store"""
+    global _validation_cache
+    if _validation_cache is None:
+        _validation_cache = ValidationCache(
+            get_store().conn, "demos", validate_demo_item, rules=demo_item_errors.fingerprint
+        )
+    return _validation_cache
+
+def load_demos():
+    """Load the current demo scenarios"""
+    store = get_store()
+    data = {"demos": list(store.items("demos"))}
+    data.update(store.extra("demos"))
+    return data
 
 def save_demos(data):
-    """Save demo scenarios to file"""
+    """Save demo scenarios to the content store"""
     # Validate data before saving
-    is_valid, error = validate_demos_data(data)
+    is_valid, error = validate_demos_data(data, get_validation_cache())
     if not is_valid:
         print(f"Error: Cannot save invalid data - {error}")
         return False
     
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(DEMOS_FILE), exist_ok=True)
     try:
-        with open(DEMOS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        extra = {k: v for k, v in data.items() if k != "demos"}
+        get_store().replace_all("demos", data["demos"], extra)
+        print("Demo scenarios saved successfully.")
+        print("Note: demos.json is updated when you exit the manager, run 'export' or build.")
+        return True
+    except Exception as e:
+        print(f"Error saving demos: {e}")
+        return False
+
+def save_demo_item(item, before=None):
+    """Save a single demo scenario to the content store
+
+    A new scenario goes to the end, or right before the scenario with id `before`.
+    """
+    cache = get_validation_cache()
+    is_valid, error = cache.check(item)
+    cache.flush()
+    if not is_valid:
+        print(f"Error: Cannot save invalid data - {error}")
+        return False
+    
+    try:
+        get_store().put("demos", item, before=before)
         print("Demo scenarios saved successfully.")
-        print("Note: Restart the Astro dev server to see changes in the browser.")
+        print("Note: demos.json is updated when you exit the manager, run 'export' or build.")
         return True
     except Exception as e:
-        print(f"Error saving file: {e}")
+        print(f"Error saving demos: {e}")
         return False
 
+def export_demos(path=None):
+    """Export demo scenarios to demos.json, or stream them to a JSONL/CSV file"""
+    store = get_store()
+    if path is None:
+        try:
+            store.export_json("demos")
+            print(f"✅ Exported {store.count('demos')} demo scenarios to {DEMOS_FILE}")
+            write_derived()
+            print("Note: Reload the page to see changes ('spade_manager.py watch' reloads it for you).")
+            return True
+        except Exception as e:
+            print(f"Error saving file: {e}")
+            return False
+    
+    import content_io
+    started = time.perf_counter()
+    try:
+        count = content_io.write_records(path, store.items("demos"), DEMO_FIELDS)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error exporting demos: {e}")
+        return False
+    print(f"✅ Exported {count} demo scenarios to {path}")
+    content_io.report_throughput("Exported", count, started)
+    return True
+
+def write_derived():
+    """Bring the search index up to date with the content store"""
+    get_store()
+    written, removed = _search_index.flush()
+    print(f"🔎 Search index: {written} shards written, {removed} removed")
+
+def refresh_demos():
+    """Re-read demos.json after an outside edit, validate it and rebuild its search index"""
+    try:
+        data = load_demos()
+        is_valid, error = validate_demos_data(data, get_validation_cache())
+        if not is_valid:
+            print(f"❌ Demos file is invalid: {error}")
+            return False
+        write_derived()
+        return True
+    except Exception as e:
+        print(f"❌ Error refreshing demos: {e}")
+        return False
+
+def import_demos(path=None):
+    """Bulk import demo scenarios from a JSONL or CSV file in a single commit"""
+    if path is None:
+        path = input("Enter the JSONL or CSV file to import: ").strip()
+    if not os.path.exists(path):
+        print(f"❌ Error: File {path} does not exist.")
+        return False
+    
+    import content_io
+    store = get_store()
+    started = time.perf_counter()
+    cache = get_validation_cache()
+    errors = []
+    batch = {}
+    try:
+        records = content_io.read_records(path)
+        records = content_io.decode_records(records, path, list_fields=("agentTypes", "features"))
+        records = content_io.reject_duplicates(records, errors)
+        for item in content_io.validate_records(records, cache.check, errors):
+            batch[item["id"]] = item
+    except (OSError, ValueError) as e:
+        # json.JSONDecodeError is a ValueError
+        print(f"❌ Error reading {path}: {e}")
+        return False
+    
+    cache.flush()
+    for line_no, error in errors[:10]:
+        print(f"⚠️ Line {line_no}: {error}")
+    if len(errors) > 10:
+        print(f"⚠️ ... and {len(errors) - 10} more invalid records")
+    
+    store.put_many("demos", list(batch.values()))
+    print(f"✅ Imported {len(batch)} demo scenarios ({len(errors)} skipped)")
+    content_io.report_throughput("Imported", len(batch) + len(errors), started)
+    print("Note: demos.json is updated when you exit the manager, run 'export' or build.")
+    return True
+
 def list_demos():
     """List all demo scenarios"""
-    data = load_demos()
-    if not data["demos"]:
+    store = get_store()
+    if not store.count("demos"):
         print("No demo scenarios found.")
         return
     
     print("\n=== Current Demo Scenarios ===")
-    for idx, item in enumerate(data["demos"], 1):
+    for idx, item in enumerate(store.items("demos"), 1):
         print(f"{idx}. {item['name']} (ID: {item['id']})")
         print(f"   Description: {item['description']}")
         print(f"   Agent Types: {', '.join(item['agentTypes'])}")
@@ -126,13 +260,13 @@ def list_demos():
 
 def add_demo():
     """Add a new demo scenario"""
-    data = load_demos()
+    store = get_store()
     
     # Get user input for the new demo
     demo_id = input("Enter demo ID (lowercase, no spaces): ").strip().lower()
     
     # Check if the ID already exists
-    if any(demo['id'] == demo_id for demo in data["demos"]):
+    if store.get("demos", demo_id) is not None:
         print(f"Error: A demo with ID '{demo_id}' already exists.")
         return
     
@@ -159,72 +293,67 @@ def add_demo():
         "features": features
     }
     
-    # Add to data and save
-    data["demos"].append(new_demo)
-    save_demos(data)
-    print(f"Demo scenario '{name}' added successfully.")
+    # Add to the end and save
+    if save_demo_item(new_demo):
+        print(f"Demo scenario '{name}' added successfully.")
 
 def remove_demo():
     """Remove a demo scenario"""
-    data = load_demos()
+    store = get_store()
     list_demos()
     
-    if not data["demos"]:
+    if not store.count("demos"):
         return
     
     try:
         demo_id = input("\nEnter the ID of the demo to remove: ").strip()
         
-        # Find the demo with the specified ID
-        for i, demo in enumerate(data["demos"]):
-            if demo["id"] == demo_id:
-                removed = data["demos"].pop(i)
-                save_demos(data)
-                print(f"Demo '{removed['name']}' removed successfully.")
-                return
-        
-        print(f"Error: No demo found with ID '{demo_id}'.")
+        removed = store.delete("demos", demo_id)
+        if removed is None:
+            print(f"Error: No demo found with ID '{demo_id}'.")
+            return
+        print(f"Demo '{removed['name']}' removed successfully.")
+        print("Note: demos.json is updated when you exit the manager, run 'export' or build.")
     except (ValueError, IndexError):
         print("Invalid selection. Please try again.")
 
 def edit_demo():
     """Edit an existing demo scenario"""
-    data = load_demos()
+    store = get_store()
     list_demos()
     
-    if not data["demos"]:
+    if not store.count("demos"):
         return
     
     try:
         demo_id = input("\nEnter the ID of the demo to edit: ").strip()
         
-        # Find the demo with the specified ID
-        for i, demo in enumerate(data["demos"]):
-            if demo["id"] == demo_id:
-                print(f"\nEditing demo: {demo['name']}")
-                
-                # Get updated values
-                name = input(f"Enter new name [{demo['name']}]: ").strip()
-                if name:
-                    demo['name'] = name
-                
-                desc = input(f"Enter new description [{demo['description']}]: ").strip()
-                if desc:
-                    demo['description'] = desc
-                
-                agents = input(f"Enter new agent types (comma-separated) [{', '.join(demo['agentTypes'])}]: ").strip()
-                if agents:
-                    demo['agentTypes'] = [a.strip() for a in agents.split(",")]
-                
-                features = input(f"Enter new features (comma-separated) [{', '.join(demo['features'])}]: ").strip()
-                if features:
-                    demo['features'] = [f.strip() for f in features.split(",")]
-                
-                save_demos(data)
-                print(f"Demo '{demo['name']}' updated successfully.")
-                return
+        demo = store.get("demos", demo_id)
+        if demo is None:
+            print(f"Error: No demo found with ID '{demo_id}'.")
+            return
+        
+        print(f"\nEditing demo: {demo['name']}")
+        
+        # Get updated values
+        name = input(f"Enter new name [{demo['name']}]: ").strip()
+        if name:
+            demo['name'] = name
+        
+        desc = input(f"Enter new description [{demo['description']}]: ").strip()
+        if desc:
+            demo['description'] = desc
         
-        print(f"Error: No demo found with ID '{demo_id}'.")
+        agents = input(f"Enter new agent types (comma-separated) [{', '.join(demo['agentTypes'])}]: ").strip()
+        if agents:
+            demo['agentTypes'] = [a.strip() for a in agents.split(",")]
+        
+        features = input(f"Enter new features (comma-separated) [{', '.join(demo['features'])}]: ").strip()
+        if features:
+            demo['features'] = [f.strip() for f in features.split(",")]
+        
+        if save_demo_item(demo):
+            print(f"Demo '{demo['name']}' updated successfully.")
     except (ValueError, IndexError):
         print("Invalid selection. Please try again.")
 
@@ -232,14 +361,19 @@ def validate_demos_file():
     """Validate the current demos file"""
     try:
         data = load_demos()
-        is_valid, error = validate_demos_data(data)
+        cache = get_validation_cache()
+        cache.reset_stats()
+        is_valid, error = validate_demos_data(data, cache)
         if is_valid:
             print("✅ Demos file is valid!")
             print(f"Found {len(data['demos'])} demo scenarios.")
         else:
             print(f"❌ Demos file is invalid: {error}")
+        print(f"🔁 Revalidated {cache.misses} items, {cache.hits} served from cache")
+        return is_valid
     except Exception as e:
         print(f"❌ Error validating demos file: {e}")
+        return False
 
 def print_help():
     """Print help information"""
@@ -251,46 +385,80 @@ def print_help():
     print("  remove   - Remove a demo scenario")
     print("  edit     - Edit an existing demo scenario")
     print("  validate - Validate the demos file structure")
+    print("  import   - Bulk import demo scenarios from a JSONL/CSV file")
+    print("  export   - Write pending changes to demos.json (or a JSONL/CSV file)")
+    print("  refresh  - Rebuild the search index after editing demos.json by hand")
     print("  help     - Show this help message")
-    print("  exit     - Exit the program")
+    print("  exit     - Exit the program (exports pending changes)")
     print()
-    print("Note: After making changes, restart the Astro dev server to see updates.")
+    print("Note: After exporting, reload the page (or keep 'spade_manager.py watch' running).")
 
-def main():
-    """Main function"""
-    print("SPADE Astro Interactive Demo Manager")
-    print("====================================")
-    
-    # Check if we're in the right directory
-    if not os.path.exists("astro.config.mjs"):
-        print("Error: This script should be run from the repository root directory.")
-        print("Current directory:", os.getcwd())
-        print("Please navigate to the repository root folder and run this script again.")
-        sys.exit(1)
+COMMANDS = {
+    "list": list_demos,
+    "add": add_demo,
+    "remove": remove_demo,
+    "edit": edit_demo,
+    "validate": validate_demos_file,
+    "import": import_demos,
+    "export": export_demos,
+    "refresh": refresh_demos,
+    "help": print_help,
+}
+
+def run(args):
+    """Run a one-shot command when args are given, the interactive loop otherwise"""
+    # Create the demos file if it doesn't exist and sync the content store
+    with startup_timings.phase("content store sync"):
+        get_store()
     
-    # Create the demos file if it doesn't exist
-    load_demos()
+    if args:
+        command = args[0].lower()
+        if command in COMMANDS:
+            # Edits stay in the journal; 'export', 'exit' and builds write the JSON file
+            with startup_timings.phase(f"command: {command}"):
+                result = COMMANDS[command](*args[1:])
+            if result is False:
+                # Lets scripts and CI stop on invalid content
+                sys.exit(1)
+        else:
+            print(f"Unknown command: {command}")
+            print(f"Available commands: {', '.join(COMMANDS)}")
+        return
     
     while True:
-        command = input("\nEnter command (list, add, remove, edit, validate, help, exit): ").strip().lower()
+        command = input("\nEnter command (list, add, remove, edit, validate, import, export, refresh, help, exit): ").strip().lower()
         
-        if command == "list":
-            list_demos()
-        elif command == "add":
-            add_demo()
-        elif command == "remove":
-            remove_demo()
-        elif command == "edit":
-            edit_demo()
-        elif command == "validate":
-            validate_demos_file()
-        elif command == "help":
-            print_help()
+        if command in COMMANDS:
+            COMMANDS[command]()
         elif command == "exit":
+            close()
             print("Goodbye!")
             break
         else:
             print("Unknown command. Type 'help' for available commands.")
 
+def close():
+    """Export pending changes to demos.json"""
+    if _store is not None and _store.is_dirty("demos"):
+        export_demos()
+
+def main():
+    """Main function"""
+    args = sys.argv[1:]
+    # One-shot commands are scripted; only greet interactive users
+    if not args:
+        print("SPADE Astro Interactive Demo Manager")
+        print("====================================")
+    
+    # Check if we're in the right directory
+    with startup_timings.phase("environment check"):
+        if not os.path.exists("astro.config.mjs"):
+            print("Error: This script should be run from the repository root directory.")
+            print("Current directory:", os.getcwd())
+            print("Please navigate to the repository root folder and run this script again.")
+            sys.exit(1)
+    
+    run(args)
+
 if __name__ == "__main__":
     main()
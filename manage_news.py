@@ -3,106 +3,263 @@
 Script to manage news items for the SPADE Astro landing page
 """
 
+import sys
+
+# Must run before the other imports so --timings can measure them
+import startup_timings
+startup_timings.enable_from_argv()
+
 import json
 import os
-import sys
+import time
 from datetime import datetime
 
+from content_schema import news_item_errors
+from content_store import ContentStore
+from validation_cache import ValidationCache
+
 def validate_news_item(item):
-    """Validate a news item structure"""
-    required_fields = ["id", "title", "date", "category", "categoryClass", "description", "image", "link"]
-    for field in required_fields:
-        if field not in item:
-            return False, f"Missing required field: {field}"
-    
-    # Validate types
-    if not isinstance(item["id"], int):
-        return False, "ID must be an integer"
-    if not isinstance(item["title"], str) or not item["title"].strip():
-        return False, "Title must be a non-empty string"
-    if not isinstance(item["description"], str) or not item["description"].strip():
-        return False, "Description must be a non-empty string"
-    
+    """Validate a news item structure against the compiled NEWS_SCHEMA
+
+    All problems are reported, joined with "; ".
+    """
+    errors = news_item_errors(item)
+    if errors:
+        return False, "; ".join(errors)
     return True, "Valid"
 
-def validate_news_data(data):
-    """Validate the entire news data structure"""
+def validate_news_data(data, cache=None):
+    """Validate the entire news data structure
+
+    With a ValidationCache, only items that are new or changed are re-checked.
+    """
     if "news" not in data:
         return False, "Missing 'news' field in data"
     if not isinstance(data["news"], list):
         return False, "'news' must be a list"
     
+    check = cache.check if cache is not None else validate_news_item
     for i, item in enumerate(data["news"]):
-        is_valid, error = validate_news_item(item)
+        is_valid, error = check(item)
         if not is_valid:
+            if cache is not None:
+                cache.flush()
             return False, f"Item {i+1}: {error}"
     
+    if cache is not None:
+        cache.flush(prune=True)
     return True, "Valid"
 
+NEWS_FIELDS = ["id", "title", "date", "category", "categoryClass", "description", "image", "link"]
+
 # Updated path for Astro structure
 NEWS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
                          "public", "json", "news.json")
 
-def load_news():
-    """Load the current news items"""
-    try:
-        with open(NEWS_FILE, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+_store = None
+_validation_cache = None
+_search_index = None
+_image_catalog = None
+
+def get_store():
+    """Open the content store, re-importing news.json if it changed on disk"""
+    global _store, _search_index, _image_catalog
+    if _store is None:
+        from image_catalog import ImageCatalog
+        from search_index import SearchIndex
+        _store = ContentStore()
+        _search_index = SearchIndex(_store.conn)
+        _search_index.attach(_store, "news")
+        _image_catalog = ImageCatalog(_store.conn)
+        _image_catalog.attach(_store, "news")
+    if not os.path.exists(NEWS_FILE):
         # Create default news structure
-        default_news = {"news": []}
-        # Ensure directory exists
         os.makedirs(os.path.dirname(NEWS_FILE), exist_ok=True)
-        # Save the default news
         with open(NEWS_FILE, 'w') as f:
-            json.dump(default_news, f, indent=2)
-        return default_news
+            json.dump({"news": []}, f, indent=2)
+    try:
+        _store.sync_from_json("news", NEWS_FILE)
     except json.JSONDecodeError:
         print("Error: News file is corrupted.")
         sys.exit(1)
+    return _store
+
+def get_validation_cache():
+    """Validation results for news items, persisted in the content store"""
+    global _validation_cache
+    if _validation_cache is None:
+        _validation_cache = ValidationCache(
+            get_store().conn, "news", validate_news_item, rules=news_item_errors.fingerprint
+        )
+    return _validation_cache
+
+def get_image_catalog():
+    """Catalog of the images in public/img and the news items using them"""
+    get_store()
+    return _image_catalog
+
+def print_image_choices():
+    """Print the numbered list of images offered by the add/edit prompts"""
+    print("\nAvailable images in img/:")
+    for i, name in enumerate(get_image_catalog().names(), 1):
+        print(f"  {i}. {name}")
+
+def load_news():
+    """Load the current news items"""
+    store = get_store()
+    data = {"news": list(store.items("news"))}
+    data.update(store.extra("news"))
+    return data
 
 def save_news(data):
-    """Save news items to file"""
+    """Save news items to the content store"""
     # Validate data before saving
-    is_valid, error = validate_news_data(data)
+    is_valid, error = validate_news_data(data, get_validation_cache())
     if not is_valid:
         print(f"Error: Cannot save invalid data - {error}")
         return False
     
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(NEWS_FILE), exist_ok=True)
     try:
-        with open(NEWS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        extra = {k: v for k, v in data.items() if k != "news"}
+        get_store().replace_all("news", data["news"], extra)
         print("News saved successfully.")
-        print("Note: Restart the Astro dev server to see changes in the browser.")
+        print("Note: news.json is updated when you exit the manager, run 'export' or build.")
         return True
     except Exception as e:
-        print(f"Error saving file: {e}")
+        print(f"Error saving news: {e}")
         return False
 
+def save_news_item(item, front=False, before=None):
+    """Save a single news item to the content store
+
+    A new item goes to the front or the end, or right before the item with id `before`.
+    """
+    cache = get_validation_cache()
+    is_valid, error = cache.check(item)
+    cache.flush()
+    if not is_valid:
+        print(f"Error: Cannot save invalid data - {error}")
+        return False
+    
+    try:
+        get_store().put("news", item, front=front, before=before)
+        print("News saved successfully.")
+        print("Note: news.json is updated when you exit the manager, run 'export' or build.")
+        return True
+    except Exception as e:
+        print(f"Error saving news: {e}")
+        return False
+
+def export_news(path=None):
+    """Export news items to news.json, or stream them to a JSONL/CSV file"""
+    store = get_store()
+    if path is None:
+        try:
+            store.export_json("news")
+            print(f"✅ Exported {store.count('news')} news items to {NEWS_FILE}")
+            write_derived()
+            print("Note: Reload the page to see changes ('spade_manager.py watch' reloads it for you).")
+            return True
+        except Exception as e:
+            print(f"Error saving file: {e}")
+            return False
+    
+    import content_io
+    started = time.perf_counter()
+    try:
+        count = content_io.write_records(path, store.items("news"), NEWS_FIELDS)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error exporting news: {e}")
+        return False
+    print(f"✅ Exported {count} news items to {path}")
+    content_io.report_throughput("Exported", count, started)
+    return True
+
+def write_derived():
+    """Bring the news shards and the search index up to date with the content store"""
+    import news_shards
+    written, unchanged, removed = news_shards.write_shards(list(get_store().items("news")))
+    print(f"🧩 News shards: {written} written, {unchanged} unchanged, {removed} removed")
+    written, removed = _search_index.flush()
+    print(f"🔎 Search index: {written} shards written, {removed} removed")
+
+def refresh_news():
+    """Re-read news.json after an outside edit, validate it and rebuild its shards and index"""
+    try:
+        data = load_news()
+        is_valid, error = validate_news_data(data, get_validation_cache())
+        if not is_valid:
+            print(f"❌ News file is invalid: {error}")
+            return False
+        write_derived()
+        return True
+    except Exception as e:
+        print(f"❌ Error refreshing news: {e}")
+        return False
+
+def import_news(path=None):
+    """Bulk import news items from a JSONL or CSV file in a single commit"""
+    if path is None:
+        path = input("Enter the JSONL or CSV file to import: ").strip()
+    if not os.path.exists(path):
+        print(f"❌ Error: File {path} does not exist.")
+        return False
+    
+    import content_io
+    store = get_store()
+    started = time.perf_counter()
+    cache = get_validation_cache()
+    errors = []
+    batch = {}
+    allocator = None
+    try:
+        # Ids the file gives itself are never handed out to its records without one
+        taken = content_io.explicit_ids(path, int_fields=("id",))
+        allocator = content_io.IdAllocator(store, "news", taken=taken)
+        records = content_io.read_records(path)
+        records = content_io.decode_records(records, path, int_fields=("id",))
+        records = allocator.assign(records)
+        records = content_io.reject_duplicates(records, errors)
+        for item in content_io.validate_records(records, cache.check, errors):
+            batch[item["id"]] = item
+    except (OSError, ValueError) as e:
+        # json.JSONDecodeError is a ValueError
+        if allocator is not None:
+            allocator.release()
+        print(f"❌ Error reading {path}: {e}")
+        return False
+    allocator.release()
+    
+    cache.flush()
+    for line_no, error in errors[:10]:
+        print(f"⚠️ Line {line_no}: {error}")
+    if len(errors) > 10:
+        print(f"⚠️ ... and {len(errors) - 10} more invalid records")
+    
+    # The file is newest-first, like news.json, so the batch goes to the front
+    store.put_many("news", list(batch.values()), front=True)
+    print(f"✅ Imported {len(batch)} news items ({len(errors)} skipped)")
+    content_io.report_throughput("Imported", len(batch) + len(errors), started)
+    print("Note: news.json is updated when you exit the manager, run 'export' or build.")
+    return True
+
 def list_news():
     """List all news items"""
-    data = load_news()
-    if not data["news"]:
+    store = get_store()
+    if not store.count("news"):
         print("No news items found.")
         return
     
     print("\n=== Current News Items ===")
-    for idx, item in enumerate(data["news"], 1):
-        print(f"{idx}. {item['title']} - {item['date']}")
+    for item in store.items("news"):
+        print(f"{item['id']}. {item['title']} - {item['date']}")
         print(f"   Category: {item.get('category', 'General')}")
         print(f"   Description: {item['description'][:100]}...")
         print()
 
 def add_news():
     """Add a new news item"""
-    data = load_news()
-    
-    # Calculate next ID
-    next_id = 1
-    if data["news"]:
-        next_id = max(item["id"] for item in data["news"]) + 1
+    store = get_store()
     
     # Get user input
     title = input("Enter news title: ").strip()
@@ -142,12 +299,7 @@ def add_news():
     category, category_class = categories[category_input]
     
     # Get image (optional)
-    print("\nAvailable images in img/:")
-    img_dir = os.path.join(os.path.dirname(os.path.dirname(NEWS_FILE)), 'img')
-    if os.path.exists(img_dir):
-        image_files = [f for f in os.listdir(img_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.svg'))]
-        for i, img in enumerate(image_files, 1):
-            print(f"  {i}. {img}")
+    print_image_choices()
     
     image_input = input("Enter image filename (or leave empty): ").strip()
     if image_input and not image_input.startswith("img/"):
@@ -160,7 +312,7 @@ def add_news():
     
     # Create new news item
     new_item = {
-        "id": next_id,
+        "id": store.next_id("news"),
         "title": title,
         "date": date_str,
         "category": category,
@@ -172,109 +324,95 @@ def add_news():
     if image_input:
         new_item["image"] = image_input
     
-    # Add to data and save
-    data["news"].insert(0, new_item)  # Add to beginning for newest first
-    save_news(data)
-    print(f"News item '{title}' added successfully.")
+    # Add to the beginning for newest first
+    if save_news_item(new_item, front=True):
+        print(f"News item '{title}' added successfully.")
 
 def remove_news():
     """Remove a news item"""
-    data = load_news()
+    store = get_store()
     list_news()
     
-    if not data["news"]:
+    if not store.count("news"):
         return
     
     try:
         item_id = int(input("\nEnter the ID of the news item to remove: ").strip())
         
-        # Find the news item with the specified ID
-        for i, item in enumerate(data["news"]):
-            if item["id"] == item_id:
-                removed = data["news"].pop(i)
-                save_news(data)
-                print(f"News item '{removed['title']}' removed successfully.")
-                return
-        
-        print(f"Error: No news item found with ID {item_id}.")
+        removed = store.delete("news", item_id)
+        if removed is None:
+            print(f"Error: No news item found with ID {item_id}.")
+            return
+        print(f"News item '{removed['title']}' removed successfully.")
+        print("Note: news.json is updated when you exit the manager, run 'export' or build.")
     except (ValueError, IndexError):
         print("Invalid selection. Please enter a valid ID number.")
 
 def edit_news():
     """Edit an existing news item"""
-    data = load_news()
+    store = get_store()
     list_news()
     
-    if not data["news"]:
+    if not store.count("news"):
         return
     
     try:
         item_id = int(input("\nEnter the ID of the news item to edit: ").strip())
         
-        # Find the news item with the specified ID
-        for item in data["news"]:
-            if item["id"] == item_id:
-                print(f"\nEditing news item: {item['title']}")
-                
-                # Get updated values
-                title = input(f"Enter new title [{item['title']}]: ").strip()
-                if title:
-                    item['title'] = title
-                
-                desc = input(f"Enter new description [{item['description']}]: ").strip()
-                if desc:
-                    item['description'] = desc
-                
-                date_input = input(f"Enter new date (YYYY-MM-DD) [{item['date']}]: ").strip()
-                if date_input:
-                    try:
-                        date_obj = datetime.strptime(date_input, "%Y-%m-%d")
-                        item['date'] = date_obj.strftime("%B %d, %Y")
-                    except ValueError:
-                        print("Invalid date format. Keeping current date.")
-                
-                link = input(f"Enter new link [{item.get('link', '#')}]: ").strip()
-                if link:
-                    item['link'] = link
-                
-                # Show current image and ask for a new one
-                current_image = item.get('image', '')
-                print(f"\nCurrent image: {current_image}")
-                print("\nAvailable images in img/:")
-                img_dir = os.path.join(os.path.dirname(os.path.dirname(NEWS_FILE)), 'img')
-                if os.path.exists(img_dir):
-                    image_files = [f for f in os.listdir(img_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.svg', '.gif', '.webp'))]
-                    for i, img in enumerate(image_files, 1):
-                        print(f"  {i}. {img}")
-                
-                # Ask if user wants to change the image
-                change_image = input("\nChange image? (y/n) [n]: ").strip().lower()
-                if change_image in ('y', 'yes'):
-                    image_input = input("Enter image filename or upload a new image with 'upload' command: ").strip()
-                    
-                    if image_input.lower() == 'upload':
-                        # Call upload function
-                        upload_image()
-                        
-                        # Ask again for image selection after upload
-                        print("\nAvailable images in img/:")
-                        if os.path.exists(img_dir):
-                            image_files = [f for f in os.listdir(img_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.svg', '.gif', '.webp'))]
-                            for i, img in enumerate(image_files, 1):
-                                print(f"  {i}. {img}")
-                        image_input = input("Enter image filename: ").strip()
-                    
-                    if image_input and not image_input.startswith("img/"):
-                        image_input = f"img/{image_input}"
-                    
-                    if image_input:
-                        item['image'] = image_input
+        item = store.get("news", item_id)
+        if item is None:
+            print(f"Error: No news item found with ID {item_id}.")
+            return
+        
+        print(f"\nEditing news item: {item['title']}")
+        
+        # Get updated values
+        title = input(f"Enter new title [{item['title']}]: ").strip()
+        if title:
+            item['title'] = title
+        
+        desc = input(f"Enter new description [{item['description']}]: ").strip()
+        if desc:
+            item['description'] = desc
+        
+        date_input = input(f"Enter new date (YYYY-MM-DD) [{item['date']}]: ").strip()
+        if date_input:
+            try:
+                date_obj = datetime.strptime(date_input, "%Y-%m-%d")
+                item['date'] = date_obj.strftime("%B %d, %Y")
+            except ValueError:
+                print("Invalid date format. Keeping current date.")
+        
+        link = input(f"Enter new link [{item.get('link', '#')}]: ").strip()
+        if link:
+            item['link'] = link
+        
+        # Show current image and ask for a new one
+        current_image = item.get('image', '')
+        print(f"\nCurrent image: {current_image}")
+        print_image_choices()
+        
+        # Ask if user wants to change the image
+        change_image = input("\nChange image? (y/n) [n]: ").strip().lower()
+        if change_image in ('y', 'yes'):
+            image_input = input("Enter image filename or upload a new image with 'upload' command: ").strip()
+            
+            if image_input.lower() == 'upload':
+                # Call upload function
+                upload_image()
                 
-                save_news(data)
-                print(f"News item '{item['title']}' updated successfully.")
-                return
+                # Ask again for image selection after upload
+                print_image_choices()
+                image_input = input("Enter image filename: ").strip()
+            
+            if image_input and not image_input.startswith("img/"):
+                image_input = f"img/{image_input}"
+            
+            if image_input:
+                item['image'] = image_input
         
-        print(f"Error: No news item found with ID {item_id}.")
+        if save_news_item(item):
+            print(f"News item '{item['title']}' updated successfully.")
     except (ValueError, IndexError):
         print("Invalid selection. Please enter a valid ID number.")
 
@@ -282,14 +420,19 @@ def validate_news_file():
     """Validate the current news file"""
     try:
         data = load_news()
-        is_valid, error = validate_news_data(data)
+        cache = get_validation_cache()
+        cache.reset_stats()
+        is_valid, error = validate_news_data(data, cache)
         if is_valid:
             print("✅ News file is valid!")
             print(f"Found {len(data['news'])} news items.")
         else:
             print(f"❌ News file is invalid: {error}")
+        print(f"🔁 Revalidated {cache.misses} items, {cache.hits} served from cache")
+        return is_valid
     except Exception as e:
         print(f"❌ Error validating news file: {e}")
+        return False
 
 def print_help():
     """Print help information"""
@@ -303,13 +446,34 @@ def print_help():
     print("  validate - Validate the news file structure")
     print("  images   - List available images")
     print("  upload   - Upload a new image")
+    print("  import   - Bulk import news items from a JSONL/CSV file")
+    print("  export   - Write pending changes to news.json (or a JSONL/CSV file)")
+    print("  refresh  - Rebuild the shards and search index after editing news.json by hand")
     print("  help     - Show this help message")
-    print("  exit     - Exit the program")
+    print("  exit     - Exit the program (exports pending changes)")
     print()
-    print("Note: After making changes, restart the Astro dev server to see updates.")
+    print("Note: After exporting, reload the page (or keep 'spade_manager.py watch' running).")
+
+def find_stored_copy(path, filename):
+    """Name of an image already in public/img with the same content, if any
+
+    Stored SVGs are minified, so an SVG upload is also compared in minified form.
+    """
+    from image_catalog import file_sha256
+    catalog = get_image_catalog()
+    existing = catalog.find_by_hash(file_sha256(path))
+    if existing is None and filename.lower().endswith(".svg"):
+        import hashlib
+        from svg_minify import minify_svg
+        with open(path, 'rb') as f:
+            minified = minify_svg(f.read())
+        existing = catalog.find_by_hash(hashlib.sha256(minified).hexdigest())
+    return existing
 
 def upload_image():
     """Upload a new image to the img directory"""
+    import image_pipeline
+    
     # Get the img directory path
     img_dir = os.path.join(os.path.dirname(os.path.dirname(NEWS_FILE)), 'img')
     
@@ -363,6 +527,13 @@ def upload_image():
             # Create destination path
             dest_path = os.path.join(img_dir, filename)
             
+            # The same picture may already be stored under another name
+            existing = find_stored_copy(temp_path, filename)
+            if existing:
+                os.unlink(temp_path)  # Remove temp file
+                print(f"✅ Identical image already stored; use it in news items as: img/{existing}")
+                return
+            
             # Check if file already exists
             if os.path.exists(dest_path):
                 overwrite = input(f"⚠️ Warning: {filename} already exists. Overwrite? (y/n): ").lower()
@@ -371,9 +542,8 @@ def upload_image():
                     print("Upload cancelled.")
                     return
             
-            # Copy the file
-            import shutil
-            shutil.copy2(temp_path, dest_path)
+            # Copy the file and generate its responsive variants
+            image_pipeline.add_image(temp_path, filename)
             os.unlink(temp_path)  # Remove temp file
             
             print(f"✅ Image downloaded and saved as: {filename}")
@@ -395,8 +565,13 @@ def upload_image():
             print("Supported formats: PNG, JPEG, SVG, GIF, WebP")
             return
         
+        # The same picture may already be stored under another name
+        existing = find_stored_copy(source, source)
+        if existing:
+            print(f"✅ Identical image already stored; use it in news items as: img/{existing}")
+            return
+        
         # Get the filename from the path
-        import shutil
         filename = os.path.basename(source)
         
         # Create destination path
@@ -409,71 +584,107 @@ def upload_image():
                 print("Upload cancelled.")
                 return
         
-        # Copy the file
+        # Copy the file and generate its responsive variants
         try:
-            shutil.copy2(source, dest_path)
+            image_pipeline.add_image(source, filename)
             print(f"✅ Image {filename} uploaded successfully!")
             print(f"You can use it in news items as: img/{filename}")
         except Exception as e:
             print(f"❌ Error uploading image: {e}")
 
-def list_images():
-    """List all available images in the img directory"""
-    # Get the img directory path
-    img_dir = os.path.join(os.path.dirname(os.path.dirname(NEWS_FILE)), 'img')
+def list_images(name=None):
+    """List the images in the img directory, or the news items using one image"""
+    catalog = get_image_catalog()
     
-    print("\n=== Available Images ===")
-    if os.path.exists(img_dir):
-        image_files = [f for f in os.listdir(img_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.svg', '.gif'))]
-        if image_files:
-            for i, img in enumerate(image_files, 1):
-                print(f"  {i}. {img}")
-            print(f"\nTotal: {len(image_files)} images")
-            print("To use an image in a news item, specify: img/filename.png")
+    if name is not None:
+        users = catalog.users(name)
+        if users:
+            print(f"{name} is used by news items: {', '.join(f'#{news_id}' for news_id in users)}")
         else:
-            print("No images found in img directory.")
+            print(f"{name} is not used by any news item.")
+        return
+    
+    print("\n=== Available Images ===")
+    images = catalog.images()
+    if images:
+        for i, (filename, size, width, height) in enumerate(images, 1):
+            dimensions = f"{width}x{height}, " if width else ""
+            users = catalog.users(filename)
+            used_by = f" - used by {', '.join(f'#{news_id}' for news_id in users)}" if users else ""
+            print(f"  {i}. {filename} ({dimensions}{size / 1024:.1f} KB){used_by}")
+        print(f"\nTotal: {len(images)} images")
+        print("To use an image in a news item, specify: img/filename.png")
     else:
-        print(f"❌ Error: Directory {img_dir} does not exist.")
+        print("No images found in img directory.")
 
-def main():
-    """Main function"""
-    print("SPADE Astro News Manager")
-    print("========================")
-    
-    # Check if we're in the right directory
-    if not os.path.exists("astro.config.mjs"):
-        print("Error: This script should be run from the repository root directory.")
-        print("Current directory:", os.getcwd())
-        print("Please navigate to the repository root folder and run this script again.")
-        sys.exit(1)
+COMMANDS = {
+    "list": list_news,
+    "add": add_news,
+    "remove": remove_news,
+    "edit": edit_news,
+    "validate": validate_news_file,
+    "images": list_images,
+    "upload": upload_image,
+    "import": import_news,
+    "export": export_news,
+    "refresh": refresh_news,
+    "help": print_help,
+}
+
+def run(args):
+    """Run a one-shot command when args are given, the interactive loop otherwise"""
+    # Create the news file if it doesn't exist and sync the content store
+    with startup_timings.phase("content store sync"):
+        get_store()
     
-    # Create the news file if it doesn't exist
-    load_news()
+    if args:
+        command = args[0].lower()
+        if command in COMMANDS:
+            # Edits stay in the journal; 'export', 'exit' and builds write the JSON file
+            with startup_timings.phase(f"command: {command}"):
+                result = COMMANDS[command](*args[1:])
+            if result is False:
+                # Lets scripts and CI stop on invalid content
+                sys.exit(1)
+        else:
+            print(f"Unknown command: {command}")
+            print(f"Available commands: {', '.join(COMMANDS)}")
+        return
     
     while True:
-        command = input("\nEnter command (list, add, remove, edit, validate, images, upload, help, exit): ").strip().lower()
+        command = input("\nEnter command (list, add, remove, edit, validate, images, upload, import, export, refresh, help, exit): ").strip().lower()
         
-        if command == "list":
-            list_news()
-        elif command == "add":
-            add_news()
-        elif command == "remove":
-            remove_news()
-        elif command == "edit":
-            edit_news()
-        elif command == "validate":
-            validate_news_file()
-        elif command == "images":
-            list_images()
-        elif command == "upload":
-            upload_image()
-        elif command == "help":
-            print_help()
+        if command in COMMANDS:
+            COMMANDS[command]()
         elif command == "exit":
+            close()
             print("Goodbye!")
             break
         else:
             print("Unknown command. Type 'help' for available commands.")
 
+def close():
+    """Export pending changes to news.json"""
+    if _store is not None and _store.is_dirty("news"):
+        export_news()
+
+def main():
+    """Main function"""
+    args = sys.argv[1:]
+    # One-shot commands are scripted; only greet interactive users
+    if not args:
+        print("SPADE Astro News Manager")
+        print("========================")
+    
+    # Check if we're in the right directory
+    with startup_timings.phase("environment check"):
+        if not os.path.exists("astro.config.mjs"):
+            print("Error: This script should be run from the repository root directory.")
+            print("Current directory:", os.getcwd())
+            print("Please navigate to the repository root folder and run this script again.")
+            sys.exit(1)
+    
+    run(args)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Sharded, paginated news output for the SPADE Astro landing page
+Splits the news archive into small JSON files under public/json/news/ so the site
+never has to download the whole archive:
+
+    latest.json          the newest PAGE_SIZE items (what the landing page fetches)
+    page-NNNN.json       fixed-size archive pages, newest-first inside each page
+    year-YYYY.json       every item published in a given year
+    manifest.json        page/year listing with item counts and content hashes
+
+Archive pages are numbered from the oldest item, so adding news to the front of the
+archive only touches the newest page; shards whose content did not change are not
+rewritten.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from content_journal import atomic_write_bytes
+
+PAGE_SIZE = 12
+
+SHARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "public", "json", "news")
+
+
+def item_year(item):
+    """Publication year of a news item ("unknown" if the date cannot be parsed)"""
+    try:
+        return datetime.strptime(item.get("date", ""), "%B %d, %Y").year
+    except ValueError:
+        return "unknown"
+
+
+def _encode(payload):
+    return json.dumps(payload, indent=2).encode()
+
+
+def _previous_manifest(shards_dir):
+    try:
+        with open(os.path.join(shards_dir, "manifest.json"), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def build_shards(news, page_size=PAGE_SIZE):
+    """Return {filename: payload} for every shard of a newest-first news list"""
+    shards = {"latest.json": {"news": news[:page_size]}}
+    # Page 1 holds the oldest items; the newest page may be partially filled
+    oldest_first = news[::-1]
+    for start in range(0, len(oldest_first), page_size):
+        page = start // page_size + 1
+        shards[f"page-{page:04d}.json"] = {"page": page, "news": oldest_first[start:start + page_size][::-1]}
+    years = {}
+    for item in news:
+        years.setdefault(item_year(item), []).append(item)
+    for year, items in years.items():
+        shards[f"year-{year}.json"] = {"year": year, "news": items}
+    return shards
+
+
+def write_shards(news, shards_dir=SHARDS_DIR, page_size=PAGE_SIZE):
+    """Write the news shards and manifest, touching only the files that changed
+
+    Returns (written, unchanged, removed) file counts.
+    """
+    previous = _previous_manifest(shards_dir)
+    known_hashes = {entry["file"]: entry["sha256"] for entry in previous.get("files", [])}
+    written = unchanged = removed = 0
+    entries = []
+    for filename, payload in build_shards(news, page_size).items():
+        encoded = _encode(payload)
+        digest = hashlib.sha256(encoded).hexdigest()
+        path = os.path.join(shards_dir, filename)
+        if known_hashes.get(filename) == digest and os.path.exists(path):
+            unchanged += 1
+        else:
+            atomic_write_bytes(path, encoded)
+            written += 1
+        entries.append({"file": filename, "count": len(payload["news"]), "sha256": digest})
+
+    # Drop shards that no longer exist (e.g. pages after items were removed)
+    current = {entry["file"] for entry in entries}
+    for filename in known_hashes:
+        if filename not in current and os.path.exists(os.path.join(shards_dir, filename)):
+            os.unlink(os.path.join(shards_dir, filename))
+            removed += 1
+
+    pages = sorted((e for e in entries if e["file"].startswith("page-")), key=lambda e: e["file"], reverse=True)
+    years = sorted((e for e in entries if e["file"].startswith("year-")), key=lambda e: e["file"], reverse=True)
+    manifest = {
+        "total": len(news),
+        "pageSize": page_size,
+        "latest": "latest.json",
+        "pages": [e["file"] for e in pages],
+        "years": [e["file"] for e in years],
+        "files": entries,
+    }
+    encoded = _encode(manifest)
+    if encoded != _encode(previous):
+        atomic_write_bytes(os.path.join(shards_dir, "manifest.json"), encoded)
+    return written, unchanged, removed
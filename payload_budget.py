@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Payload budgets for the SPADE build output
+Walks dist/ after a build and adds up the bytes a visitor can download, per type
+of file (HTML, JS, CSS, images, JSON, Python demo sources), raw and as served
+with gzip and brotli. Precompressed .gz/.br siblings are alternative encodings of
+a file, not extra payload, so they are not counted.
+
+Each type has a budget on its gzip size in BUDGETS. A type over its budget fails
+the check when it is new or grew since the last build that passed, so an old
+overage does not block every build while any further growth does, and a failed
+build keeps failing until it is fixed. Every checked build is appended to
+.spade/budget-history.jsonl, one compact line per build with whether it passed,
+for graphing payload growth (`history --csv`).
+
+Compressed sizes are remembered by content hash in .spade/budget-sizes.json, so
+only files that changed are compressed again.
+
+Usage: python3 payload_budget.py [check | history [--csv]]
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from build_cache import DIST_DIR, ROOT, load_index, load_json, save_json
+
+HISTORY_FILE = os.path.join(ROOT, ".spade", "budget-history.jsonl")
+SIZES_FILE = os.path.join(ROOT, ".spade", "budget-sizes.json")
+
+TYPES = {
+    ".html": "html", ".htm": "html",
+    ".js": "js", ".mjs": "js",
+    ".css": "css",
+    ".png": "images", ".jpg": "images", ".jpeg": "images", ".gif": "images",
+    ".webp": "images", ".avif": "images", ".svg": "images", ".ico": "images",
+    ".json": "json",
+    ".py": "py",
+}
+# Report order; "other" catches fonts, text files and anything unexpected
+ORDER = ["html", "js", "css", "images", "json", "py", "other"]
+# Served compressed; the other files (images in binary formats, mostly) are sent as they are
+COMPRESSIBLE = {".html", ".htm", ".js", ".mjs", ".css", ".svg", ".ico", ".json", ".py",
+                ".txt", ".xml", ".map", ".webmanifest"}
+
+# Gzip bytes allowed per type and for the whole site
+BUDGETS = {
+    "html": 100 * 1024,
+    "js": 100 * 1024,
+    "css": 50 * 1024,
+    "images": 2048 * 1024,
+    "json": 150 * 1024,
+    "py": 50 * 1024,
+    "other": 100 * 1024,
+    "total": 2560 * 1024,
+}
+
+
+def file_type(rel):
+    return TYPES.get(os.path.splitext(rel)[1].lower(), "other")
+
+
+def payload_files(files):
+    """The files of a dist manifest a visitor downloads, without precompressed siblings"""
+    return {rel: entry for rel, entry in files.items()
+            if not (rel.endswith((".gz", ".br")) and rel[:-3] in files)}
+
+
+def compressed_sizes(path, raw):
+    """[gzip bytes, brotli bytes or None without the brotli package]"""
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE:
+        return [raw, raw]
+    with open(path, 'rb') as f:
+        payload = f.read()
+    sizes = [len(gzip.compress(payload, compresslevel=9, mtime=0)), None]
+    try:
+        import brotli
+    except ImportError:
+        return sizes
+    sizes[1] = len(brotli.compress(payload, quality=11))
+    return sizes
+
+
+def measure(dist=DIST_DIR):
+    """{type: [files, raw, gzip, brotli]} for the build in dist, plus "total"
+
+    Brotli is None when the brotli package is not installed. Only reads dist: the
+    deploy manifest is left to the build.
+    """
+    from deploy_manifest import describe
+    files = payload_files(describe(dist))
+    cache = load_json(SIZES_FILE, {})
+    sizes = {}
+    totals = {}
+    for rel, (raw, digest) in files.items():
+        known = cache.get(digest)
+        if known is None or (known[1] is None and os.path.splitext(rel)[1].lower() in COMPRESSIBLE):
+            # New content, or measured before brotli was installed
+            known = compressed_sizes(os.path.join(dist, rel), raw)
+        sizes[digest] = known
+        for key in (file_type(rel), "total"):
+            row = totals.setdefault(key, [0, 0, 0, 0])
+            row[0] += 1
+            row[1] += raw
+            row[2] += known[0]
+            row[3] = None if row[3] is None or known[1] is None else row[3] + known[1]
+    # Only the current build's files, so the cache does not grow with every build
+    save_json(SIZES_FILE, sizes)
+    return {key: totals[key] for key in ORDER + ["total"] if key in totals}
+
+
+def load_history():
+    """Recorded reports, oldest first"""
+    history = []
+    try:
+        with open(HISTORY_FILE, 'r') as f:
+            for line in f:
+                if line.strip():
+                    history.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return history
+
+
+def record(report, build, passed):
+    """Append a report to the history, unless it repeats the last one"""
+    history = load_history()
+    if (history and history[-1]["build"] == build and history[-1]["types"] == report
+            and history[-1].get("passed", True) == passed):
+        return
+    entry = {"created": datetime.now().isoformat(timespec="seconds"), "build": build,
+             "types": report, "passed": passed}
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    with open(HISTORY_FILE, 'a') as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def baseline_report(report, build):
+    """The last recorded report that passed and differs from this one, or None
+
+    A failed build is never the baseline, so rerunning it fails again, and checking
+    the same build twice compares it with the build before, not itself. Entries
+    from before "passed" was recorded count as passed.
+    """
+    for entry in reversed(load_history()):
+        if entry.get("passed", True) and (entry["build"] != build or entry["types"] != report):
+            return entry
+    return None
+
+
+def format_size(size):
+    if size is None:
+        return "-"
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 1024 / 1024:.2f} MB"
+
+
+def format_change(change):
+    if change is None:
+        return "new"
+    if change == 0:
+        return "="
+    return ("+" if change > 0 else "-") + format_size(abs(change))
+
+
+def check():
+    """Measure dist/, compare it with the budgets and the previous build, and record it"""
+    if not os.path.isdir(DIST_DIR):
+        print("❌ No build output in 'dist' (run the build first)")
+        return False
+    started = time.perf_counter()
+    build = load_index()["current"]
+    # The short form is enough to find the build in 'rollback' and keeps the history compact
+    build = build[:12] if build else None
+    report = measure(DIST_DIR)
+    previous = baseline_report(report, build)
+    before = previous["types"] if previous else {}
+
+    print("\n📏 Payload of dist/" + (f" (build {build})" if build else "")
+          + (f", compared with {previous['created'].replace('T', ' ')}" if previous else ""))
+    print(f"{'type':<8}{'files':>7}{'raw':>12}{'gzip':>12}{'brotli':>12}{'budget':>12}{'change':>12}")
+    regressions, still_over = [], []
+    for key, (files, raw, gzipped, brotli) in report.items():
+        change = gzipped - before[key][2] if key in before else None
+        budget = BUDGETS.get(key)
+        over = budget is not None and gzipped > budget
+        marker = "  ❌" if over else ""
+        print(f"{key:<8}{files:>7}{format_size(raw):>12}{format_size(gzipped):>12}{format_size(brotli):>12}"
+              f"{format_size(budget):>12}{format_change(change):>12}{marker}")
+        if over and (change is None or change > 0):
+            regressions.append((key, gzipped, budget, change))
+        elif over:
+            still_over.append(key)
+    record(report, build, passed=not regressions)
+
+    elapsed = (time.perf_counter() - started) * 1000
+    if report["total"][3] is None:
+        print("ℹ️ Install the 'brotli' package to measure brotli sizes.")
+    for key in still_over:
+        print(f"⚠️ {key} is over its budget, but did not grow since the last build within budget")
+    if regressions:
+        for key, gzipped, budget, change in regressions:
+            print(f"❌ {key}: {format_size(gzipped)} gzipped is over its {format_size(budget)} budget"
+                  + (f" ({format_change(change)} since the last build within budget)" if change is not None else ""))
+        return False
+    print(f"✅ Within budget ({elapsed:.0f} ms)")
+    return True
+
+
+def history(*args):
+    """Show the recorded payload of each build; --csv prints every size for graphing"""
+    entries = load_history()
+    if "--csv" in args:
+        columns = [f"{key}_{size}" for key in ORDER + ["total"] for size in ("raw", "gzip", "br")]
+        print(",".join(["created", "build"] + columns))
+        for entry in entries:
+            values = []
+            for key in ORDER + ["total"]:
+                _, raw, gzipped, brotli = entry["types"].get(key, [0, 0, 0, 0])
+                values += [raw, gzipped, "" if brotli is None else brotli]
+            print(",".join([entry["created"], entry["build"] or ""] + [str(value) for value in values]))
+        return True
+    if not entries:
+        print("📂 No payload history yet (run 'check' after a build)")
+        return True
+    print(f"\n📈 Payload of the last {len(entries)} checked build(s), gzipped:")
+    last = None
+    for entry in entries:
+        total = entry["types"]["total"][2]
+        change = "" if last is None else f"  {format_change(total - last)}"
+        marker = "" if entry.get("passed", True) else "  ❌ over budget"
+        print(f"   {entry['created'].replace('T', ' ')}  {entry['build'] or '-':<12}  "
+              f"{format_size(total):>10}{change}{marker}")
+        last = total
+    return True
+
+
+COMMANDS = {
+    "check": check,
+    "history": history,
+}
+
+
+def run(args):
+    """Run a command (default: check); exits with an error when a budget regresses"""
+    command = args[0].lower() if args else "check"
+    if command in COMMANDS:
+        if not COMMANDS[command](*args[1:]):
+            sys.exit(1)
+    else:
+        print(f"❓ Unknown command: {command}")
+        print(f"Available commands: {', '.join(COMMANDS)}")
+
+
+def main():
+    """Main function"""
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+
+    run(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
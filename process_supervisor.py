@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Process supervisor for the SPADE development workflow
+Runs long-lived child processes (Astro dev and preview servers, production builds,
+the content watcher) on an asyncio event loop in a background thread, so the
+spade-manager> prompt stays usable while they run. Every child's output is read
+line by line without blocking and echoed with its name as a prefix; the last
+LOG_LINES lines are kept for `logs`. A child that crashes (exits with a non-zero
+status) is restarted with an exponential backoff, unless it was started as a
+one-shot job such as a build.
+
+Children get their own session, so Ctrl+C at the prompt does not reach them;
+stop() terminates the whole process group (npm starts node as a grandchild).
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import inspect
+import os
+import signal
+import sys
+import threading
+import time
+
+# Lines of output kept per child
+LOG_LINES = 200
+# Seconds before the first restart; doubles on every crash in a row up to the maximum
+RESTART_DELAY = 1
+MAX_RESTART_DELAY = 30
+# A child that ran this long before crashing starts again from RESTART_DELAY
+STABLE_AFTER = 60
+# Seconds a child gets to exit after SIGTERM before it is killed
+STOP_TIMEOUT = 5
+
+
+def format_duration(seconds):
+    """12s, 3m 05s, 1h 02m"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+def group_memory(pid):
+    """Resident bytes of a process and everything in its session, or None if unknown"""
+    if os.path.isdir("/proc"):
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        total = 0
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", 'rb') as f:
+                    # Fields after the command name, which may contain spaces
+                    fields = f.read().rsplit(b")", 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[3]) == pid:
+                total += int(fields[21]) * page_size
+        return total
+    import subprocess
+    try:
+        output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)],
+                                capture_output=True, text=True, check=True).stdout
+        return int(output.strip()) * 1024
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+
+
+class Child:
+    """A supervised command and its current process"""
+
+    def __init__(self, name, argv, restart, on_exit):
+        self.name = name
+        self.argv = argv
+        self.restart = restart
+        self.on_exit = on_exit
+        self.process = None
+        self.started = None
+        self.returncode = None
+        self.restarts = 0
+        self.stopping = False
+        # Set while on_exit runs
+        self.finishing = False
+        self.output = collections.deque(maxlen=LOG_LINES)
+        self.future = None
+        self.stopped = None
+        # Once done for good: False if it failed (or on_exit says so), None if it was stopped
+        self.result = None
+
+    @property
+    def alive(self):
+        """Whether the child is running or waiting to be restarted"""
+        return self.future is not None and not self.future.done()
+
+    @property
+    def state(self):
+        if self.process is not None and self.process.returncode is None:
+            return "running"
+        if self.alive:
+            if self.finishing:
+                return "finishing"
+            return "restarting" if self.started else "starting"
+        if self.returncode is None:
+            return "failed to start"
+        return "stopped" if self.stopping else f"exited ({self.returncode})"
+
+    def uptime(self):
+        """Seconds since the current process started, or None when it is not running"""
+        if self.state != "running":
+            return None
+        return time.monotonic() - self.started
+
+    def memory(self):
+        if self.state != "running":
+            return None
+        return group_memory(self.process.pid)
+
+
+class Supervisor:
+    """Starts, restarts and stops child processes on a background event loop"""
+
+    def __init__(self):
+        self.children = {}
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def _ensure_loop(self):
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(target=self.loop.run_forever, name="supervisor", daemon=True).start()
+
+    def start(self, name, argv, restart=True, on_exit=None):
+        """Run argv as child `name`; returns the Child, or None if one is already running
+
+        on_exit(returncode) runs once the child is done for good (after its last
+        restart): on a worker thread, so the other children's output keeps
+        streaming, or awaited on the event loop when it is a coroutine function.
+        A True or False it returns becomes the child's result instead of whether
+        it exited with status 0.
+        """
+        with self.lock:
+            if name in self.children and self.children[name].alive:
+                return None
+            self._ensure_loop()
+            child = self.children[name] = Child(name, argv, restart, on_exit)
+            child.future = asyncio.run_coroutine_threadsafe(self._supervise(child), self.loop)
+        return child
+
+    async def _supervise(self, child):
+        child.stopped = asyncio.Event()
+        delay = RESTART_DELAY
+        try:
+            while not child.stopping:
+                try:
+                    await self._run(child)
+                except OSError as e:
+                    print(f"❌ {child.name}: cannot run {child.argv[0]}: {e}")
+                    break
+                if child.stopping or not child.restart or child.returncode == 0:
+                    break
+                if time.monotonic() - child.started > STABLE_AFTER:
+                    delay = RESTART_DELAY
+                child.restarts += 1
+                print(f"💥 {child.name} exited with code {child.returncode}; "
+                      f"restarting in {delay}s (restart {child.restarts})")
+                try:
+                    await asyncio.wait_for(child.stopped.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, MAX_RESTART_DELAY)
+        finally:
+            if not child.stopping:
+                child.result = child.returncode == 0
+                if child.on_exit is not None:
+                    child.finishing = True
+                    try:
+                        if inspect.iscoroutinefunction(child.on_exit):
+                            outcome = await child.on_exit(child.returncode)
+                        else:
+                            outcome = await asyncio.get_running_loop().run_in_executor(
+                                None, child.on_exit, child.returncode
+                            )
+                    except Exception as e:
+                        print(f"❌ {child.name}: {e}")
+                        outcome = False
+                    if outcome is not None:
+                        child.result = outcome
+
+    async def _run(self, child):
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        # A session of its own: Ctrl+C at the prompt must not reach the children
+        session = {"start_new_session": True} if os.name == "posix" else {}
+        child.process = await asyncio.create_subprocess_exec(
+            *child.argv, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT, env=env, limit=1 << 20, **session,
+        )
+        child.started = time.monotonic()
+        child.returncode = None
+        if child.stopping:
+            # stop() came while the process was being created
+            self._signal(child.process, signal.SIGTERM)
+        while True:
+            line = await child.process.stdout.readline()
+            if not line:
+                break
+            text = line.decode(errors="replace").rstrip()
+            child.output.append(text)
+            print(f"[{child.name}] {text}")
+        child.returncode = await child.process.wait()
+
+    def stop(self, name):
+        """Terminate a child (and its process group) and wait for it; returns False if not running"""
+        child = self.children.get(name)
+        if child is None or not child.alive:
+            return False
+        child.stopping = True
+        asyncio.run_coroutine_threadsafe(self._terminate(child), self.loop).result()
+        child.future.result()
+        return True
+
+    async def _terminate(self, child):
+        if child.stopped is not None:
+            child.stopped.set()
+        process = child.process
+        if process is None or process.returncode is not None:
+            return
+        self._signal(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._signal(process, signal.SIGKILL if os.name == "posix" else signal.SIGTERM)
+            await process.wait()
+
+    @staticmethod
+    def _signal(process, signum):
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signum)
+            else:
+                process.send_signal(signum)
+        except ProcessLookupError:
+            pass
+
+    def stop_all(self):
+        for name in list(self.children):
+            self.stop(name)
+
+    def wait(self):
+        """Block until every child is done for good (Ctrl+C interrupts)
+
+        Returns False if any of them failed.
+        """
+        for child in list(self.children.values()):
+            while child.alive:
+                # Short timeouts keep the main thread responsive to KeyboardInterrupt
+                try:
+                    child.future.result(timeout=0.5)
+                except concurrent.futures.TimeoutError:
+                    pass
+        return all(child.result is not False for child in self.children.values())
+
+    def print_status(self):
+        """Table of the children: PID, state, uptime, memory and restarts"""
+        print(f"{'process':<10}{'pid':>8}  {'state':<16}{'uptime':>9}{'memory':>11}{'restarts':>10}")
+        for child in self.children.values():
+            uptime = child.uptime()
+            memory = child.memory()
+            pid = child.process.pid if child.state == "running" else "-"
+            print(f"{child.name:<10}{pid:>8}  {child.state:<16}"
+                  f"{format_duration(uptime) if uptime is not None else '-':>9}"
+                  f"{f'{memory / 1024 / 1024:.1f} MB' if memory is not None else '-':>11}"
+                  f"{child.restarts:>10}")
+
+    def print_logs(self, name):
+        child = self.children.get(name)
+        if child is None:
+            print(f"❓ No process named '{name}' ({', '.join(self.children) or 'none started'})")
+            return False
+        print(f"📜 Last {len(child.output)} line(s) of {name} ({' '.join(child.argv)}):")
+        for line in child.output:
+            print(line)
+        return True
+
+
+def main():
+    """Run one command under the supervisor until it exits or Ctrl+C"""
+    if len(sys.argv) < 2:
+        print("Usage: python3 process_supervisor.py <command> [args...]")
+        sys.exit(1)
+    supervisor = Supervisor()
+    supervisor.start(os.path.basename(sys.argv[1]), sys.argv[1:])
+    try:
+        if not supervisor.wait():
+            sys.exit(1)
+    except KeyboardInterrupt:
+        supervisor.stop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+// SPADE live reload for development: reloads the page when the content watcher
+// (`python3 spade_manager.py watch`) has regenerated what a change in public/ feeds.
+// Only included by BaseLayout under `npm run dev`.
+
+(function () {
+  if (!window.EventSource) {
+    return;
+  }
+  const source = new EventSource(`http://${location.hostname}:35729/events`);
+  let connected = false;
+
+  source.onopen = () => {
+    connected = true;
+  };
+  source.addEventListener("change", () => location.reload());
+  source.addEventListener("error", (event) => {
+    if (event.data) {
+      console.warn("SPADE watch: regenerating content failed", JSON.parse(event.data));
+    } else if (!connected) {
+      // No watcher running: stop retrying in the background
+      source.close();
+    }
+  });
+})();
@@ -22,15 +22,40 @@ document.addEventListener("DOMContentLoaded", function () {
   });
 
   // 2. NEWS LOADING
+  // <picture> with AVIF/WebP srcsets when the image has responsive variants
+  function newsImageMarkup(item, entry) {
+    const img = `<img src="${item.image}" class="card-img-top" alt="${item.title}">`;
+    if (!entry || !entry.variants || !entry.variants.length) return img;
+    const sources = ["avif", "webp"]
+      .map((format) => {
+        const srcset = entry.variants
+          .filter((variant) => variant.format === format)
+          .map((variant) => `${variant.path} ${variant.width}w`)
+          .join(", ");
+        return srcset
+          ? `<source type="image/${format}" srcset="${srcset}" sizes="(min-width: 768px) 33vw, 100vw">`
+          : "";
+      })
+      .join("");
+    return `<picture>${sources}${img}</picture>`;
+  }
+
   const newsContainer = document.getElementById("news-container");
   if (newsContainer) {
     console.log("Loading news from JSON...");
-    fetch("json/news.json")
+    // Responsive variants written by image_pipeline.py, if it has been run
+    const imagesLoaded = fetch("json/images.json")
+      .then((response) => (response.ok ? response.json() : {}))
+      .then((manifest) => manifest.images || {})
+      .catch(() => ({}));
+    // Only the newest shard is needed here; fall back to the full archive
+    fetch("json/news/latest.json")
+      .then((response) => (response.ok ? response : fetch("json/news.json")))
       .then((response) => {
         console.log("News response status:", response.status);
-        return response.json();
+        return Promise.all([response.json(), imagesLoaded]);
       })
-      .then((data) => {
+      .then(([data, images]) => {
         console.log("News data loaded:", data);
         // Clear loading spinner
         newsContainer.innerHTML = "";
@@ -41,7 +66,7 @@ document.addEventListener("DOMContentLoaded", function () {
           newsCard.className = "col-md-4";
           newsCard.innerHTML = `
                         <div class="card h-100 border-0 shadow-sm">
-                            <img src="${item.image}" class="card-img-top" alt="${item.title}">
+                            ${newsImageMarkup(item, images[item.image])}
                             <div class="card-body">
                                 <div class="d-flex justify-content-between align-items-center mb-2">
                                     <span class="badge ${item.categoryClass}">${item.category}</span>
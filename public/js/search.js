@@ -0,0 +1,140 @@
+// SPADE client-side search over the sharded index in json/search/
+// Only the manifest, the term shards of the query words and the matching
+// document shards are downloaded. Drives the search box of the news section.
+
+(function () {
+  const BASE = "json/search/";
+  const STOPWORDS = new Set(
+    ("a an and are as at be but by for from has have in into is it its of on or our " +
+      "that the their this to was we were will with you your").split(" ")
+  );
+  const cache = new Map();
+  let manifest = null;
+
+  function fetchJSON(name) {
+    if (!cache.has(name)) {
+      cache.set(
+        name,
+        fetch(BASE + name).then((response) => (response.ok ? response.json() : {}))
+      );
+    }
+    return cache.get(name);
+  }
+
+  // Must match search_index.tokenize()
+  function tokenize(text) {
+    const ascii = text
+      .replace(/<[^>]+>/g, " ")
+      .normalize("NFKD")
+      .replace(/[^\x00-\x7f]/g, "")
+      .toLowerCase();
+    return (ascii.match(/[a-z0-9]+/g) || []).filter(
+      (t) => t.length >= manifest.prefixLength && !STOPWORDS.has(t)
+    );
+  }
+
+  // [3, 4, 1, 12] -> [3, 7, 8, 20]
+  function deltaDecode(gaps) {
+    let previous = 0;
+    return gaps.map((gap) => (previous += gap));
+  }
+
+  async function postings(term) {
+    const prefix = term.slice(0, manifest.prefixLength);
+    if (!manifest.prefixes.includes(prefix)) return [];
+    const shard = await fetchJSON(`terms-${prefix}.json`);
+    return shard[term] ? deltaDecode(shard[term]) : [];
+  }
+
+  // Resolves to [{collection, id, title, link}] for documents containing every query word
+  window.spadeSearch = async function (query, limit = 20) {
+    if (!manifest) manifest = await fetchJSON("manifest.json");
+    const terms = [...new Set(tokenize(query))];
+    if (!terms.length) return [];
+
+    const lists = await Promise.all(terms.map(postings));
+    lists.sort((a, b) => a.length - b.length);
+    let matches = lists[0];
+    for (const list of lists.slice(1)) {
+      const other = new Set(list);
+      matches = matches.filter((docnum) => other.has(docnum));
+    }
+    matches = matches.slice(0, limit);
+
+    const shards = [...new Set(matches.map((d) => Math.floor(d / manifest.docsPerShard)))];
+    const docs = Object.assign(
+      {},
+      ...(await Promise.all(
+        shards.map((n) => fetchJSON(`docs-${String(n).padStart(4, "0")}.json`))
+      ))
+    );
+    return matches
+      .filter((docnum) => docs[docnum])
+      .map((docnum) => {
+        const [collection, id, title, link] = docs[docnum];
+        return { collection, id, title, link };
+      });
+  };
+
+  // News open their link; demos open in the interactive demo section
+  function resultLink(result) {
+    const a = document.createElement("a");
+    a.className = "list-group-item list-group-item-action";
+    a.textContent = result.title;
+    const badge = document.createElement("span");
+    badge.className = "badge bg-secondary ms-2";
+    badge.textContent = result.collection === "news" ? "News" : "Demo";
+    a.appendChild(badge);
+    if (result.collection === "news" && result.link) {
+      a.href = result.link;
+      a.target = "_blank";
+      a.rel = "noopener";
+      return a;
+    }
+    const target = result.collection === "demos" ? "#interactive-demo" : "#news";
+    a.href = target;
+    a.addEventListener("click", function (e) {
+      e.preventDefault();
+      const select = document.getElementById("demo-scenario");
+      if (result.collection === "demos" && select) {
+        select.value = result.id;
+        select.dispatchEvent(new Event("change"));
+      }
+      const section = document.querySelector(target);
+      if (section) {
+        window.scrollTo({ top: section.offsetTop - 70, behavior: "smooth" });
+      }
+    });
+    return a;
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    const input = document.getElementById("site-search");
+    const results = document.getElementById("site-search-results");
+    if (!input || !results) return;
+    let timer = null;
+    let latest = 0;
+
+    async function render(query) {
+      const request = ++latest;
+      const found = query.trim() ? await window.spadeSearch(query, 8) : null;
+      // A slower, older query must not overwrite the results of a newer one
+      if (request !== latest) return;
+      results.replaceChildren();
+      if (!found) return;
+      if (!found.length) {
+        const empty = document.createElement("div");
+        empty.className = "list-group-item text-muted";
+        empty.textContent = "No results";
+        results.appendChild(empty);
+        return;
+      }
+      found.forEach((result) => results.appendChild(resultLink(result)));
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(() => render(input.value).catch(() => results.replaceChildren()), 150);
+    });
+  });
+})();
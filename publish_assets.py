@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+SPADE Static Data Publisher
+Publishes the JSON data (public/json) and demo sources (public/py) as minified,
+content-hashed files with precompressed .gz and .br siblings under public/static,
+plus a manifest mapping logical names to hashed ones so they can be cached immutably.
+Only inputs that changed since the last run are re-minified and recompressed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+PUBLIC_DIR = ROOT / "public"
+STATIC_DIR = PUBLIC_DIR / "static"
+MANIFEST_FILE = STATIC_DIR / "manifest.json"
+STATE_FILE = ROOT / ".spade" / "publish-state.json"
+
+# Logical directories (relative to public/) and the file patterns published from them
+SOURCES = [
+    ("json", "**/*.json"),
+    ("py", "*.py"),
+]
+
+HASH_LENGTH = 10
+
+
+def find_inputs():
+    """Yield (logical name, path) for every file to publish"""
+    for directory, pattern in SOURCES:
+        for path in sorted((PUBLIC_DIR / directory).glob(pattern)):
+            if path.is_file():
+                yield path.relative_to(PUBLIC_DIR).as_posix(), path
+
+
+def minify(path):
+    """Return the bytes to publish for a file (JSON is re-serialised compactly)"""
+    payload = path.read_bytes()
+    if path.suffix == ".json":
+        data = json.loads(payload)
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return payload
+
+
+def hashed_name(logical, digest):
+    """json/news.json -> json/news.<hash>.json"""
+    stem, ext = os.path.splitext(logical)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def compress_job(job):
+    """Worker: write the minified file and its .gz/.br siblings, returning their sizes"""
+    target, payload = job
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(payload)
+    sizes = {"bytes": len(payload)}
+    compressed = gzip.compress(payload, compresslevel=9, mtime=0)
+    Path(f"{target}.gz").write_bytes(compressed)
+    sizes["gzip"] = len(compressed)
+    try:
+        import brotli
+    except ImportError:
+        return sizes
+    compressed = brotli.compress(payload, quality=11)
+    Path(f"{target}.br").write_bytes(compressed)
+    sizes["br"] = len(compressed)
+    return sizes
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def outputs_exist(entry):
+    return (PUBLIC_DIR / entry["path"]).exists() and (PUBLIC_DIR / f"{entry['path']}.gz").exists()
+
+
+def publish(workers=None):
+    """Publish every input, recompressing only the ones that changed"""
+    started = time.perf_counter()
+    state = load_state()
+    new_state = {}
+    files = {}
+    jobs = []
+    reused = 0
+
+    for logical, path in find_inputs():
+        st = path.stat()
+        previous = state.get(logical)
+        signature = [st.st_size, st.st_mtime_ns]
+        if previous and previous["stat"] == signature and outputs_exist(previous["entry"]):
+            # Same size and mtime: no need to even read the file
+            files[logical] = previous["entry"]
+            new_state[logical] = previous
+            reused += 1
+            continue
+        try:
+            payload = minify(path)
+        except json.JSONDecodeError as e:
+            print(f"❌ Skipping {logical}: invalid JSON ({e})")
+            continue
+        digest = hashlib.sha256(payload).hexdigest()
+        entry = {"path": f"static/{hashed_name(logical, digest)}", "sha256": digest, "source": st.st_size}
+        if previous and previous["entry"]["sha256"] == digest and outputs_exist(previous["entry"]):
+            # Touched but identical content
+            entry = previous["entry"]
+            reused += 1
+        else:
+            jobs.append((logical, entry, payload))
+        files[logical] = entry
+        new_state[logical] = {"stat": signature, "entry": entry}
+
+    if jobs:
+        work = [(str(PUBLIC_DIR / entry["path"]), payload) for _, entry, payload in jobs]
+        if len(work) == 1:
+            # A single edit (e.g. from watch mode) is not worth starting a pool for
+            results = [compress_job(work[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(compress_job, work))
+        for (logical, entry, _), sizes in zip(jobs, results):
+            entry.update(sizes)
+            print(f"📦 {logical} → {entry['path']} ({entry['source']} → {sizes['bytes']} bytes, "
+                  f"gzip {sizes['gzip']}" + (f", br {sizes['br']}" if "br" in sizes else "") + ")")
+
+    # Remove hashed files that no longer belong to any input
+    live = set()
+    for entry in files.values():
+        live.update({entry["path"], f"{entry['path']}.gz", f"{entry['path']}.br"})
+    removed = 0
+    if STATIC_DIR.exists():
+        for path in STATIC_DIR.rglob("*"):
+            if path.is_file() and path != MANIFEST_FILE and path.relative_to(PUBLIC_DIR).as_posix() not in live:
+                path.unlink()
+                removed += 1
+
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump({"files": files}, f, indent=2, sort_keys=True)
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, 'w') as f:
+        json.dump(new_state, f)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Published {len(files)} files: {len(jobs)} compressed, {reused} unchanged, "
+          f"{removed} stale outputs removed ({elapsed:.2f}s)")
+    if jobs and not any("br" in entry for _, entry, _ in jobs):
+        print("ℹ️ Install the 'brotli' package to also write .br files.")
+    return True
+
+
+def main():
+    """Main function"""
+    print("📦 SPADE Static Data Publisher")
+    print("=" * 30)
+
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+
+    publish()
+
+
+if __name__ == "__main__":
+    main()
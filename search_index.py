@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Client-side full-text search index for SPADE news and demos
+Tokenises news titles/descriptions and demo names/descriptions/features into an
+inverted index kept in the content store database, and publishes it as small JSON
+shards under public/json/search/ so the browser only downloads what a query needs:
+
+    manifest.json     format parameters, document count and existing term prefixes
+    terms-XX.json     {term: [docnum, gap, gap, ...]} for terms starting with XX
+    docs-NNNN.json    {docnum: [collection, id, title, link]} for a range of documents
+
+Posting lists are sorted document numbers, delta-encoded (first value absolute, then
+gaps). The index is maintained incrementally as the content store changes: a document
+keeps the number it was first indexed with, every change marks the shards it touches
+dirty, and a flush rewrites only those. The manifest names the database that wrote
+the directory; shards written by another database (a fresh checkout, a deleted
+.spade/) are replaced as a whole, so numbers from two databases never mix.
+"""
+
+import json
+import os
+import re
+import unicodedata
+import uuid
+
+from content_journal import atomic_write_bytes
+
+SEARCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "public", "json", "search")
+
+PREFIX_LENGTH = 2
+DOCS_PER_SHARD = 256
+
+# Fields indexed per collection, and the one shown as the result title
+INDEXED_FIELDS = {
+    "news": ("title", "description"),
+    "demos": ("name", "description", "features"),
+}
+TITLE_FIELDS = {"news": "title", "demos": "name"}
+# Field holding the page a result opens; demos open in the interactive demo instead
+LINK_FIELDS = {"news": "link"}
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or our
+that the their this to was we were will with you your
+""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    docnum     INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc_key    TEXT NOT NULL UNIQUE,
+    collection TEXT NOT NULL,
+    item_id    NOT NULL,
+    title      TEXT NOT NULL,
+    link       TEXT,
+    terms      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_postings (
+    term   TEXT NOT NULL,
+    docnum INTEGER NOT NULL,
+    PRIMARY KEY (term, docnum)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS search_dirty (
+    shard TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS search_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+TAG_RE = re.compile(r"<[^>]+>")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+SHARD_RE = re.compile(r"(terms-[a-z0-9]+|docs-[0-9]{4})\.json")
+
+
+def tokenize(text):
+    """Lower-case ASCII word tokens of a text, without HTML tags and stopwords"""
+    text = unicodedata.normalize("NFKD", TAG_RE.sub(" ", text))
+    text = text.encode("ascii", "ignore").decode().lower()
+    return [t for t in TOKEN_RE.findall(text) if len(t) >= PREFIX_LENGTH and t not in STOPWORDS]
+
+
+def item_terms(collection, item):
+    """Set of index terms of a content item"""
+    terms = set()
+    for field in INDEXED_FIELDS[collection]:
+        value = item.get(field)
+        if isinstance(value, list):
+            value = " ".join(str(v) for v in value)
+        if isinstance(value, str):
+            terms.update(tokenize(value))
+    return terms
+
+
+def delta_encode(numbers):
+    """[3, 7, 8, 20] -> [3, 4, 1, 12]"""
+    encoded = []
+    previous = 0
+    for number in numbers:
+        encoded.append(number - previous)
+        previous = number
+    return encoded
+
+
+def term_shard(term):
+    return f"terms-{term[:PREFIX_LENGTH]}"
+
+
+def doc_shard(docnum):
+    return f"docs-{docnum // DOCS_PER_SHARD:04d}"
+
+
+def _encode(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index over the content store"""
+
+    def __init__(self, conn, out_dir=SEARCH_DIR):
+        self.conn = conn
+        self.out_dir = out_dir
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(search_docs)")}
+        if columns and "link" not in columns:
+            # Index from before links were published: drop it, attach() rebuilds it
+            self.conn.executescript(
+                "DROP TABLE search_docs; DROP TABLE IF EXISTS search_postings; "
+                "DROP TABLE IF EXISTS search_dirty; DROP TABLE IF EXISTS search_meta;"
+            )
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO search_meta (key, value) VALUES ('index', ?)", (uuid.uuid4().hex,)
+            )
+        self.index_id = self.conn.execute(
+            "SELECT value FROM search_meta WHERE key = 'index'"
+        ).fetchone()[0]
+
+    def attach(self, store, collection):
+        """Follow a store's changes, indexing the collection if it is not indexed yet"""
+        store.add_listener(self.content_changed)
+        indexed = self.conn.execute(
+            "SELECT 1 FROM search_docs WHERE collection = ? LIMIT 1", (collection,)
+        ).fetchone()
+        if indexed is None and store.count(collection):
+            self.content_changed(collection, list(store.items(collection)), (), True)
+
+    def content_changed(self, collection, changed, removed, replaced):
+        """ContentStore listener: update the postings of the changed items"""
+        if collection not in INDEXED_FIELDS:
+            return
+        with self.conn:
+            removed = {f"{collection}:{key}" for key in removed}
+            if replaced:
+                keep = {f"{collection}:{item['id']}" for item in changed}
+                removed.update(key for (key,) in self.conn.execute(
+                    "SELECT doc_key FROM search_docs WHERE collection = ?", (collection,)
+                ) if key not in keep)
+            for doc_key in removed:
+                self._remove(doc_key)
+            for item in changed:
+                self._index(collection, item)
+
+    def _mark_dirty(self, shards):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO search_dirty (shard) VALUES (?)", ((shard,) for shard in shards)
+        )
+
+    def _remove(self, doc_key):
+        row = self.conn.execute(
+            "SELECT docnum, terms FROM search_docs WHERE doc_key = ?", (doc_key,)
+        ).fetchone()
+        if row is None:
+            return
+        docnum, terms = row[0], json.loads(row[1])
+        self.conn.execute("DELETE FROM search_docs WHERE docnum = ?", (docnum,))
+        self.conn.executemany(
+            "DELETE FROM search_postings WHERE term = ? AND docnum = ?",
+            ((term, docnum) for term in terms),
+        )
+        self._mark_dirty({term_shard(term) for term in terms} | {doc_shard(docnum)})
+
+    def _index(self, collection, item):
+        doc_key = f"{collection}:{item['id']}"
+        terms = item_terms(collection, item)
+        title = str(item.get(TITLE_FIELDS[collection], ""))
+        link = item.get(LINK_FIELDS[collection]) if collection in LINK_FIELDS else None
+        row = self.conn.execute(
+            "SELECT docnum, terms, title, link FROM search_docs WHERE doc_key = ?", (doc_key,)
+        ).fetchone()
+        if row is None:
+            docnum = self.conn.execute(
+                "INSERT INTO search_docs (doc_key, collection, item_id, title, link, terms) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_key, collection, item["id"], title, link, json.dumps(sorted(terms))),
+            ).lastrowid
+            old_terms = set()
+            dirty = {doc_shard(docnum)}
+        else:
+            docnum, old_terms = row[0], set(json.loads(row[1]))
+            if old_terms == terms and (row[2], row[3]) == (title, link):
+                return
+            self.conn.execute(
+                "UPDATE search_docs SET title = ?, link = ?, terms = ? WHERE docnum = ?",
+                (title, link, json.dumps(sorted(terms)), docnum),
+            )
+            dirty = {doc_shard(docnum)} if (row[2], row[3]) != (title, link) else set()
+        added, dropped = terms - old_terms, old_terms - terms
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO search_postings (term, docnum) VALUES (?, ?)",
+            ((term, docnum) for term in added),
+        )
+        self.conn.executemany(
+            "DELETE FROM search_postings WHERE term = ? AND docnum = ?",
+            ((term, docnum) for term in dropped),
+        )
+        self._mark_dirty(dirty | {term_shard(term) for term in added | dropped})
+
+    # Publishing
+
+    def shard_payload(self, shard):
+        """Contents of one published shard ({} when it has nothing left)"""
+        if shard.startswith("terms-"):
+            prefix = shard[len("terms-"):]
+            postings = {}
+            for term, docnum in self.conn.execute(
+                "SELECT term, docnum FROM search_postings WHERE term >= ? AND term < ? "
+                "ORDER BY term, docnum",
+                (prefix, prefix + "\uffff"),
+            ):
+                postings.setdefault(term, []).append(docnum)
+            return {term: delta_encode(docnums) for term, docnums in postings.items()}
+        first = int(shard[len("docs-"):]) * DOCS_PER_SHARD
+        return {
+            str(docnum): [collection, item_id, title, link]
+            for docnum, collection, item_id, title, link in self.conn.execute(
+                "SELECT docnum, collection, item_id, title, link FROM search_docs "
+                "WHERE docnum >= ? AND docnum < ? ORDER BY docnum",
+                (first, first + DOCS_PER_SHARD),
+            )
+        }
+
+    def all_shards(self):
+        """Names of every shard the index currently has"""
+        shards = {term_shard(prefix) for (prefix,) in self.conn.execute(
+            "SELECT DISTINCT substr(term, 1, ?) FROM search_postings", (PREFIX_LENGTH,)
+        )}
+        shards.update(f"docs-{number:04d}" for (number,) in self.conn.execute(
+            "SELECT DISTINCT docnum / ? FROM search_docs", (DOCS_PER_SHARD,)
+        ))
+        return shards
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.out_dir, "manifest.json"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def flush(self):
+        """Write the shards changed since the last flush; returns (written, removed)
+
+        The whole index is written when the directory holds another database's shards.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        manifest = self.load_manifest()
+        full = manifest is None or manifest.get("version") != 3 or manifest.get("index") != self.index_id
+        if full:
+            shards = self.all_shards()
+            prefixes = set()
+        else:
+            shards = {shard for (shard,) in self.conn.execute("SELECT shard FROM search_dirty")}
+            prefixes = set(manifest["prefixes"])
+        written = removed = 0
+        for shard in sorted(shards):
+            payload = self.shard_payload(shard)
+            path = os.path.join(self.out_dir, f"{shard}.json")
+            if shard.startswith("terms-"):
+                (prefixes.add if payload else prefixes.discard)(shard[len("terms-"):])
+            if payload:
+                atomic_write_bytes(path, _encode(payload))
+                written += 1
+            elif os.path.exists(path):
+                os.unlink(path)
+                removed += 1
+        if full:
+            for name in os.listdir(self.out_dir):
+                if SHARD_RE.fullmatch(name) and name[:-len(".json")] not in shards:
+                    os.unlink(os.path.join(self.out_dir, name))
+                    removed += 1
+        manifest = {
+            "version": 3,
+            "index": self.index_id,
+            "prefixLength": PREFIX_LENGTH,
+            "docsPerShard": DOCS_PER_SHARD,
+            "documents": self.conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0],
+            "prefixes": sorted(prefixes),
+        }
+        encoded = json.dumps(manifest, indent=2).encode()
+        manifest_path = os.path.join(self.out_dir, "manifest.json")
+        try:
+            with open(manifest_path, 'rb') as f:
+                unchanged = f.read() == encoded
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            atomic_write_bytes(manifest_path, encoded)
+        with self.conn:
+            self.conn.executemany("DELETE FROM search_dirty WHERE shard = ?", ((shard,) for shard in shards))
+        return written, removed
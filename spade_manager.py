@@ -5,10 +5,36 @@ A unified script to manage the SPADE GitHub Pages project.
 This script provides easy access to all project management tasks.
 """
 
-import os
 import sys
-import subprocess
-from pathlib import Path
+
+# Must run before the other imports so --timings can measure them
+import startup_timings
+startup_timings.enable_from_argv()
+
+import os
+import shlex
+import time
+
+import command_registry
+
+# Background processes (dev server, preview, builds, watcher); created on first use
+_supervisor = None
+
+def get_supervisor():
+    """The process supervisor, started on first use"""
+    global _supervisor
+    if _supervisor is None:
+        from process_supervisor import Supervisor
+        _supervisor = Supervisor()
+    return _supervisor
+
+def start_background(name, argv, restart=True, on_exit=None):
+    """Start a supervised child, unless one with that name is already running"""
+    if get_supervisor().start(name, argv, restart=restart, on_exit=on_exit) is None:
+        print(f"ℹ️ {name} is already running ('stop {name}' ends it, 'status' shows it).")
+        return False
+    print(f"🚀 Started {name} in the background: {' '.join(argv)} ('logs {name}', 'stop {name}')")
+    return True
 
 def check_environment():
     """Check if we're in the correct environment"""
@@ -19,58 +45,200 @@ def check_environment():
         return False
     return True
 
-def manage_news():
-    """Launch the news management script"""
-    print("📰 Launching news manager...")
+def manage_news(*args):
+    """Run the news manager in-process (interactive when no args are given)"""
+    if not args:
+        print("📰 Launching news manager...")
+    ok, _ = command_registry.dispatch("news", args)
+    if not ok:
+        print("❌ News manager stopped with an error.")
+    return ok
+
+def manage_demos(*args):
+    """Run the demos manager in-process (interactive when no args are given)"""
+    if not args:
+        print("🎮 Launching demos manager...")
+    ok, _ = command_registry.dispatch("demos", args)
+    if not ok:
+        print("❌ Demos manager stopped with an error.")
+    return ok
+
+def backup_data(*args):
+    """Run the data backup utility in-process (interactive when no args are given)"""
+    if not args:
+        print("🔄 Launching data backup utility...")
+    ok, _ = command_registry.dispatch("backup", args)
+    if not ok:
+        print("❌ Backup utility stopped with an error.")
+    return ok
+
+def asset_report(*args):
+    """Report unreferenced public assets ('assets prune' removes them from dist)"""
+    print("🧹 Checking for unreferenced assets...")
+    ok, _ = command_registry.dispatch("assets", args)
+    if not ok:
+        print("❌ Asset check stopped with an error.")
+
+def deploy_build(*args):
+    """Deploy only the changed build files ('deploy sync <dir>', 'deploy diff <manifest>')"""
+    ok, _ = command_registry.dispatch("deploy", args)
+    if not ok:
+        print("❌ Deploy stopped with an error.")
+    return ok
+
+def check_budget(*args):
+    """Check the payload of dist/ against the budgets ('budget history' shows its growth)"""
+    ok, _ = command_registry.dispatch("budget", args)
+    if not ok:
+        print("❌ Payload budget check failed.")
+    return ok
+
+def export_content():
+    """Export pending content store edits to the JSON files"""
+    print("📤 Exporting content to public/json...")
+    ok_news, _ = command_registry.dispatch("news", ["export"])
+    ok_demos, _ = command_registry.dispatch("demos", ["export"])
+    if not (ok_news and ok_demos):
+        print("❌ Error exporting content.")
+        return False
+    return True
+
+def publish_assets():
+    """Publish minified, hashed and precompressed data files"""
+    print("📦 Publishing static data artifacts...")
+    from publish_assets import publish
     try:
-        subprocess.run([sys.executable, "manage_news.py"], check=True)
-    except subprocess.CalledProcessError:
-        print("❌ Error launching news manager.")
-    except KeyboardInterrupt:
-        print("\n⏹️ News manager closed.")
+        return publish()
+    except OSError as e:
+        print(f"❌ Error publishing static data: {e}")
+        return False
 
-def manage_demos():
-    """Launch the demos management script"""
-    print("🎮 Launching demos manager...")
+def process_images():
+    """Generate responsive image variants and the image manifest"""
+    print("🖼️ Generating responsive image variants...")
+    from image_pipeline import process
     try:
-        subprocess.run([sys.executable, "manage_demos.py"], check=True)
-    except subprocess.CalledProcessError:
-        print("❌ Error launching demos manager.")
-    except KeyboardInterrupt:
-        print("\n⏹️ Demos manager closed.")
+        process()
+        return True
+    except OSError as e:
+        print(f"❌ Error processing images: {e}")
+        return False
 
-def backup_data():
-    """Launch the data backup utility"""
-    print("🔄 Launching data backup utility...")
+def minify_svgs():
+    """Minify the SVGs in public/img in place"""
+    print("🪶 Minifying SVG images...")
+    import svg_minify
+    paths = sorted(os.path.join(svg_minify.IMG_DIR, name)
+                   for name in os.listdir(svg_minify.IMG_DIR) if name.lower().endswith(".svg"))
     try:
-        subprocess.run([sys.executable, "backup_data.py"], check=True)
-    except subprocess.CalledProcessError:
-        print("❌ Error launching backup utility.")
-    except KeyboardInterrupt:
-        print("\n⏹️ Backup utility closed.")
+        svg_minify.minify_files(paths)
+        return True
+    except OSError as e:
+        print(f"❌ Error minifying SVGs: {e}")
+        return False
+
+def watch_content():
+    """Regenerate derived content whenever public/ changes and reload open pages"""
+    print("👀 Starting the content watcher...")
+    start_background("watch", [sys.executable, "content_watch.py"])
+
+def start_dev_server():
+    """Run the Astro dev server in the background"""
+    print("🧑‍💻 Starting the Astro dev server...")
+    start_background("dev", ["npm", "run", "dev"])
+
+def build_running():
+    return _supervisor is not None and "build" in _supervisor.children and _supervisor.children["build"].alive
+
+def write_deploy_manifest():
+    """Describe the new contents of dist/ for differential deploys"""
+    from deploy_manifest import write_manifest
+    files = write_manifest()
+    print(f"🧾 Deploy manifest written: {len(files)} files ('deploy sync <dir>' uploads the changes)")
 
 def build_project():
-    """Build the project for production"""
+    """Build the project for production (npm runs in the background)
+
+    Skipped when dist/ already holds the build of the current inputs, and restored
+    from the build cache when an earlier build had the same inputs.
+    """
+    if build_running():
+        print("ℹ️ build is already running ('logs build' shows its output).")
+        return
+    if not export_content() or not process_images() or not publish_assets():
+        return False
+    import build_cache
+    started = time.perf_counter()
+    digest, files, rehashed = build_cache.input_hash()
+    print(f"🔑 Build inputs {digest[:12]}: {files} files, {rehashed} re-read "
+          f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+    if build_cache.current_build(digest):
+        print("✅ dist/ already holds the build of these inputs; nothing to build.")
+        return check_budget()
+    if digest in build_cache.load_index()["builds"]:
+        build_cache.restore(digest)
+        write_deploy_manifest()
+        print("♻️ Restored dist/ from the cached build of these inputs; nothing to build.")
+        return check_budget()
+    build_cache.invalidate()
     print("🔨 Building project for production...")
-    try:
-        subprocess.run(["npm", "run", "build"], check=True)
-        print("✅ Project built successfully!")
-        print("📁 Build output is in the 'dist' directory.")
-    except subprocess.CalledProcessError:
-        print("❌ Error building project.")
+
+    def finished(returncode):
+        # Runs on a worker thread once npm exits, so dev and watch output keeps streaming;
+        # the result is the build's outcome
+        if returncode != 0:
+            print("❌ Error building project.")
+            return False
+        print(f"✅ Project built successfully in {time.perf_counter() - started:.1f}s!")
+        command_registry.dispatch("assets", ["prune"])
+        build_cache.store(digest)
+        write_deploy_manifest()
+        print(f"📁 Build output is in the 'dist' directory (cached as {digest[:12]}).")
+        return check_budget()
+
+    start_background("build", ["npm", "run", "build"], restart=False, on_exit=finished)
+
+def rollback_build(build=None):
+    """List the cached builds, or put one of them back in dist/"""
+    import build_cache
+    if build is None:
+        build_cache.print_builds()
+        return
+    if build_running():
+        print("❌ A build is running; wait for it (or 'stop build') before rolling back.")
+        return
+    digest = build_cache.find(build)
+    if digest is None:
+        print(f"❌ No single cached build matches '{build}' (run 'rollback' to list them).")
+        return
+    build_cache.restore(digest)
+    write_deploy_manifest()
+    print(f"⏪ dist/ is now the build of {digest[:12]}.")
 
 def preview_build():
-    """Preview the production build"""
+    """Preview the production build in the background"""
     print("👀 Starting preview of production build...")
-    try:
-        subprocess.run(["npm", "run", "preview"], check=True)
-    except subprocess.CalledProcessError:
-        print("❌ Error starting preview.")
-    except KeyboardInterrupt:
-        print("\n⏹️ Preview server stopped.")
+    start_background("preview", ["npm", "run", "preview"])
+
+def stop_process(name="all"):
+    """Stop a background process ('all' stops every one)"""
+    supervisor = get_supervisor()
+    names = [name] if name != "all" else [n for n, child in supervisor.children.items() if child.alive]
+    if not names:
+        print("ℹ️ No background processes are running.")
+    for name in names:
+        if supervisor.stop(name):
+            print(f"⏹️ Stopped {name}.")
+        else:
+            print(f"ℹ️ {name} is not running.")
+
+def show_logs(name):
+    """Show the recent output of a background process"""
+    get_supervisor().print_logs(name)
 
 def install_dependencies():
     """Install or update npm dependencies"""
+    import subprocess
     print("📦 Installing/updating npm dependencies...")
     try:
         subprocess.run(["npm", "install"], check=True)
@@ -113,6 +281,11 @@ def check_status():
         print("ℹ️ No production build found (run build command to create)")
     
     print()
+    if _supervisor is None or not _supervisor.children:
+        print("ℹ️ No background processes (start one with dev, preview, build or watch)")
+    else:
+        _supervisor.print_status()
+    print()
 
 def show_project_info():
     """Show project information"""
@@ -140,22 +313,113 @@ def print_help():
     print("Available commands:")
     print()
     print("📊 Project Management:")
-    print("  status     - Check project health and status")
+    print("  status     - Check project health and the background processes")
     print("  info       - Show project information")
     print("  install    - Install/update npm dependencies")
     print()
+    print("🚀 Background Processes (the prompt stays usable while they run):")
+    print("  dev        - Run the Astro dev server (restarted if it crashes)")
+    print("  preview    - Preview the production build")
+    print("  build      - Build the project for production (skipped when the inputs did not change)")
+    print("  rollback   - List cached builds, or put one back in dist (e.g. 'rollback 3f2a9c')")
+    print("  stop       - Stop a background process (e.g. 'stop dev'; default: all)")
+    print("  logs       - Show the recent output of a background process (e.g. 'logs build')")
+    print("  budget     - Payload per file type against the budgets (e.g. 'budget history --csv')")
+    print("  deploy     - Copy only the changed build files to a mirror (e.g. 'deploy sync /srv/spade')")
+    print()
     print("📰 Content Management:")
-    print("  news       - Manage news items")
-    print("  demos      - Manage demo scenarios")
-    print("  backup     - Backup data files")
+    print("  news       - Manage news items (e.g. 'news list' runs a single command)")
+    print("  demos      - Manage demo scenarios (e.g. 'demos validate')")
+    print("  backup     - Backup data files (e.g. 'backup create')")
+    print("  export     - Write pending content edits to public/json")
+    print("  images     - Generate responsive image variants and public/json/images.json")
+    print("  svgs       - Minify the SVGs in public/img in place")
+    print("  publish    - Write hashed, precompressed data files to public/static")
+    print("  assets     - Report unreferenced public assets ('assets prune' drops them from dist)")
+    print("  watch      - Regenerate derived content on every save and reload the browser")
     print()
     print("❓ Help & Info:")
     print("  help       - Show this help message")
     print("  exit       - Exit the manager")
     print()
 
+COMMANDS = {
+    "news": manage_news,
+    "demos": manage_demos,
+    "backup": backup_data,
+    "export": export_content,
+    "images": process_images,
+    "svgs": minify_svgs,
+    "publish": publish_assets,
+    "assets": asset_report,
+    "watch": watch_content,
+    "dev": start_dev_server,
+    "build": build_project,
+    "preview": preview_build,
+    "rollback": rollback_build,
+    "deploy": deploy_build,
+    "budget": check_budget,
+    "stop": stop_process,
+    "logs": show_logs,
+    "install": install_dependencies,
+    "status": check_status,
+    "info": show_project_info,
+    "help": print_help,
+}
+
+# Commands taking one argument: whether it is required, and what it is
+TAKES_ARGUMENT = {
+    "stop": (False, "process"),
+    "logs": (True, "process"),
+    "rollback": (False, "build hash"),
+}
+
+def shutdown():
+    """Stop the background processes and flush the command modules"""
+    if _supervisor is not None:
+        _supervisor.stop_all()
+    command_registry.close_all()
+
+def run_command(words):
+    """Run one manager command in-process and report its wall time"""
+    command, args = words[0].lower(), words[1:]
+    if command not in COMMANDS:
+        print(f"❓ Unknown command: '{command}'. Type 'help' for available commands.")
+        return
+    if command in TAKES_ARGUMENT:
+        required, argument = TAKES_ARGUMENT[command]
+        if len(args) > 1 or (required and not args):
+            print(f"❓ Usage: {command} " + (f"<{argument}>" if required else f"[{argument}]"))
+            return
+    elif args and command not in command_registry.GROUPS:
+        print(f"❓ '{command}' does not take arguments.")
+        return
+    started = time.perf_counter()
+    result = COMMANDS[command](*args)
+    elapsed = time.perf_counter() - started
+    print(f"⏱️ {' '.join(words)}: {elapsed * 1000:.1f} ms")
+    return result
+
 def main():
     """Main function"""
+    # One-shot mode: spade_manager.py news list
+    if len(sys.argv) > 1:
+        if not check_environment():
+            sys.exit(1)
+        result = run_command(sys.argv[1:])
+        # Background commands (dev, build...) keep the one-shot manager alive until they end
+        succeeded = True
+        try:
+            if _supervisor is not None:
+                succeeded = _supervisor.wait()
+        except KeyboardInterrupt:
+            print("\n⏹️ Stopping background processes...")
+        shutdown()
+        # A failed check or build (a budget regression, say) fails the one-shot run, for scripts and CI
+        if result is False or not succeeded:
+            sys.exit(1)
+        return
+    
     print("🎯 SPADE Project Manager")
     print("=" * 30)
     
@@ -168,38 +432,24 @@ def main():
     
     while True:
         try:
-            command = input("🔧 spade-manager> ").strip().lower()
+            words = shlex.split(input("🔧 spade-manager> "))
             
-            if command == "news":
-                manage_news()
-            elif command == "demos":
-                manage_demos()
-            elif command == "backup":
-                backup_data()
-            elif command == "build":
-                build_project()
-            elif command == "preview":
-                preview_build()
-            elif command == "install":
-                install_dependencies()
-            elif command == "status":
-                check_status()
-            elif command == "info":
-                show_project_info()
-            elif command == "help":
-                print_help()
-            elif command == "exit":
+            if not words:
+                continue
+            elif words[0].lower() == "exit":
+                shutdown()
                 print("👋 Goodbye!")
                 break
-            elif command == "":
-                continue
-            else:
-                print(f"❓ Unknown command: '{command}'. Type 'help' for available commands.")
+            run_command(words)
         
+        except ValueError as e:
+            print(f"❓ Could not parse command: {e}")
         except KeyboardInterrupt:
+            shutdown()
             print("\n👋 Goodbye!")
             break
         except EOFError:
+            shutdown()
             print("\n👋 Goodbye!")
             break
 
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Startup profiling for the SPADE management scripts
+Passing --timings to manage_news.py, manage_demos.py, backup_data.py or
+spade_manager.py reports, on stderr when the script exits, how long every module
+took to import (inclusive and self time) and how long each initialisation step
+took. Without the flag this module only costs one list lookup.
+
+Scripts call enable_from_argv() before their other imports and wrap their
+initialisation steps in phase(name).
+"""
+
+import sys
+import time
+
+_timings = None
+
+
+class _TimedLoader:
+    """Loader proxy that times exec_module and delegates everything else"""
+
+    def __init__(self, loader, timings):
+        self._loader = loader
+        self._timings = timings
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timings.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timings.leave()
+
+
+class _TimingFinder:
+    """Meta path finder wrapping the loader found by the finders after it"""
+
+    def __init__(self, timings):
+        self.timings = timings
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self.timings)
+                return spec
+        return None
+
+
+class StartupTimings:
+    """Import and initialisation costs collected since the timer was enabled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.import_total = 0.0
+        self.phases = []
+        self._stack = []
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self):
+        name, started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.imports[name] = (elapsed, elapsed - children)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        else:
+            self.import_total += elapsed
+
+    def report(self, limit=15):
+        total = time.perf_counter() - self.started
+        out = sys.stderr
+        print(f"\n⏱️ Startup timings ({total * 1000:.1f} ms since enabled)", file=out)
+        print(f"{'module':<36}{'self':>10}{'inclusive':>12}", file=out)
+        ranked = sorted(self.imports.items(), key=lambda entry: entry[1][1], reverse=True)
+        for name, (inclusive, own) in ranked[:limit]:
+            print(f"{name:<36}{own * 1000:>8.1f}ms{inclusive * 1000:>10.1f}ms", file=out)
+        print(f"{len(self.imports)} modules imported ({self.import_total * 1000:.1f} ms of imports overall)", file=out)
+        if self.phases:
+            print(f"{'phase':<36}{'wall':>10}", file=out)
+            for name, elapsed in self.phases:
+                print(f"{name:<36}{elapsed * 1000:>8.1f}ms", file=out)
+
+
+class phase:
+    """Context manager timing one initialisation step (no-op unless enabled)"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if _timings is not None:
+            _timings.phases.append((self.name, time.perf_counter() - self.started))
+        return False
+
+
+def enable_from_argv(argv=None):
+    """Start timing imports if --timings is on the command line (and remove the flag)"""
+    global _timings
+    argv = sys.argv if argv is None else argv
+    if "--timings" not in argv or _timings is not None:
+        return _timings
+    argv.remove("--timings")
+    import atexit
+    _timings = StartupTimings()
+    sys.meta_path.insert(0, _TimingFinder(_timings))
+    atexit.register(_timings.report)
+    return _timings
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+SPADE SVG Minifier
+Minifies the hand-authored SVGs in public/img in place: drops the XML declaration,
+comments, <metadata> and editor-specific (Inkscape, Sodipodi, Sketch...) elements
+and attributes, collapses whitespace and rounds the numbers in path data to a fixed
+precision. Files are processed in parallel, and the hash of every file this tool
+has written is remembered, so already minified files are skipped without work.
+
+Usage: python3 svg_minify.py [file.svg ...]    (defaults to every SVG in public/img)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from content_journal import atomic_write_bytes
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMG_DIR = os.path.join(ROOT, "public", "img")
+CACHE_FILE = os.path.join(ROOT, ".spade", "svg-cache.json")
+
+# Decimals kept in path data
+PRECISION = 2
+# Bump when the minifier output changes so cached results are not trusted
+VERSION = 1
+
+EDITOR_PREFIXES = ("inkscape", "sodipodi", "sketch", "serif", "adobe")
+
+XML_DECLARATION_RE = re.compile(rb"<\?xml[^>]*\?>")
+DOCTYPE_RE = re.compile(rb"<!DOCTYPE[^>]*>", re.I)
+COMMENT_RE = re.compile(rb"<!--.*?-->", re.S)
+METADATA_RE = re.compile(rb"<metadata\b.*?</metadata>|<metadata\b[^>]*/>", re.S)
+EDITOR = b"|".join(p.encode() for p in EDITOR_PREFIXES)
+EDITOR_ELEMENT_RE = re.compile(rb"<(" + EDITOR + rb"):([\w-]+)\b[^>]*?(?:/>|>.*?</\1:\2\s*>)", re.S)
+EDITOR_ATTRIBUTE_RE = re.compile(rb"\s(?:xmlns:(?:" + EDITOR + rb")|(?:" + EDITOR + rb"):[\w-]+)=\"[^\"]*\"")
+BETWEEN_TAGS_RE = re.compile(rb">\s+<")
+WHITESPACE_RE = re.compile(rb"\s+")
+TAG_SPACE_RE = re.compile(rb"\s*(/?>)")
+PATH_ATTRIBUTE_RE = re.compile(rb"(\s(?:d|points)=\")([^\"]*)(\")")
+DECIMAL_RE = re.compile(rb"-?\d*\.\d+(?:[eE][-+]?\d+)?")
+PATH_COMMAND_RE = re.compile(rb"\s*([MmZzLlHhVvCcSsQqTtAa])\s*")
+
+
+def _round_number(match, precision):
+    text = f"{round(float(match.group()), precision):.{precision}f}".rstrip("0").rstrip(".")
+    if text in ("-0", ""):
+        text = "0"
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    return text.encode()
+
+
+def _compact_path(match, precision):
+    data = DECIMAL_RE.sub(lambda m: _round_number(m, precision), match.group(2))
+    data = PATH_COMMAND_RE.sub(rb"\1", data)
+    data = WHITESPACE_RE.sub(b" ", data).strip()
+    return match.group(1) + data + match.group(3)
+
+
+def minify_svg(data, precision=PRECISION):
+    """Return the minified bytes of an SVG document"""
+    data = XML_DECLARATION_RE.sub(b"", data)
+    data = DOCTYPE_RE.sub(b"", data)
+    data = COMMENT_RE.sub(b"", data)
+    data = METADATA_RE.sub(b"", data)
+    data = EDITOR_ELEMENT_RE.sub(b"", data)
+    data = EDITOR_ATTRIBUTE_RE.sub(b"", data)
+    data = PATH_ATTRIBUTE_RE.sub(lambda m: _compact_path(m, precision), data)
+    data = BETWEEN_TAGS_RE.sub(b"><", data)
+    data = WHITESPACE_RE.sub(b" ", data)
+    data = TAG_SPACE_RE.sub(rb"\1", data)
+    return data.strip()
+
+
+def minify_job(job):
+    """Worker: minify one file in place; returns (path, bytes before, bytes after, output hash)"""
+    path, precision = job
+    with open(path, 'rb') as f:
+        original = f.read()
+    minified = minify_svg(original, precision)
+    if len(minified) < len(original):
+        atomic_write_bytes(path, minified)
+    else:
+        minified = original
+    return path, len(original), len(minified), hashlib.sha256(minified).hexdigest()
+
+
+def load_cache(precision):
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+    if cache.get("version") != VERSION or cache.get("precision") != precision:
+        return set()
+    return set(cache.get("minified", []))
+
+
+def save_cache(precision, minified):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, 'w') as f:
+        json.dump({"version": VERSION, "precision": precision, "minified": sorted(minified)}, f)
+
+
+def minify_files(paths, precision=PRECISION, workers=None, verbose=True):
+    """Minify SVG files in place, skipping ones already minified; returns the results"""
+    started = time.perf_counter()
+    minified = load_cache(precision)
+    jobs = []
+    skipped = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if digest in minified:
+            skipped += 1
+        else:
+            jobs.append((path, precision))
+
+    if len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(minify_job, jobs))
+    else:
+        results = [minify_job(job) for job in jobs]
+
+    before_total = after_total = 0
+    for path, before, after, digest in results:
+        minified.add(digest)
+        before_total += before
+        after_total += after
+        if verbose:
+            print(f"🪶 {os.path.basename(path)}: {before} → {after} bytes ({(before - after) / (before or 1):.0%} smaller)")
+    if results:
+        save_cache(precision, minified)
+
+    if verbose:
+        elapsed = time.perf_counter() - started
+        saved = before_total - after_total
+        print(f"\n✅ {len(results)} SVGs minified, {skipped} already minified: "
+              f"{before_total} → {after_total} bytes, {saved} saved ({elapsed:.2f}s)")
+    return results
+
+
+def main():
+    """Main function"""
+    print("🪶 SPADE SVG Minifier")
+    print("=" * 30)
+
+    if not os.path.exists("astro.config.mjs"):
+        print("❌ Error: This script should be run from the repository root directory.")
+        print(f"Current directory: {os.getcwd()}")
+        sys.exit(1)
+
+    paths = sys.argv[1:] or sorted(
+        os.path.join(IMG_DIR, name) for name in os.listdir(IMG_DIR) if name.lower().endswith(".svg")
+    )
+    minify_files(paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from backup_retention import plan_retention
+
+POLICY = {"hourly": 2, "daily": 2, "weekly": 2, "monthly": 2}
+
+# Newest first; 2025-03-10 is a Monday, so the 9th closes the previous ISO week
+SNAPSHOTS = [
+    ("a", "2025-03-10T15:30:00"),
+    ("b", "2025-03-10T15:10:00"),
+    ("c", "2025-03-10T14:00:00"),
+    ("d", "2025-03-09T20:00:00"),
+    ("e", "2025-03-08T09:00:00"),
+    ("f", "2025-02-20T09:00:00"),
+    ("g", "2025-02-10T09:00:00"),
+    ("h", "2025-01-05T09:00:00"),
+]
+
+
+def test_each_tier_keeps_the_newest_snapshot_of_its_recent_periods():
+    kept, pruned = plan_retention(SNAPSHOTS, POLICY)
+    assert [(row[0], tiers) for row, tiers in kept] == [
+        ("a", ["hourly", "daily", "weekly", "monthly"]),
+        ("c", ["hourly"]),
+        ("d", ["daily", "weekly"]),
+        ("f", ["monthly"]),
+    ]
+    assert [row[0] for row in pruned] == ["b", "e", "g", "h"]
+
+
+def test_the_newest_snapshot_is_kept_by_an_empty_policy():
+    kept, pruned = plan_retention(SNAPSHOTS[:2], dict.fromkeys(POLICY, 0))
+    assert [(row[0], tiers) for row, tiers in kept] == [("a", ["latest"])]
+    assert [row[0] for row in pruned] == ["b"]
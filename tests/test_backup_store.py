@@ -0,0 +1,127 @@
+import os
+import tarfile
+from datetime import datetime, timedelta
+
+import pytest
+
+import backup_store
+from backup_store import BackupStore, serialize
+
+START = datetime(2025, 3, 1, 12, 0)
+
+
+def write(path, content, step):
+    """Write a file with an mtime of its own, as an edit some seconds later would"""
+    with open(path, 'wb') as f:
+        f.write(content)
+    moment = (START + timedelta(seconds=step)).timestamp()
+    os.utime(path, (moment, moment))
+
+
+def test_unchanged_files_are_stored_once(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    logo, notes = str(tmp_path / "logo.bin"), str(tmp_path / "notes.txt")
+    write(logo, os.urandom(4096), 0)
+    write(notes, b"first", 0)
+    first, stored = store.create([logo, notes, str(tmp_path / "missing.txt")], START)
+    assert stored == 4096 + 5
+    assert sorted(first["files"]) == [logo, notes]
+
+    write(notes, b"second", 1)
+    second, stored = store.create([logo, notes], START + timedelta(minutes=1))
+    assert stored == 6
+    assert second["files"][logo] == first["files"][logo]
+
+    write(notes, b"edited after the backup", 2)
+    assert store.restore(first) == [logo, notes]
+    with open(notes, 'rb') as f:
+        assert f.read() == b"first"
+    assert store.verify(store.snapshots()) == {}
+    store.close()
+
+
+def test_restore_writes_nothing_when_a_blob_is_corrupt(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    notes = str(tmp_path / "notes.txt")
+    write(notes, b"backed up", 0)
+    manifest, _ = store.create([notes], START)
+    with open(store.blob_path(manifest["files"][notes]["sha256"]), 'wb') as f:
+        f.write(b"bit rot")
+    write(notes, b"current", 1)
+
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        store.restore(manifest)
+    with open(notes, 'rb') as f:
+        assert f.read() == b"current"
+    assert sorted(os.listdir(tmp_path)) == ["backups", "notes.txt"]
+    assert store.verify([manifest]) == {manifest["id"]: {notes: "checksum mismatch"}}
+    store.close()
+
+
+def test_deltas_rebase_and_items_resolve_across_the_rebase(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup_store, "REBASE_EVERY", 2)
+    store = BackupStore(str(tmp_path / "backups"))
+    path = str(tmp_path / "news.json")
+    doc = {"news": [{"id": i, "title": f"News {i}", "description": "SPADE " * 20} for i in range(1, 21)]}
+    edits = [None, 5, 7, 9, 11]
+    manifests, versions = [], []
+    for step, item_id in enumerate(edits):
+        if item_id is not None:
+            doc["news"][item_id - 1] = dict(doc["news"][item_id - 1], title=f"Edited {item_id}")
+        versions.append(serialize(doc))
+        write(path, versions[-1], step)
+        manifests.append(store.create([path], START + timedelta(hours=step))[0])
+
+    entries = [manifest["files"][path] for manifest in manifests]
+    assert [entry.get("depth", 0) for entry in entries] == [0, 1, 2, 0, 1]
+    assert ["delta" in entry for entry in entries] == [False, True, True, False, True]
+    for manifest, payload in zip(manifests, versions):
+        assert store.read_content(manifest["files"][path]) == payload
+
+    # Point in time: the snapshot taken before an edit has the item as it was
+    before_rebase = store.at(START + timedelta(hours=2, minutes=30))
+    assert before_rebase["id"] == manifests[2]["id"]
+    assert store.find_item(before_rebase, path, "9")["title"] == "News 9"
+    assert store.find_item(before_rebase, path, "5")["title"] == "Edited 5"
+    # After the rebase, older edits come from the full copy and newer ones from the delta
+    assert store.find_item(manifests[4], path, "5")["title"] == "Edited 5"
+    assert store.find_item(manifests[4], path, "11")["title"] == "Edited 11"
+
+    del doc["news"][2]
+    write(path, serialize(doc), 5)
+    removed, _ = store.create([path], START + timedelta(hours=5))
+    assert store.find_item(removed, path, "3") is None
+    assert store.find_item(manifests[4], path, "3")["title"] == "News 3"
+    assert store.following_ids(manifests[4], path, "3")[:2] == [4, 5]
+    store.close()
+
+
+def test_archive_round_trip_and_truncated_archive(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    logo, notes = str(tmp_path / "logo.bin"), str(tmp_path / "notes.txt")
+    write(logo, os.urandom(8192), 0)
+    write(notes, b"archived", 0)
+    manifest, size = store.create_archive([logo, notes], START, compression="gz")
+    assert manifest["archive"].endswith(".tar.gz") and size > 0
+    assert store.latest() is None and store.latest(archives=True)["id"] == manifest["id"]
+    assert store.read_archive_member(manifest, notes) == b"archived"
+
+    write(notes, b"edited", 1)
+    assert store.restore(manifest) == [logo, notes]
+    with open(notes, 'rb') as f:
+        assert f.read() == b"archived"
+    assert store.verify([manifest]) == {}
+
+    archive = os.path.join(store.root, manifest["archive"])
+    with open(archive, 'rb') as f:
+        payload = f.read()
+    with open(archive, 'wb') as f:
+        f.write(payload[:len(payload) // 2])
+    write(notes, b"edited again", 2)
+    with pytest.raises(tarfile.ReadError):
+        store.restore(manifest)
+    with open(notes, 'rb') as f:
+        assert f.read() == b"edited again"
+    assert sorted(os.listdir(tmp_path)) == ["backups", "logo.bin", "notes.txt"]
+    assert list(store.verify([manifest])[manifest["id"]]) == [manifest["archive"]]
+    store.close()
@@ -0,0 +1,49 @@
+import os
+
+import build_cache
+
+
+def tree_digests(path):
+    return {os.path.relpath(os.path.join(dirpath, name), path): build_cache.file_digest(os.path.join(dirpath, name))
+            for dirpath, _, names in os.walk(path) for name in names}
+
+
+def test_editing_dist_leaves_the_cached_build_intact(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(build_cache, "INDEX_FILE", str(tmp_path / "cache" / "index.json"))
+    dist = tmp_path / "dist"
+    (dist / "js").mkdir(parents=True)
+    (dist / "index.html").write_text("<html>v1</html>")
+    (dist / "js" / "app.js").write_text("console.log(1);")
+    build_cache.store("a" * 64, dist=str(dist))
+    cached = os.path.join(build_cache.CACHE_DIR, "a" * 64)
+    expected = tree_digests(cached)
+
+    # Written in place, as a prune or a hand edit would
+    with open(dist / "index.html", 'r+') as f:
+        f.write("<html>v2")
+    assert tree_digests(cached) == expected
+
+    build_cache.restore("a" * 64, dist=str(dist))
+    assert tree_digests(str(dist)) == expected
+    with open(dist / "js" / "app.js", 'a') as f:
+        f.write("console.log(2);")
+    assert tree_digests(cached) == expected
+
+
+def test_input_edit_misses_the_cache_and_reverting_hits_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_cache, "STATE_FILE", str(tmp_path / "build-inputs.json"))
+    (tmp_path / "src").mkdir()
+    page = tmp_path / "src" / "index.astro"
+    page.write_text("<h1>SPADE</h1>")
+
+    def digest():
+        return build_cache.InputHasher(str(tmp_path)).digest(["src"])
+
+    first = digest()
+    assert digest() == first
+    page.write_text("<h1>SPADE 4</h1>")
+    edited = digest()
+    assert edited != first
+    page.write_text("<h1>SPADE</h1>")
+    assert digest() == first
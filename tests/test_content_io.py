@@ -0,0 +1,39 @@
+import json
+
+import content_io
+from content_store import ContentStore
+
+
+def run_pipeline(path, store):
+    errors = []
+    allocator = content_io.IdAllocator(store, "news", block_size=4,
+                                       taken=content_io.explicit_ids(str(path), int_fields=("id",)))
+    records = content_io.decode_records(content_io.read_records(str(path)), str(path), int_fields=("id",))
+    records = content_io.reject_duplicates(allocator.assign(records), errors)
+    items = list(content_io.validate_records(records, lambda item: (True, "Valid"), errors))
+    allocator.release()
+    return items, errors
+
+
+def test_allocated_ids_skip_ids_given_later_in_the_file(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    path = tmp_path / "news.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {"title": "No id"},
+        {"id": 1, "title": "Explicit"},
+        {"title": "No id either"},
+    ]) + "\n")
+    items, errors = run_pipeline(path, store)
+    assert errors == []
+    assert [item["id"] for item in items] == [2, 1, 3]
+    store.close()
+
+
+def test_duplicate_ids_are_rejected_with_their_line(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    path = tmp_path / "news.csv"
+    path.write_text("id,title\n7,First\n,Allocated\n7,Again\n")
+    items, errors = run_pipeline(path, store)
+    assert [item["title"] for item in items] == ["First", "Allocated"]
+    assert errors == [(4, "Duplicate id 7 (first used on line 2)")]
+    store.close()
@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from content_journal import ContentJournal, atomic_write_bytes, replay
+
+
+def journal_for(tmp_path, items):
+    path = tmp_path / "news.json"
+    path.write_text(json.dumps({"news": items, "title": "News"}))
+    return ContentJournal(str(path), "news")
+
+
+def test_replay_applies_puts_deletes_and_replace():
+    items = [{"id": 1}, {"id": 2}]
+    records = [
+        {"op": "put", "item": {"id": 3}},
+        {"op": "put", "item": {"id": 4}, "front": True},
+        {"op": "put", "item": {"id": 1, "edited": True}},
+        {"op": "delete", "id": 2},
+        {"op": "put", "item": {"id": 5}, "before": 3},
+    ]
+    assert replay(items, records) == [{"id": 4}, {"id": 1, "edited": True}, {"id": 5}, {"id": 3}]
+    assert replay(items, records + [{"op": "replace", "items": [{"id": 9}]}]) == [{"id": 9}]
+
+
+def test_load_replays_the_journal_up_to_a_torn_last_line(tmp_path):
+    journal = journal_for(tmp_path, [{"id": 1}])
+    journal.append({"op": "put", "item": {"id": 2}})
+    journal.append({"op": "delete", "id": 1})
+    # A crash in the middle of appending the next record
+    with open(journal.journal_path, 'ab') as f:
+        f.write(b'{"op": "put", "item": {"id"')
+
+    assert journal.load() == {"news": [{"id": 2}], "title": "News"}
+    journal.compact()
+    assert not journal.pending()
+    with open(journal.path) as f:
+        assert json.load(f) == {"news": [{"id": 2}], "title": "News"}
+
+
+def test_journal_of_another_snapshot_is_discarded(tmp_path, capsys):
+    journal = journal_for(tmp_path, [{"id": 1}])
+    journal.append({"op": "delete", "id": 1})
+    # The snapshot is replaced behind the journal's back, e.g. restored from a backup
+    with open(journal.path, 'w') as f:
+        json.dump({"news": [{"id": 7}]}, f)
+
+    assert journal.load() == {"news": [{"id": 7}]}
+    assert "stale journal" in capsys.readouterr().out
+    assert not journal.pending()
+
+
+def test_atomic_write_keeps_the_old_file_when_writing_fails(tmp_path):
+    path = tmp_path / "news.json"
+    path.write_bytes(b"old")
+    os.chmod(path, 0o640)
+    atomic_write_bytes(str(path), b"new")
+    assert path.read_bytes() == b"new"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+    with pytest.raises(TypeError):
+        atomic_write_bytes(str(path), "not bytes")
+    assert path.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["news.json"]
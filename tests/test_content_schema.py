@@ -0,0 +1,40 @@
+import content_schema
+from content_schema import compile_schema, fingerprint
+
+
+NEWS_ITEM = {"id": 1, "title": "Release", "date": "2025-01-01", "category": "Release",
+             "categoryClass": "release", "description": "SPADE 4", "image": "", "link": ""}
+
+
+def test_news_validator_reports_every_error():
+    assert content_schema.news_item_errors(NEWS_ITEM) == []
+    errors = content_schema.news_item_errors({"id": True, "title": " "})
+    # Missing fields first, then the type checks of the fields that are there
+    assert errors[0] == "Missing required field: date"
+    assert "Missing required field: link" in errors
+    assert errors[-2:] == ["ID must be an integer", "Title must be a non-empty string"]
+
+
+def test_demo_validator_reports_nested_paths():
+    demo = {"id": "chat", "name": "Chat", "description": "Two agents", "agentTypes": [],
+            "features": ["messages", 3],
+            "nodes": [{"id": "a", "type": "agent", "position": {"x": 1, "y": "2"}}],
+            "edges": [{"from": "a", "to": "b"}]}
+    assert content_schema.demo_item_errors(demo) == [
+        "agentTypes must be a non-empty list",
+        "features[1] must be a string",
+        "nodes[0].position.y must be a number",
+        "Missing required field: edges[0].type",
+    ]
+
+
+def test_compiled_schema_matches_its_rules():
+    schema = {"type": "object", "required": ["size"],
+              "properties": {"size": {"type": "number"}, "tags": {"type": "list", "items": {"type": "str"}}}}
+    validate = compile_schema(schema)
+    assert validate({"size": 1.5, "tags": ["a"]}) == []
+    # Booleans are not numbers, and optional fields are only checked when present
+    assert validate({"size": False}) == ["size must be a number"]
+    assert validate([]) == ["Item must be an object"]
+    assert validate.fingerprint == fingerprint(dict(schema))
+    assert validate.fingerprint != fingerprint({**schema, "required": []})
@@ -0,0 +1,34 @@
+import json
+
+from content_store import ContentStore
+
+
+def test_put_many_raises_sequence_past_imported_ids(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    store.put_many("news", [{"id": 6, "title": "Imported"}, {"id": 2, "title": "Older"}], front=True)
+    assert store.next_id("news") == 7
+    store.close()
+
+
+def test_put_many_never_lowers_sequence(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    store.reserve_ids("news", 10)
+    store.put_many("news", [{"id": 3, "title": "Imported"}])
+    assert store.next_id("news") == 11
+    store.close()
+
+
+def test_put_before_keeps_store_and_journal_in_the_same_order(tmp_path):
+    path = tmp_path / "news.json"
+    path.write_text(json.dumps({"news": [{"id": 1}, {"id": 3}]}))
+    store = ContentStore(str(tmp_path / "content.db"))
+    store.sync_from_json("news", str(path))
+    store.put("news", {"id": 2}, before=3)
+    # Without the anchor the item goes to the end
+    store.put("news", {"id": 4}, before=99)
+    store.put("news", {"id": 5}, before=2)
+    store.delete("news", 2)
+    ids = [item["id"] for item in store.items("news")]
+    assert ids == [1, 5, 3, 4]
+    assert [item["id"] for item in store.journals["news"].load()["news"]] == ids
+    store.close()
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import deploy_manifest
+from deploy_manifest import compare, describe
+
+
+@pytest.fixture
+def dist(tmp_path, monkeypatch):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<h1>SPADE</h1>")
+    (dist / "assets" / "app.js").write_text("console.log(1)")
+    (dist / "favicon.svg").write_text("<svg/>")
+    monkeypatch.setattr(deploy_manifest, "DIST_DIR", str(dist))
+    monkeypatch.setattr(deploy_manifest, "MANIFEST_FILE", str(tmp_path / ".spade" / "dist-manifest.json"))
+    return dist
+
+
+def test_compare_splits_added_changed_removed_and_unchanged(dist):
+    previous = describe(str(dist))
+    assert list(previous) == ["assets/app.js", "favicon.svg", "index.html"]
+    (dist / "assets" / "app.js").write_text("console.log(2)")
+    (dist / "favicon.svg").unlink()
+    (dist / "news.html").write_text("<h1>News</h1>")
+
+    assert compare(describe(str(dist)), previous) == (
+        ["news.html"], ["assets/app.js"], ["favicon.svg"], ["index.html"])
+
+
+def test_diff_prints_the_files_to_upload_and_delete(dist, tmp_path, capsys):
+    deployed = tmp_path / "deployed.json"
+    deploy_manifest.save_manifest(str(deployed), describe(str(dist)))
+    (dist / "index.html").write_text("<h1>SPADE 4</h1>")
+    (dist / "assets" / "app.js").unlink()
+    (dist / "assets" / "app.2.js").write_text("console.log(2)")
+
+    capsys.readouterr()
+    assert deploy_manifest.diff(str(deployed), "--json")
+    assert json.loads(capsys.readouterr().out) == {
+        "upload": ["assets/app.2.js", "index.html"], "delete": ["assets/app.js"]}
+    assert deploy_manifest.load_manifest(deploy_manifest.MANIFEST_FILE) == describe(str(dist))
+    assert not deploy_manifest.diff(str(tmp_path / "missing.json"))
+
+
+def test_sync_keeps_the_mirror_manifest_out_of_the_mirror(dist, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(deploy_manifest, "MIRRORS_DIR", str(tmp_path / ".spade" / "mirrors"))
+    mirror = tmp_path / "www"
+    mirror.mkdir()
+    # Left in the served tree by an older sync
+    (mirror / ".deploy-manifest.json").write_text("{}")
+    assert deploy_manifest.sync(str(mirror))
+    assert deploy_manifest.describe(str(mirror)) == deploy_manifest.describe(str(dist))
+    assert deploy_manifest.load_manifest(deploy_manifest.mirror_manifest_path(str(mirror))) == \
+        deploy_manifest.describe(str(dist))
+
+    (dist / "index.html").write_text("<h1>SPADE 4</h1>")
+    (dist / "assets" / "app.js").unlink()
+    capsys.readouterr()
+    assert deploy_manifest.sync(str(mirror))
+    assert "0 added, 1 changed, 1 removed, 1 unchanged" in capsys.readouterr().out
+    assert sorted(path.name for path in mirror.iterdir()) == ["favicon.svg", "index.html"]
@@ -0,0 +1,19 @@
+import os
+import sqlite3
+
+from image_catalog import ImageCatalog
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="{0}" height="{0}"></svg>'
+
+
+def test_refresh_sees_files_overwritten_in_place(tmp_path):
+    path = tmp_path / "logo.svg"
+    path.write_text(SVG.format(10))
+    catalog = ImageCatalog(sqlite3.connect(":memory:"), img_dir=str(tmp_path))
+    assert catalog.images() == [("logo.svg", path.stat().st_size, 10, 10)]
+
+    dir_times = os.stat(tmp_path)
+    path.write_text(SVG.format(200))
+    # Overwriting an existing file leaves the directory mtime alone; make sure of it
+    os.utime(tmp_path, ns=(dir_times.st_atime_ns, dir_times.st_mtime_ns))
+    assert catalog.images() == [("logo.svg", path.stat().st_size, 200, 200)]
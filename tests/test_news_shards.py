@@ -0,0 +1,40 @@
+import json
+
+from news_shards import write_shards
+
+
+def news(item_id, date):
+    return {"id": item_id, "title": f"News {item_id}", "date": date}
+
+
+def shard(shards_dir, filename):
+    with open(shards_dir / filename) as f:
+        return json.load(f)
+
+
+def test_pages_are_numbered_from_the_oldest_item(tmp_path):
+    items = [news(i, "March 1, 2025" if i > 2 else "May 5, 2024") for i in range(5, 0, -1)]
+    assert write_shards(items, str(tmp_path), page_size=2) == (6, 0, 0)
+
+    assert [item["id"] for item in shard(tmp_path, "latest.json")["news"]] == [5, 4]
+    assert [item["id"] for item in shard(tmp_path, "page-0001.json")["news"]] == [2, 1]
+    assert [item["id"] for item in shard(tmp_path, "page-0003.json")["news"]] == [5]
+    assert [item["id"] for item in shard(tmp_path, "year-2024.json")["news"]] == [2, 1]
+    manifest = shard(tmp_path, "manifest.json")
+    assert manifest["total"] == 5
+    assert manifest["pages"] == ["page-0003.json", "page-0002.json", "page-0001.json"]
+    assert manifest["years"] == ["year-2025.json", "year-2024.json"]
+
+
+def test_only_changed_shards_are_rewritten(tmp_path):
+    items = [news(i, "March 1, 2025") for i in range(4, 0, -1)]
+    write_shards(items, str(tmp_path), page_size=2)
+    older_page = (tmp_path / "page-0001.json").stat().st_mtime_ns
+
+    # New item at the front: latest, the newest page (new), and the year change
+    assert write_shards([news(5, "March 2, 2025")] + items, str(tmp_path), page_size=2) == (3, 2, 0)
+    assert (tmp_path / "page-0001.json").stat().st_mtime_ns == older_page
+
+    assert write_shards(items[2:], str(tmp_path), page_size=2) == (2, 1, 2)
+    assert not (tmp_path / "page-0003.json").exists()
+    assert shard(tmp_path, "manifest.json")["pages"] == ["page-0001.json"]
@@ -0,0 +1,28 @@
+import os
+
+import deploy_manifest
+import payload_budget
+
+
+def test_a_regression_keeps_failing_until_it_is_fixed(tmp_path, monkeypatch):
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    monkeypatch.setattr(payload_budget, "DIST_DIR", str(dist))
+    monkeypatch.setattr(payload_budget, "HISTORY_FILE", str(tmp_path / "budget-history.jsonl"))
+    monkeypatch.setattr(payload_budget, "SIZES_FILE", str(tmp_path / "budget-sizes.json"))
+    monkeypatch.setattr(payload_budget, "load_index", lambda: {"current": None})
+    monkeypatch.setitem(payload_budget.BUDGETS, "js", 1024)
+    monkeypatch.setattr(deploy_manifest, "MANIFEST_FILE", str(tmp_path / "dist-manifest.json"))
+
+    (dist / "app.js").write_bytes(os.urandom(512))
+    assert payload_budget.check()
+    (dist / "app.js").write_bytes(os.urandom(4096))
+    assert not payload_budget.check()
+    # Unchanged since the failed check: still compared with the last build within budget
+    assert not payload_budget.check()
+    (dist / "app.js").write_bytes(os.urandom(256))
+    assert payload_budget.check()
+
+    # Measuring is read-only: the deploy manifest belongs to the build
+    assert not os.path.exists(deploy_manifest.MANIFEST_FILE)
+    assert [entry["passed"] for entry in payload_budget.load_history()] == [True, False, True]
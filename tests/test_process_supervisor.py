@@ -0,0 +1,35 @@
+import sys
+import threading
+import time
+
+from process_supervisor import Supervisor
+
+
+def test_on_exit_does_not_block_the_other_children():
+    supervisor = Supervisor()
+    release = threading.Event()
+
+    def finished(returncode):
+        # Slow post-processing, like a build storing dist/ in the cache
+        assert release.wait(10)
+        return returncode == 0
+
+    build = supervisor.start("build", [sys.executable, "-c", "pass"], restart=False, on_exit=finished)
+    deadline = time.monotonic() + 10
+    while not build.finishing:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    other = supervisor.start("other", [sys.executable, "-c", "print('still streaming')"], restart=False)
+    other.future.result(timeout=10)
+    assert list(other.output) == ["still streaming"]
+    assert build.alive and build.state == "finishing"
+
+    release.set()
+    assert supervisor.wait()
+    assert build.result is True
+
+
+def test_on_exit_result_fails_the_wait():
+    supervisor = Supervisor()
+    supervisor.start("build", [sys.executable, "-c", "pass"], restart=False, on_exit=lambda returncode: False)
+    assert not supervisor.wait()
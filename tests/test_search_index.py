@@ -0,0 +1,57 @@
+import os
+
+from content_store import ContentStore
+from search_index import SearchIndex
+
+
+def published(out_dir):
+    files = {}
+    for name in sorted(os.listdir(out_dir)):
+        with open(os.path.join(out_dir, name), 'rb') as f:
+            files[name] = f.read()
+    return files
+
+
+def news(item_id, title, description=""):
+    return {"id": item_id, "title": title, "description": description,
+            "link": f"https://example.org/{item_id}"}
+
+
+def test_flush_rewrites_only_touched_shards(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    index = SearchIndex(store.conn, out_dir=str(tmp_path / "search"))
+    index.attach(store, "news")
+    store.replace_all("news", [news(1, "Agents release"), news(2, "Tutorial", "On behaviours")])
+    index.flush()
+    before = published(index.out_dir)
+
+    store.put("news", news(2, "Tutorial", "On zebras"))
+    assert index.flush() == (1, 1)
+    after = published(index.out_dir)
+    # Only the terms that changed; the docs shard and the other terms are untouched
+    assert "terms-be.json" not in after and "terms-ze.json" in after
+    assert {name for name in after if after[name] != before.get(name)} == {"terms-ze.json", "manifest.json"}
+    assert index.flush() == (0, 0)
+    store.close()
+
+
+def test_incremental_flushes_match_a_full_rewrite(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    index = SearchIndex(store.conn, out_dir=str(tmp_path / "search"))
+    index.attach(store, "news")
+    store.replace_all("news", [news(1, "Agents release"), news(2, "Tutorial on behaviours")])
+    index.flush()
+    store.put("news", news(3, "Community agents"), front=True)
+    store.delete("news", 1)
+    index.flush()
+
+    # Shards of another database in the directory are replaced as a whole
+    full = SearchIndex(store.conn, out_dir=str(tmp_path / "full"))
+    full.flush()
+    assert published(index.out_dir) == published(full.out_dir)
+    os.unlink(os.path.join(full.out_dir, "manifest.json"))
+    with open(os.path.join(full.out_dir, "terms-zz.json"), 'w') as f:
+        f.write("{}")
+    full.flush()
+    assert published(index.out_dir) == published(full.out_dir)
+    store.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Incremental validation cache for SPADE content
+Remembers the validation result of every item by a hash of its content, so that
+validating a collection only re-checks items that are new or changed. Results are
+persisted in the content store database and are dropped whenever the validator
+itself changes.
+"""
+
+import hashlib
+import json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validation_cache (
+    collection TEXT NOT NULL,
+    item_hash  TEXT NOT NULL,
+    rules      TEXT NOT NULL,
+    error      TEXT,
+    PRIMARY KEY (collection, item_hash)
+) WITHOUT ROWID;
+"""
+
+
+def rules_fingerprint(validator):
+    """Fingerprint of a validator's rules, derived from its source code"""
+    import inspect
+    try:
+        source = inspect.getsource(validator)
+    except (OSError, TypeError):
+        source = validator.__code__.co_code.hex()
+    return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+
+def item_hash(item):
+    """Stable content hash of a single item"""
+    payload = json.dumps(item, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ValidationCache:
+    """Per-collection cache of validator results keyed by item content hash"""
+
+    def __init__(self, conn, collection, validator, rules=None):
+        self.conn = conn
+        self.collection = collection
+        self.validator = validator
+        self.rules = rules or rules_fingerprint(validator)
+        self.hits = 0
+        self.misses = 0
+        self.conn.executescript(SCHEMA)
+        # Results computed under older rules are no longer trustworthy
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM validation_cache WHERE collection = ? AND rules != ?",
+                (collection, self.rules),
+            )
+        self._known = None
+        self._seen = set()
+        self._pending = []
+
+    def reset_stats(self):
+        """Reset the hit/miss counters"""
+        self.hits = 0
+        self.misses = 0
+        self._seen = set()
+
+    def check(self, item):
+        """Validate an item, reusing the cached result when its content is unchanged"""
+        if self._known is None:
+            self._known = dict(self.conn.execute(
+                "SELECT item_hash, error FROM validation_cache WHERE collection = ?",
+                (self.collection,),
+            ))
+        digest = item_hash(item)
+        self._seen.add(digest)
+        if digest in self._known:
+            self.hits += 1
+            error = self._known[digest]
+            return (error is None), (error or "Valid")
+        self.misses += 1
+        is_valid, error = self.validator(item)
+        self._known[digest] = None if is_valid else error
+        self._pending.append((self.collection, digest, self.rules, self._known[digest]))
+        return is_valid, error
+
+    def flush(self, prune=False):
+        """Persist the results computed since the last flush
+
+        With prune=True, entries for items not checked since the last reset_stats()
+        (i.e. edited or deleted items) are dropped; only use it after a full pass.
+        """
+        with self.conn:
+            if self._pending:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO validation_cache (collection, item_hash, rules, error) "
+                    "VALUES (?, ?, ?, ?)",
+                    self._pending,
+                )
+            if prune and self._known is not None:
+                stale = [(self.collection, digest) for digest in self._known if digest not in self._seen]
+                self.conn.executemany(
+                    "DELETE FROM validation_cache WHERE collection = ? AND item_hash = ?", stale
+                )
+                for _, digest in stale:
+                    del self._known[digest]
+        self._pending = []